@@ -0,0 +1 @@
+"""Reproducible benchmarks for the job pipeline, see benchmarks.suite."""
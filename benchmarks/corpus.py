@@ -0,0 +1,249 @@
+"""
+Deterministic synthetic job corpus.
+
+The same seed always produces the same sequence of jobs, and a corpus of n
+jobs is the first n jobs of any larger corpus, so one pass over 1M jobs
+also yields the 10k and 100k corpora. Titles, companies and descriptions
+are assembled from templates mixed with the phrase lists of
+search_config.json, so the keyword filter sees realistic hit rates.
+A share of the jobs are reposts of a recent posting: under a new URL with
+light edits (near-duplicates for dedup) or under the same URL (upsert
+conflicts for ingest).
+
+    python -m benchmarks.corpus --size 5 --seed 1
+"""
+
+import argparse
+import random
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional
+
+import orjson
+
+DEFAULT_SEED = 20240601
+DEFAULT_DUPLICATE_RATE = 0.15
+# Share of reposts that reuse the original URL rather than a new one
+SAME_URL_SHARE = 0.3
+# Reposts copy one of this many most recent originals
+REPOST_WINDOW = 5000
+# Fixed epoch so dates do not depend on when the corpus is generated
+EPOCH = datetime(2025, 6, 1)
+
+SENIORITY = ["", "", "", "Junior ", "Senior ", "Lead ", "Principal "]
+ROLES = [
+    "IT Support Specialist",
+    "Help Desk Technician",
+    "Desktop Support Analyst",
+    "Service Desk Analyst",
+    "Technical Support Engineer",
+    "Computer Technician",
+    "Systems Administrator",
+    "Network Engineer",
+    "Field Service Technician",
+    "Software Engineer",
+    "Data Analyst",
+    "DevOps Engineer",
+    "QA Engineer",
+    "IT Manager",
+    "Customer Success Manager",
+    "Sales Development Representative",
+]
+TITLE_SUFFIXES = [
+    "", "", " I", " II", " III", " - Tier 1", " - Tier 2", " (Remote)", " (Hybrid)"
+]
+COMPANY_SYLLABLES = [
+    "ac", "ver", "lo", "tri", "nex", "sol", "ar", "quin", "bel", "mo", "dyn", "ora"
+]
+COMPANY_SUFFIXES = [
+    "Technologies", "Systems", "Solutions", "Group", "Labs", "Health", "Partners",
+    "Inc.", "LLC",
+]
+LOCATIONS = [
+    "Remote",
+    "United States",
+    "New York, NY",
+    "Austin, TX",
+    "Denver, CO",
+    "Toronto, ON",
+    "London, England, United Kingdom",
+    "Berlin, Germany",
+]
+TEAMS = [
+    "IT", "infrastructure", "end user computing", "support", "operations", "platform"
+]
+DUTIES = [
+    "troubleshoot hardware and software issues",
+    "image and deploy laptops",
+    "manage user accounts in Active Directory",
+    "resolve tickets in ServiceNow",
+    "support video conferencing rooms",
+    "document fixes in the knowledge base",
+    "escalate incidents to the network team",
+    "onboard new employees",
+    "maintain printers and peripherals",
+    "patch servers during maintenance windows",
+]
+SKILLS = [
+    "Windows 11",
+    "macOS",
+    "Microsoft 365",
+    "Intune",
+    "Jamf",
+    "Okta",
+    "TCP/IP",
+    "PowerShell",
+    "Python",
+    "Linux",
+    "Azure",
+    "ITIL",
+]
+SENTENCES = [
+    "We are looking for a {role} to join our {team} team.",
+    "You will {duty} and {other_duty}.",
+    "Day to day you will {duty}.",
+    "Experience with {skill} and {other_skill} is a plus.",
+    "Familiarity with {skill} is required.",
+    "This position reports to the {team} lead.",
+    "We offer competitive pay, health benefits and paid time off.",
+    "Our {team} team supports {count} employees across {offices} offices.",
+    "Candidates should be comfortable working with {skill}.",
+    "{company} is an equal opportunity employer.",
+]
+
+# Probability that a description mentions phrases of each config list
+PHRASE_RATES = {
+    "desc_include_words": 0.6,
+    "desc_exclude_words": 0.2,
+    "non_remote_phrases": 0.12,
+}
+BLOCKED_COMPANY_RATE = 0.03
+
+
+class CorpusGenerator:
+    """Iterates synthetic scraped jobs (Jobs column dictionaries) in a fixed order."""
+
+    def __init__(
+        self,
+        config: Optional[Mapping[str, Any]] = None,
+        seed: int = DEFAULT_SEED,
+        duplicate_rate: float = DEFAULT_DUPLICATE_RATE,
+        description_sentences: tuple = (6, 16),
+    ) -> None:
+        config = config or {}
+        self.seed = seed
+        self.duplicate_rate = duplicate_rate
+        self.description_sentences = description_sentences
+        self._phrases = {key: list(config.get(key) or []) for key in PHRASE_RATES}
+        self._blocked_companies = list(config.get("company_exclude") or [])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.jobs()
+
+    def jobs(self, size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield size jobs (forever if None); the i-th job never depends on size."""
+        rng = random.Random(self.seed)
+        recent: Deque[Dict[str, Any]] = deque(maxlen=REPOST_WINDOW)
+        index = 0
+        while size is None or index < size:
+            if recent and rng.random() < self.duplicate_rate:
+                job = self._repost(rng, rng.choice(recent), index)
+            else:
+                job = self._original(rng, index)
+                recent.append(job)
+            index += 1
+            yield job
+
+    def batches(self, size: int, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        batch: List[Dict[str, Any]] = []
+        for job in self.jobs(size):
+            batch.append(job)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _company(self, rng: random.Random) -> str:
+        if self._blocked_companies and rng.random() < BLOCKED_COMPANY_RATE:
+            return rng.choice(self._blocked_companies)
+        name = "".join(rng.choice(COMPANY_SYLLABLES) for _ in range(rng.randint(2, 3)))
+        return f"{name.capitalize()} {rng.choice(COMPANY_SUFFIXES)}"
+
+    def _description(self, rng: random.Random, role: str, company: str) -> str:
+        sentences = []
+        for _ in range(rng.randint(*self.description_sentences)):
+            sentences.append(
+                rng.choice(SENTENCES).format(
+                    role=role,
+                    team=rng.choice(TEAMS),
+                    duty=rng.choice(DUTIES),
+                    other_duty=rng.choice(DUTIES),
+                    skill=rng.choice(SKILLS),
+                    other_skill=rng.choice(SKILLS),
+                    company=company,
+                    count=rng.randrange(50, 5000, 50),
+                    offices=rng.randint(1, 30),
+                )
+            )
+        for key, rate in PHRASE_RATES.items():
+            phrases = self._phrases[key]
+            if phrases and rng.random() < rate:
+                for phrase in rng.sample(phrases, min(len(phrases), rng.randint(1, 3))):
+                    position = rng.randrange(len(sentences) + 1)
+                    sentences.insert(position, f"This role involves {phrase}.")
+        paragraphs = [
+            " ".join(sentences[i : i + 4]) for i in range(0, len(sentences), 4)
+        ]
+        return "\n\n".join(paragraphs)
+
+    def _original(self, rng: random.Random, index: int) -> Dict[str, Any]:
+        role = rng.choice(ROLES)
+        company = self._company(rng)
+        return {
+            "title": f"{rng.choice(SENIORITY)}{role}{rng.choice(TITLE_SUFFIXES)}",
+            "company": company,
+            "description": self._description(rng, role, company),
+            "location": rng.choice(LOCATIONS),
+            "date": EPOCH + timedelta(minutes=index),
+            "job_url": f"https://www.linkedin.com/jobs/view/{4_000_000_000 + index}/",
+        }
+
+    def _repost(
+        self, rng: random.Random, original: Dict[str, Any], index: int
+    ) -> Dict[str, Any]:
+        job = dict(original, date=EPOCH + timedelta(minutes=index))
+        if rng.random() < SAME_URL_SHARE:
+            # Same posting scraped again, with tracking parameters
+            job["job_url"] = f"{original['job_url']}?refId={index}&trackingId=bench"
+            return job
+        job["job_url"] = f"https://www.linkedin.com/jobs/view/{4_000_000_000 + index}/"
+        # Reposted under a new id with small edits
+        sentences = job["description"].split(". ")
+        if len(sentences) > 3:
+            del sentences[rng.randrange(len(sentences))]
+        job["description"] = ". ".join(sentences)
+        if rng.random() < 0.5:
+            job["location"] = rng.choice(LOCATIONS)
+        return job
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--duplicate-rate", type=float, default=DEFAULT_DUPLICATE_RATE)
+    parser.add_argument("--config", help="path to search_config.json")
+    args = parser.parse_args()
+
+    from shared.utils.search_config import load_search_config
+
+    generator = CorpusGenerator(
+        load_search_config(args.config), args.seed, args.duplicate_rate
+    )
+    for job in generator.jobs(args.size):
+        print(orjson.dumps(job).decode())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,576 @@
+"""
+Benchmark suite for the job pipeline.
+
+Cases run over the deterministic corpus of benchmarks.corpus, streamed in
+batches: timings accumulate batch by batch, so one pass over the largest
+size also records every smaller size (a prefix of it). Generating the
+corpus and preparing a case's input are never timed. Each size is run
+`repeat` times and the best run is kept. Results are written as JSON and
+`compare` reports the change against an earlier file.
+
+    python -m benchmarks.suite run --sizes 10000 100000 -o bench.json
+    python -m benchmarks.suite run --cases ingest --database-url "$BENCH_DB"
+    python -m benchmarks.suite compare base.json bench.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import orjson
+
+from benchmarks.corpus import DEFAULT_DUPLICATE_RATE, DEFAULT_SEED, CorpusGenerator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (10_000, 100_000)
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_TOLERANCE = 0.10
+CORPUS_CASES = ("filter", "scoring", "dedup", "to_dict", "ndjson", "ingest")
+CASES = CORPUS_CASES + ("workflow",)
+
+# The workflow case scrapes one fake query per this many corpus jobs
+JOBS_PER_QUERY = 1000
+MAX_WORKFLOW_QUERIES = 1000
+INGEST_SCHEMA = "bench_ingest"
+
+
+class Case:
+    """One benchmarked operation, fed the corpus a batch at a time."""
+
+    name = ""
+
+    def __init__(self, config: Mapping[str, Any]) -> None:
+        self.config = config
+        self.counters: Dict[str, int] = {}
+
+    async def setup(self) -> None:
+        """Fresh state for a run."""
+        self.counters = {}
+
+    def prepare(self, batch: List[Dict[str, Any]], offset: int) -> Any:
+        """Untimed conversion of corpus jobs into the case's input."""
+        return batch
+
+    async def run(self, prepared: Any) -> None:
+        raise NotImplementedError
+
+    async def teardown(self) -> None:
+        pass
+
+    def count(self, name: str, value: int) -> None:
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+
+class FilterCase(Case):
+    """KeywordFilter over title, company and description."""
+
+    name = "filter"
+
+    async def setup(self) -> None:
+        from shared.utils.keyword_filter import KeywordFilter
+
+        await super().setup()
+        self.keyword_filter = KeywordFilter.from_config(self.config)
+
+    async def run(self, prepared: Any) -> None:
+        results = self.keyword_filter.evaluate_batch(prepared)
+        self.count("relevant", sum(result.relevant for result in results))
+
+
+class ScoringCase(Case):
+    """Vectorized JobScorer on a columnar batch."""
+
+    name = "scoring"
+
+    async def setup(self) -> None:
+        from shared.utils.scoring import JobScorer
+
+        await super().setup()
+        self.scorer = JobScorer.from_config(self.config)
+
+    def prepare(self, batch: List[Dict[str, Any]], offset: int) -> Any:
+        import pandas as pd
+
+        return pd.DataFrame(batch)
+
+    async def run(self, prepared: Any) -> None:
+        scores = self.scorer.evaluate(prepared)
+        self.count("relevant", scores["relevant"].sum())
+        self.count("promising", scores["promising"].sum())
+
+
+class DedupCase(Case):
+    """MinHash/LSH near-duplicate detection, one index over the whole run."""
+
+    name = "dedup"
+
+    async def setup(self) -> None:
+        from shared.utils.dedup import DedupIndex
+
+        await super().setup()
+        self.index = DedupIndex()
+
+    def prepare(self, batch: List[Dict[str, Any]], offset: int) -> Any:
+        return [dict(job, id=offset + i + 1) for i, job in enumerate(batch)]
+
+    async def run(self, prepared: Any) -> None:
+        self.count("duplicates", len(self.index.apply_batch(prepared)))
+
+
+def _job_values(batch: List[Dict[str, Any]], offset: int) -> List[Dict[str, Any]]:
+    from shared.db.models import JobSource
+    from shared.utils.urls import job_url_hash
+
+    return [
+        dict(
+            job,
+            id=offset + i + 1,
+            job_source=JobSource.LINKEDIN,
+            job_url_hash=job_url_hash(job["job_url"]),
+            created_at=job["date"],
+            updated_at=job["date"],
+            new=True,
+            duplicate=False,
+            relevant=False,
+            promising=False,
+            notified=False,
+            config_version=None,
+        )
+        for i, job in enumerate(batch)
+    ]
+
+
+class ToDictCase(Case):
+    """Jobs.to_dict on ORM objects."""
+
+    name = "to_dict"
+
+    def prepare(self, batch: List[Dict[str, Any]], offset: int) -> Any:
+        from shared.db.models import Jobs
+
+        return [Jobs(**values) for values in _job_values(batch, offset)]
+
+    async def run(self, prepared: Any) -> None:
+        self.count("rows", len([job.to_dict() for job in prepared]))
+
+
+class NdjsonCase(Case):
+    """Compiled row serializer encoding result rows as NDJSON."""
+
+    name = "ndjson"
+
+    def prepare(self, batch: List[Dict[str, Any]], offset: int) -> Any:
+        from shared.db.models import JOB_SERIALIZER
+
+        keys = JOB_SERIALIZER.keys
+        return [
+            tuple(values[key] for key in keys) for values in _job_values(batch, offset)
+        ]
+
+    async def run(self, prepared: Any) -> None:
+        from shared.db.models import JOB_SERIALIZER
+
+        self.count("bytes", len(JOB_SERIALIZER.dumps_lines(prepared)))
+
+
+class IngestCase(Case):
+    """
+    bulk_upsert_jobs into Postgres, one transaction per batch. Tables live
+    in their own schema (INGEST_SCHEMA), emptied before every run, so any
+    database can be used.
+    """
+
+    name = "ingest"
+
+    def __init__(self, config: Mapping[str, Any], database_url: str) -> None:
+        super().__init__(config)
+        self.database_url = database_url
+        self.engine = None
+
+    async def setup(self) -> None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        from shared.db.database import Base
+        import shared.db.models  # noqa: F401  (registers the tables)
+
+        await super().setup()
+        self.engine = create_async_engine(
+            self.database_url,
+            connect_args={"server_settings": {"search_path": INGEST_SCHEMA}},
+        )
+        async with self.engine.begin() as conn:
+            await conn.exec_driver_sql(
+                f"CREATE SCHEMA IF NOT EXISTS {INGEST_SCHEMA}"
+            )
+            await conn.run_sync(Base.metadata.create_all)
+            tables = ", ".join(
+                f"{INGEST_SCHEMA}.{table.name}"
+                for table in Base.metadata.sorted_tables
+            )
+            await conn.exec_driver_sql(
+                f"TRUNCATE {tables} RESTART IDENTITY CASCADE"
+            )
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def run(self, prepared: Any) -> None:
+        from shared.db.ingest import bulk_upsert_jobs
+
+        async with self.session_maker() as session:
+            result = await bulk_upsert_jobs(prepared, session)
+            await session.commit()
+        for name, value in result.summary().items():
+            self.count(name, value)
+
+    async def teardown(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+
+
+def _best(runs: List[Dict[str, Any]], size: int) -> Dict[str, Any]:
+    seconds = [run["seconds"] for run in runs]
+    best = min(seconds)
+    return {
+        "seconds": round(best, 6),
+        "runs": [round(value, 6) for value in seconds],
+        "jobs_per_second": round(size / best, 1) if best else None,
+        "counters": runs[seconds.index(best)]["counters"],
+    }
+
+
+async def run_corpus_cases(
+    cases: Sequence[Case],
+    generator: CorpusGenerator,
+    sizes: Sequence[int],
+    repeat: int,
+    batch_size: int,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Stream the largest corpus through every case `repeat` times and record,
+    for each size, the time spent on its prefix.
+    """
+    checkpoints = sorted(set(sizes))
+    runs: Dict[str, Dict[int, List[Dict[str, Any]]]] = {
+        case.name: {size: [] for size in checkpoints} for case in cases
+    }
+    for attempt in range(repeat):
+        elapsed = {case.name: 0.0 for case in cases}
+        for case in cases:
+            await case.setup()
+        jobs = generator.jobs(checkpoints[-1])
+        offset = 0
+        pending = list(checkpoints)
+        try:
+            while pending:
+                # Batches end exactly on checkpoints
+                size = min(batch_size, pending[0] - offset)
+                batch = list(itertools.islice(jobs, size))
+                for case in cases:
+                    prepared = case.prepare(batch, offset)
+                    started = time.perf_counter()
+                    await case.run(prepared)
+                    elapsed[case.name] += time.perf_counter() - started
+                offset += size
+                if offset == pending[0]:
+                    pending.pop(0)
+                    for case in cases:
+                        runs[case.name][offset].append(
+                            {
+                                "seconds": elapsed[case.name],
+                                "counters": dict(case.counters),
+                            }
+                        )
+                    logger.info(
+                        f"Run {attempt + 1}/{repeat} at {offset} jobs: "
+                        + ", ".join(f"{k}={v:.3f}s" for k, v in elapsed.items())
+                    )
+        finally:
+            for case in cases:
+                await case.teardown()
+    return {
+        name: {str(size): _best(found, size) for size, found in per_size.items()}
+        for name, per_size in runs.items()
+    }
+
+
+def _workflow_activities(queries: int, jobs_per_query: int) -> List[Any]:
+    """Stand-ins for the pipeline's activities that return at once."""
+    from temporalio import activity
+
+    @activity.defn(name="load_search_plan")
+    async def load_search_plan(params: Any = None) -> Dict[str, Any]:
+        return {
+            "queries": [
+                {"keywords": f"query {i}", "location": str(i), "f_WT": ""}
+                for i in range(queries)
+            ],
+            "pages_to_scrape": 1,
+            "rounds": 1,
+            "timespan": "",
+            "skipped": 0,
+            "saved_requests": 0,
+        }
+
+    @activity.defn(name="scrape_search_query")
+    async def scrape_search_query(params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"found": jobs_per_query, "inserted": jobs_per_query}
+
+    @activity.defn(name="score_new_jobs")
+    async def score_new_jobs(params: Any = None) -> Dict[str, int]:
+        return {"scored": queries * jobs_per_query, "promising": 0}
+
+    return [load_search_plan, scrape_search_query, score_new_jobs]
+
+
+async def run_workflow_case(
+    sizes: Sequence[int], repeat: int, test_server_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    MainPipelineWorkflow in Temporal's time-skipping test environment with
+    instant activities: what the orchestration itself costs for a corpus
+    of each size, one query per JOBS_PER_QUERY jobs.
+    """
+    controller = os.path.join(os.path.dirname(os.path.dirname(__file__)), "controller")
+    if controller not in sys.path:
+        sys.path.insert(0, controller)
+    try:
+        from temporalio.testing import WorkflowEnvironment
+        from temporalio.worker import Worker
+        from workflows.main_pipeline_workflow import MainPipelineWorkflow
+
+        env = await WorkflowEnvironment.start_time_skipping(
+            test_server_existing_path=test_server_path
+        )
+    except Exception as e:
+        logger.warning(f"Skipping workflow benchmark: {e}")
+        return {"skipped": str(e)}
+
+    results: Dict[str, Any] = {}
+    try:
+        for size in sorted(set(sizes)):
+            queries = min(max(1, size // JOBS_PER_QUERY), MAX_WORKFLOW_QUERIES)
+            task_queue = f"bench-{uuid.uuid4()}"
+            runs = []
+            async with Worker(
+                env.client,
+                task_queue=task_queue,
+                workflows=[MainPipelineWorkflow],
+                activities=_workflow_activities(queries, size // queries),
+            ):
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    outcome = await env.client.execute_workflow(
+                        MainPipelineWorkflow.run,
+                        {},
+                        id=f"bench-{uuid.uuid4()}",
+                        task_queue=task_queue,
+                    )
+                    runs.append(
+                        {
+                            "seconds": time.perf_counter() - started,
+                            "counters": {
+                                "queries": outcome.get("queries", 0),
+                                "queries_failed": outcome.get("queries_failed", 0),
+                                "jobs_found": outcome.get("jobs_found", 0),
+                            },
+                        }
+                    )
+            results[str(size)] = _best(runs, size)
+            logger.info(
+                f"Workflow with {queries} queries: {results[str(size)]['seconds']}s"
+            )
+    finally:
+        await env.shutdown()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_suite(
+    config: Mapping[str, Any],
+    cases: Sequence[str] = CASES,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeat: int = 3,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: int = DEFAULT_SEED,
+    duplicate_rate: float = DEFAULT_DUPLICATE_RATE,
+    database_url: Optional[str] = None,
+    test_server_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the selected cases and return the results document."""
+    factories = {
+        "filter": FilterCase,
+        "scoring": ScoringCase,
+        "dedup": DedupCase,
+        "to_dict": ToDictCase,
+        "ndjson": NdjsonCase,
+    }
+    results: Dict[str, Any] = {}
+    selected: List[Case] = []
+    for name in cases:
+        if name in factories:
+            selected.append(factories[name](config))
+        elif name == "ingest":
+            if database_url:
+                selected.append(IngestCase(config, database_url))
+            else:
+                results["ingest"] = {"skipped": "no --database-url given"}
+
+    generator = CorpusGenerator(config, seed, duplicate_rate)
+    if selected:
+        results.update(
+            await run_corpus_cases(selected, generator, sizes, repeat, batch_size)
+        )
+    if "workflow" in cases:
+        results["workflow"] = await run_workflow_case(sizes, repeat, test_server_path)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+            "duplicate_rate": duplicate_rate,
+            "sizes": sorted(set(sizes)),
+            "repeat": repeat,
+            "batch_size": batch_size,
+            "config_sha256": hashlib.sha256(
+                orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+            ).hexdigest(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    base: Mapping[str, Any],
+    current: Mapping[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Per case and size, the time ratio current/base; a ratio above
+    1 + tolerance is a regression.
+    """
+    rows = []
+    for case, per_size in current["results"].items():
+        base_sizes = base["results"].get(case) or {}
+        for size, result in per_size.items():
+            if not isinstance(result, dict) or size not in base_sizes:
+                continue
+            before, after = base_sizes[size]["seconds"], result["seconds"]
+            ratio = after / before if before else None
+            rows.append(
+                {
+                    "case": case,
+                    "size": int(size),
+                    "base_seconds": before,
+                    "seconds": after,
+                    "ratio": round(ratio, 3) if ratio is not None else None,
+                    "regression": ratio is not None and ratio > 1 + tolerance,
+                }
+            )
+    return rows
+
+
+def _print_results(document: Mapping[str, Any]) -> None:
+    for case, per_size in document["results"].items():
+        if "skipped" in per_size:
+            print(f"{case:<10} skipped: {per_size['skipped']}")
+            continue
+        for size, result in per_size.items():
+            rate = result["jobs_per_second"]
+            print(
+                f"{case:<10} {int(size):>9,} jobs {result['seconds']:>10.3f}s"
+                f" {rate or 0:>12,.0f} jobs/s  {result['counters']}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    run.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run.add_argument("--duplicate-rate", type=float, default=DEFAULT_DUPLICATE_RATE)
+    run.add_argument("--config", help="path to search_config.json")
+    run.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        help=f"Postgres for the ingest case (uses schema {INGEST_SCHEMA})",
+    )
+    run.add_argument(
+        "--temporal-test-server", help="existing temporal-test-server executable"
+    )
+    run.add_argument("-o", "--output", default="bench.json")
+    diff = commands.add_parser("compare", help="compare two result files")
+    diff.add_argument("base")
+    diff.add_argument("current")
+    diff.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "compare":
+        with open(args.base, "rb") as f:
+            base = orjson.loads(f.read())
+        with open(args.current, "rb") as f:
+            current = orjson.loads(f.read())
+        rows = compare(base, current, args.tolerance)
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['case']:<10} {row['size']:>9,} jobs"
+                f" {row['base_seconds']:>10.3f}s -> {row['seconds']:>10.3f}s"
+                f"  x{row['ratio']}{flag}"
+            )
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+    from shared.utils.search_config import load_search_config
+
+    document = asyncio.run(
+        run_suite(
+            load_search_config(args.config),
+            cases=args.cases,
+            sizes=args.sizes,
+            repeat=args.repeat,
+            batch_size=args.batch_size,
+            seed=args.seed,
+            duplicate_rate=args.duplicate_rate,
+            database_url=args.database_url,
+            test_server_path=args.temporal_test_server,
+        )
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(orjson.dumps(document, option=orjson.OPT_INDENT_2))
+    _print_results(document)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, TypedDict
+
+from temporalio import activity
+
+from shared.db.dedup import mark_duplicates
+from shared.utils.dedup import DEFAULT_INDEX_PATH, DedupIndex
+
+logger = logging.getLogger(__name__)
+
+# Snapshot the worker's index at most this often; a restarted worker only
+# catches up on the jobs stored after its snapshot
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("DEDUP_SNAPSHOT_INTERVAL_SEC", "300"))
+
+
+class DedupJobsInput(TypedDict, total=False):
+    """Ids of newly inserted jobs to check for near-duplicates."""
+
+    job_ids: List[int]
+
+
+_index: Optional[DedupIndex] = None
+_index_lock = asyncio.Lock()
+# The index is mutated on a thread; one check or snapshot at a time
+dedup_index_lock = asyncio.Lock()
+_saved_at = 0.0
+
+
+async def get_dedup_index() -> DedupIndex:
+    """Worker-wide dedup index, loaded from its snapshot on first use."""
+    global _index, _saved_at
+    if _index is None:
+        async with _index_lock:
+            if _index is None:
+                _index = await DedupIndex.load_or_rebuild(DEFAULT_INDEX_PATH)
+                _saved_at = time.monotonic()
+    return _index
+
+
+async def maybe_save_dedup_index() -> None:
+    """Snapshot the index if the interval has passed."""
+    global _saved_at
+    if _index is not None and time.monotonic() - _saved_at >= SNAPSHOT_INTERVAL_SECONDS:
+        _saved_at = time.monotonic()
+        await asyncio.to_thread(_index.save, DEFAULT_INDEX_PATH)
+
+
+@activity.defn
+async def dedup_new_jobs(params: Optional[DedupJobsInput] = None) -> Dict[str, Any]:
+    """Mark the given new jobs that near-duplicate an earlier posting."""
+    params = params or {}
+    index = await get_dedup_index()
+    async with dedup_index_lock:
+        report = await mark_duplicates(index, params.get("job_ids") or [])
+        await maybe_save_dedup_index()
+    return report.summary()
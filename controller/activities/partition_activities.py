@@ -0,0 +1,58 @@
+import logging
+from typing import Any, Dict, List, Optional, TypedDict
+
+from temporalio import activity
+
+from shared.db.partitions import (
+    DEFAULT_ARCHIVE_DIR,
+    DEFAULT_KEEP_MONTHS,
+    DEFAULT_MONTHS_AHEAD,
+    archive_partitions,
+    ensure_partitions,
+    list_partitions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EnsurePartitionsInput(TypedDict, total=False):
+    """Options for creating upcoming monthly partitions of jobs."""
+
+    months_ahead: int
+
+
+class ArchivePartitionsInput(TypedDict, total=False):
+    """Options for archiving monthly partitions past the retention."""
+
+    keep_months: int
+    mode: str
+    archive_dir: Optional[str]
+
+
+@activity.defn
+async def ensure_job_partitions(
+    params: Optional[EnsurePartitionsInput] = None,
+) -> Dict[str, Any]:
+    """Create the jobs partitions of the current and upcoming months."""
+    params = params or {}
+    created = await ensure_partitions(params.get("months_ahead", DEFAULT_MONTHS_AHEAD))
+    partitions = await list_partitions()
+    return {
+        "created": created,
+        "partitions": len(partitions),
+        "default_rows": sum(p.estimated_rows for p in partitions if p.is_default),
+    }
+
+
+@activity.defn
+async def archive_job_partitions(
+    params: Optional[ArchivePartitionsInput] = None,
+) -> List[Dict[str, Any]]:
+    """Detach or archive to Parquet the jobs partitions past the retention."""
+    params = params or {}
+    results = await archive_partitions(
+        keep_months=params.get("keep_months", DEFAULT_KEEP_MONTHS),
+        mode=params.get("mode", "parquet"),
+        archive_dir=params.get("archive_dir") or DEFAULT_ARCHIVE_DIR,
+    )
+    return [result.to_dict() for result in results]
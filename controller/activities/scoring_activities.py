@@ -0,0 +1,55 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, TypedDict
+
+from sqlalchemy import func, select
+from temporalio import activity
+
+from shared.db.database import get_db
+from shared.db.models import Jobs
+from shared.db.scoring import DEFAULT_BATCH_SIZE, score_pending
+from shared.utils.config_service import current_config
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreJobsInput(TypedDict, total=False):
+    """Options for scoring the jobs waiting in the FILTER stage."""
+
+    config_path: Optional[str]
+    batch_size: int
+    max_batches: int
+
+
+@activity.defn
+async def score_new_jobs(params: Optional[ScoreJobsInput] = None) -> Dict[str, Any]:
+    """Score every new job in batches and set its relevant/promising flags."""
+    params = params or {}
+    # Compiled once per worker, recompiled only after the file changes
+    snapshot = current_config(params.get("config_path"))
+    report = await score_pending(
+        snapshot.scorer,
+        batch_size=params.get("batch_size", DEFAULT_BATCH_SIZE),
+        max_batches=params.get("max_batches", 0),
+        config_version=snapshot.version,
+    )
+    return {**report.summary(), "config_version": snapshot.version}
+
+
+class CountAlertedInput(TypedDict):
+    """Jobs created at or after since (ISO 8601) are counted."""
+
+    since: str
+
+
+@activity.defn
+async def count_alerted_jobs(params: CountAlertedInput) -> int:
+    """Number of jobs created since the given time that were alerted."""
+    # created_at is naive local time; partitions before since are pruned
+    since = datetime.fromisoformat(params["since"]).astimezone().replace(tzinfo=None)
+    async with get_db() as session:
+        return await session.scalar(
+            select(func.count())
+            .select_from(Jobs)
+            .where(Jobs.created_at >= since, Jobs.notified.is_(True))
+        )
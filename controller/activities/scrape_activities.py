@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, TypedDict
+
+import aiohttp
+from temporalio import activity
+from temporalio.exceptions import ApplicationError
+
+from activities.dedup_activities import (
+    dedup_index_lock,
+    get_dedup_index,
+    maybe_save_dedup_index,
+)
+from shared.clients.http_cache import HttpCache
+from shared.clients.http_fetcher import (
+    DEFAULT_BURST,
+    DEFAULT_RATE,
+    HttpFetcher,
+    ThrottledError,
+)
+from shared.clients.page_archive import (
+    DEFAULT_PAGE_ARCHIVE_DIR,
+    PAGE_DETAIL,
+    PAGE_SEARCH,
+    PageArchive,
+)
+from shared.db.database import get_db
+from shared.db.ingest import bulk_upsert_jobs, existing_job_url_hashes
+from shared.db.models import SearchRuns
+from shared.db.replay import replay_archive
+from shared.db.scoring import rescore_jobs
+from shared.scrapers import linkedin
+from shared.utils.metrics import (
+    QUERY_DURATION,
+    QUERY_JOBS_FOUND,
+    QUERY_JOBS_INSERTED,
+    QUERY_REQUESTS,
+    STAGE_DURATION,
+    STAGE_ITEMS,
+)
+from shared.utils.config_service import current_config
+from shared.utils.cpu_pool import run_cpu
+from shared.utils.query_planner import plan_from_db
+from shared.utils.search_config import query_key, query_source
+from shared.utils.seen_urls import SeenUrls
+from shared.utils.urls import job_url_hash
+
+logger = logging.getLogger(__name__)
+
+# Requests per second each host may receive from the whole worker; every
+# worker process gets an equal share, see configure_rate_budget
+HOST_RATES = {"www.linkedin.com": 1.0}
+DETAIL_CONCURRENCY = 5
+SEARCH_PAGE_TTL_SECONDS = 15 * 60
+DETAIL_PAGE_TTL_SECONDS = 7 * 24 * 3600
+# Keep every fetched page in the page archive for offline replay
+ARCHIVE_PAGES = os.getenv("PAGE_ARCHIVE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+class PlanInput(TypedDict, total=False):
+    """Options for planning a scrape round."""
+
+    config_path: Optional[str]
+    skip_after: int
+    merge_keywords: bool
+
+
+class SearchPlan(TypedDict):
+    """Planned search queries and paging settings."""
+
+    queries: List[Dict[str, Any]]
+    pages_to_scrape: int
+    rounds: int
+    timespan: str
+    skipped: int
+    saved_requests: int
+
+
+class ScrapeQueryInput(TypedDict, total=False):
+    """Input for scraping a single search query."""
+
+    query: Dict[str, Any]
+    pages: int
+    timespan: str
+    incremental: bool
+    archive_pages: bool
+
+
+class ScrapeQueryResult(TypedDict, total=False):
+    """Outcome of scraping a single search query."""
+
+    query: str
+    source: str
+    pages: int
+    stopped_early: bool
+    found: int
+    details_skipped: int
+    inserted: int
+    inserted_ids: List[int]
+    updated: int
+    duration_seconds: float
+    cache_hits: int
+    cache_bytes_saved: int
+    pages_archived: int
+    error: Optional[str]
+
+
+class ReplayInput(TypedDict, total=False):
+    """Archived pages to replay, by fetch time (ISO 8601)."""
+
+    since: Optional[str]
+    until: Optional[str]
+    workers: int
+    archive_dir: Optional[str]
+    config_path: Optional[str]
+    rescore: bool
+
+
+_fetcher: Optional[HttpFetcher] = None
+_cache: Optional[HttpCache] = None
+_seen: Optional[SeenUrls] = None
+_archive: Optional[PageArchive] = None
+_seen_lock = asyncio.Lock()
+
+
+_rate_share = 1.0
+
+
+def configure_rate_budget(processes: int) -> None:
+    """
+    Limit this process to its share of the per-host rates when `processes`
+    worker processes scrape at once, each with its own token buckets.
+    """
+    global _rate_share
+    _rate_share = 1.0 / max(1, processes)
+
+
+def _get_fetcher() -> HttpFetcher:
+    """Process-wide fetcher so connections and rate budgets are shared."""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = HttpFetcher(
+            host_rates={host: rate * _rate_share for host, rate in HOST_RATES.items()},
+            default_rate=DEFAULT_RATE * _rate_share,
+            burst=max(1, round(DEFAULT_BURST * _rate_share)),
+        )
+    return _fetcher
+
+
+def _get_cache() -> HttpCache:
+    """Worker-wide response cache."""
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
+
+
+def _get_archive() -> PageArchive:
+    """Worker-wide page archive, writing to segments of this process."""
+    global _archive
+    if _archive is None:
+        _archive = PageArchive()
+    return _archive
+
+
+async def _get_seen_urls() -> SeenUrls:
+    """Worker-wide seen-URL set, loaded from its snapshot on first use."""
+    global _seen
+    if _seen is None:
+        async with _seen_lock:
+            if _seen is None:
+                _seen = await SeenUrls.load_or_rebuild()
+    return _seen
+
+
+async def _fetch_text(
+    url: str, ttl_seconds: float = SEARCH_PAGE_TTL_SECONDS, allow_stale: bool = False
+) -> Optional[str]:
+    return await _get_cache().fetch(
+        _get_fetcher(), url, ttl_seconds=ttl_seconds, allow_stale=allow_stale
+    )
+
+
+async def _fetch_descriptions(
+    jobs: List[Dict[str, Any]],
+    known: Set[str],
+    skip_known: bool,
+    archive: Optional[PageArchive] = None,
+) -> int:
+    """
+    Fill in job descriptions from the detail pages and return how many
+    were skipped. Pages of postings in `known` (already stored) are skipped
+    entirely with skip_known, otherwise served from the cache without
+    revalidation. Fetched pages are added to archive if given.
+    """
+    semaphore = asyncio.Semaphore(DETAIL_CONCURRENCY)
+    skipped = 0
+
+    async def fetch(job: Dict[str, Any]) -> None:
+        url = linkedin.build_job_detail_url(job["job_url"])
+        if not url:
+            return
+        async with semaphore:
+            try:
+                html = await _fetch_text(
+                    url,
+                    ttl_seconds=DETAIL_PAGE_TTL_SECONDS,
+                    allow_stale=job["job_url_hash"] in known,
+                )
+            except (aiohttp.ClientError, ThrottledError) as e:
+                logger.warning(f"Failed to fetch job detail {url}: {e}")
+                return
+        if html:
+            if archive is not None:
+                # Compression and disk writes, off the loop
+                await asyncio.to_thread(archive.append, PAGE_DETAIL, url, html)
+            job["description"] = await run_cpu(linkedin.parse_job_description, html)
+
+    pending = []
+    for job in jobs:
+        if skip_known and job["job_url_hash"] in known:
+            skipped += 1
+        else:
+            pending.append(fetch(job))
+    await asyncio.gather(*pending)
+    return skipped
+
+
+@activity.defn
+async def load_search_plan(params: Optional[PlanInput] = None) -> SearchPlan:
+    """Load search_config.json and plan the queries to scrape this round."""
+    params = params or {}
+    config = current_config(params.get("config_path")).config
+    options = {k: params[k] for k in ("skip_after", "merge_keywords") if k in params}
+    plan = await plan_from_db(config, **options)
+    logger.info(
+        f"Planned {len(plan.queries)} queries from {plan.original_queries}, "
+        f"{plan.saved_requests} requests saved"
+    )
+    return {
+        "queries": [planned.query for planned in plan.queries],
+        "pages_to_scrape": plan.pages_to_scrape,
+        "rounds": plan.rounds,
+        "timespan": config.get("timespan", ""),
+        "skipped": len(plan.skipped),
+        "saved_requests": plan.saved_requests,
+    }
+
+
+@activity.defn
+async def scrape_search_query(params: ScrapeQueryInput) -> ScrapeQueryResult:
+    """Scrape every page of one search query and bulk upsert the jobs found."""
+    query = params["query"]
+    key = query_key(query)
+    source = query_source(query)
+    if source != "linkedin":
+        raise ApplicationError(
+            f"No scraper for job source {source!r}", non_retryable=True
+        )
+
+    incremental = params.get("incremental", True)
+    seen = await _get_seen_urls()
+    archive = _get_archive() if params.get("archive_pages", ARCHIVE_PAGES) else None
+    archived_before = archive.appended if archive is not None else 0
+
+    started_at = datetime.now()
+    started = time.monotonic()
+    cache_stats = _get_cache().stats
+    hits_before = cache_stats.hits + cache_stats.revalidated
+    saved_before = cache_stats.bytes_saved
+    jobs: List[Dict[str, Any]] = []
+    pages = 0
+    stopped_early = False
+    for page in range(params.get("pages", 1)):
+        url = linkedin.build_search_url(query, params.get("timespan", ""), page)
+        html = await _fetch_text(url)
+        pages += 1
+        if html and archive is not None:
+            await asyncio.to_thread(archive.append, PAGE_SEARCH, url, html)
+        page_jobs = await run_cpu(linkedin.parse_search_results, html or "")
+        activity.heartbeat(page)
+        if not page_jobs:
+            break
+        for job in page_jobs:
+            job["job_url_hash"] = job_url_hash(job["job_url"])
+        jobs.extend(page_jobs)
+        # Results are newest first: a page of only known postings means the
+        # remaining pages hold nothing new either
+        if incremental and all(seen.seen_hash(job["job_url_hash"]) for job in page_jobs):
+            stopped_early = page + 1 < params.get("pages", 1)
+            break
+
+    # Bloom positives may be false, so confirm them before skipping anything
+    maybe_known = [job["job_url_hash"] for job in jobs if seen.seen_hash(job["job_url_hash"])]
+    known = await existing_job_url_hashes(maybe_known)
+    details_skipped = await _fetch_descriptions(
+        jobs, known, skip_known=incremental, archive=archive
+    )
+    STAGE_DURATION.labels("scrape").observe(time.monotonic() - started)
+    STAGE_ITEMS.labels("scrape").inc(len(jobs))
+
+    async with get_db() as session:
+        ingest = await bulk_upsert_jobs(jobs, session)
+        session.add(
+            SearchRuns(
+                query_key=key,
+                started_at=started_at,
+                requests=pages,
+                found=len(jobs),
+                inserted=len(ingest.inserted),
+            )
+        )
+    for job in jobs:
+        seen.add_hash(job["job_url_hash"])
+    await seen.maybe_save()
+
+    duration = time.monotonic() - started
+    QUERY_DURATION.labels(key).observe(duration)
+    QUERY_REQUESTS.labels(key).inc(pages)
+    QUERY_JOBS_FOUND.labels(key).inc(len(jobs))
+    QUERY_JOBS_INSERTED.labels(key).inc(len(ingest.inserted))
+
+    result: ScrapeQueryResult = {
+        "query": key,
+        "source": source,
+        "pages": pages,
+        "stopped_early": stopped_early,
+        "found": len(jobs),
+        "details_skipped": details_skipped,
+        "inserted": len(ingest.inserted),
+        "inserted_ids": ingest.inserted_ids,
+        "updated": len(ingest.updated),
+        "duration_seconds": round(duration, 3),
+        "cache_hits": cache_stats.hits + cache_stats.revalidated - hits_before,
+        "cache_bytes_saved": cache_stats.bytes_saved - saved_before,
+        "pages_archived": archive.appended - archived_before if archive is not None else 0,
+    }
+    logger.info(f"Scraped {key}: { {k: v for k, v in result.items() if k != 'inserted_ids'} }")
+    return result
+
+
+@activity.defn
+async def replay_archived_pages(params: Optional[ReplayInput] = None) -> Dict[str, Any]:
+    """
+    Parse and ingest the archived search pages instead of scraping; with
+    rescore also rescore the jobs scored under an older search config.
+    """
+    params = params or {}
+    archive = PageArchive(params.get("archive_dir") or DEFAULT_PAGE_ARCHIVE_DIR)
+    try:
+        report = await replay_archive(
+            archive,
+            since=datetime.fromisoformat(params["since"]) if params.get("since") else None,
+            until=datetime.fromisoformat(params["until"]) if params.get("until") else None,
+            workers=params.get("workers", 4),
+            # The worker's index, shared with dedup_new_jobs
+            dedup_index=await get_dedup_index(),
+            dedup_lock=dedup_index_lock,
+        )
+    finally:
+        archive.close()
+    async with dedup_index_lock:
+        await maybe_save_dedup_index()
+    result = report.to_dict()
+    if params.get("rescore"):
+        snapshot = current_config(params.get("config_path"))
+        rescored = await rescore_jobs(
+            snapshot.scorer, config_version=snapshot.version, stale_only=True
+        )
+        result["rescored"] = rescored.summary()
+    return result
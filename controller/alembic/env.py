@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 from sqlalchemy import engine_from_config, pool
 
 from alembic import context
-from shared.db.database import Base
+from shared.db.database import Base, DatabaseSettings
 from shared.db.models import *  # noqa: F403
 
 # this is the Alembic Config object, which provides
@@ -20,14 +20,10 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-POSTGRES_USER='default_user'
-POSTGRES_PASSWORD='default_pass'
-POSTGRES_HOST='postgres'
-POSTGRES_PORT=5432
-POSTGRES_DB='jobdb'
-db_url = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Same settings as the services (DATABASE_URL or POSTGRES_*), sync driver
+db_url = DatabaseSettings().DATABASE_URL_SYNC
 
-config.set_main_option("sqlalchemy.url", db_url)
+config.set_main_option("sqlalchemy.url", db_url.replace("%", "%%"))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -0,0 +1,104 @@
+"""add job_url_hash
+
+Revision ID: 7c1e2a9b5d40
+Revises: 4b7f230d3fac
+Create Date: 2026-10-17 09:00:00.000000+00:00
+
+"""
+import hashlib
+import logging
+import re
+from typing import Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e2a9b5d40'
+down_revision: Union[str, None] = '4b7f230d3fac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# URL normalization as of this revision (shared.utils.urls.job_url_hash),
+# frozen here so later changes to the application cannot alter the backfill
+_TRACKING_PARAMS = {
+    "currentjobid", "eborigin", "from", "geoid", "originalsubdomain", "pagenum",
+    "position", "refid", "trackingid", "trk", "tk", "vjs",
+}
+_LINKEDIN_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/]*?-)?(\d+)/?$")
+
+
+def _job_url_hash(url):
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = parts.netloc.lower()
+    if host.endswith("linkedin.com"):
+        host = "www.linkedin.com"
+    path = parts.path.rstrip("/") or "/"
+    match = _LINKEDIN_JOB_ID_RE.search(path) if "linkedin.com" in host else None
+    if match:
+        normalized = f"{scheme}://{host}/jobs/view/{match.group(1)}"
+    else:
+        query = sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=False)
+            if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith("utm_")
+        )
+        normalized = urlunsplit((scheme, host, path, urlencode(query), ""))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('job_url_hash', sa.String(length=64), nullable=True))
+
+    # Backfill in batches with the same normalization the application uses
+    conn = op.get_bind()
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, job_url FROM jobs WHERE job_url_hash IS NULL "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        conn.execute(
+            sa.text("UPDATE jobs SET job_url_hash = :hash WHERE id = :id"),
+            [{"id": row.id, "hash": _job_url_hash(row.job_url)} for row in rows],
+        )
+
+    # Keep the earliest row for each posting before enforcing uniqueness,
+    # carrying over how far any copy got through the pipeline: a posting
+    # one copy was alerted for must not be alerted again
+    conn.execute(sa.text(
+        "UPDATE jobs SET new = merged.new, relevant = merged.relevant, "
+        "promising = merged.promising, notified = merged.notified "
+        "FROM ("
+        "  SELECT min(id) AS id, bool_and(coalesce(new, false)) AS new, "
+        "  bool_or(coalesce(relevant, false)) AS relevant, "
+        "  bool_or(coalesce(promising, false)) AS promising, "
+        "  bool_or(coalesce(notified, false)) AS notified "
+        "  FROM jobs GROUP BY job_url_hash HAVING count(*) > 1"
+        ") merged WHERE jobs.id = merged.id"
+    ))
+    removed = conn.execute(sa.text(
+        "DELETE FROM jobs a USING jobs b "
+        "WHERE a.job_url_hash = b.job_url_hash AND a.id > b.id"
+    )).rowcount
+    logger.info(f"Removed {removed} duplicate job rows sharing a job_url_hash")
+    op.alter_column('jobs', 'job_url_hash', nullable=False)
+    op.create_unique_constraint('uq_jobs_job_url_hash', 'jobs', ['job_url_hash'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_jobs_job_url_hash', 'jobs', type_='unique')
+    op.drop_column('jobs', 'job_url_hash')
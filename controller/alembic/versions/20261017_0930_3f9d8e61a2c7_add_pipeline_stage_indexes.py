@@ -0,0 +1,35 @@
+"""add pipeline stage indexes
+
+Revision ID: 3f9d8e61a2c7
+Revises: 7c1e2a9b5d40
+Create Date: 2026-10-17 09:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9d8e61a2c7'
+down_revision: Union[str, None] = '7c1e2a9b5d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_jobs_pending_filter', 'jobs', ['id'],
+        unique=False, postgresql_where=sa.text('new'),
+    )
+    op.create_index(
+        'ix_jobs_pending_alert', 'jobs', ['id'],
+        unique=False,
+        postgresql_where=sa.text('relevant AND NOT duplicate AND NOT notified'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_pending_alert', table_name='jobs')
+    op.drop_index('ix_jobs_pending_filter', table_name='jobs')
@@ -0,0 +1,38 @@
+"""add search_runs
+
+Revision ID: a5b2c3d4e6f7
+Revises: 3f9d8e61a2c7
+Create Date: 2026-10-17 10:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5b2c3d4e6f7'
+down_revision: Union[str, None] = '3f9d8e61a2c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('search_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('query_key', sa.String(length=250), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('found', sa.Integer(), nullable=False),
+    sa.Column('inserted', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_runs_id'), 'search_runs', ['id'], unique=False)
+    op.create_index('ix_search_runs_query_key_started_at', 'search_runs', ['query_key', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_search_runs_query_key_started_at', table_name='search_runs')
+    op.drop_index(op.f('ix_search_runs_id'), table_name='search_runs')
+    op.drop_table('search_runs')
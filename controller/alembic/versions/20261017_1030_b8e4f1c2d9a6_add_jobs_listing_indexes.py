@@ -0,0 +1,54 @@
+"""add jobs listing indexes
+
+Revision ID: b8e4f1c2d9a6
+Revises: a5b2c3d4e6f7
+Create Date: 2026-10-17 10:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4f1c2d9a6'
+down_revision: Union[str, None] = 'a5b2c3d4e6f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination compares (date, id) row values, which needs date
+    # to be set on every row
+    op.execute('UPDATE jobs SET date = coalesce(created_at, now()) WHERE date IS NULL')
+    op.alter_column('jobs', 'date', existing_type=sa.DateTime(), nullable=False)
+
+    op.create_index('ix_jobs_date_id', 'jobs', ['date', 'id'], unique=False)
+    op.create_index(
+        'ix_jobs_job_source_date_id', 'jobs', ['job_source', 'date', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_jobs_company_date_id', 'jobs', ['company', 'date', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_jobs_location_date_id', 'jobs', ['location', 'date', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_jobs_relevant_date_id', 'jobs', ['date', 'id'],
+        unique=False, postgresql_where=sa.text('relevant'),
+    )
+    op.create_index(
+        'ix_jobs_promising_date_id', 'jobs', ['date', 'id'],
+        unique=False, postgresql_where=sa.text('promising'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_promising_date_id', table_name='jobs')
+    op.drop_index('ix_jobs_relevant_date_id', table_name='jobs')
+    op.drop_index('ix_jobs_location_date_id', table_name='jobs')
+    op.drop_index('ix_jobs_company_date_id', table_name='jobs')
+    op.drop_index('ix_jobs_job_source_date_id', table_name='jobs')
+    op.drop_index('ix_jobs_date_id', table_name='jobs')
+    op.alter_column('jobs', 'date', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,51 @@
+"""add jobs search vector
+
+Revision ID: c3d7a9e2f4b1
+Revises: b8e4f1c2d9a6
+Create Date: 2026-10-17 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d7a9e2f4b1'
+down_revision: Union[str, None] = 'b8e4f1c2d9a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same tokens as shared.utils.keyword_filter, unstemmed; title A, company B,
+# description C
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, regexp_replace("
+    "lower(coalesce(title, '')), '[^a-z0-9]+', ' ', 'g')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, regexp_replace("
+    "lower(coalesce(company, '')), '[^a-z0-9]+', ' ', 'g')), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, regexp_replace("
+    "lower(coalesce(description, '')), '[^a-z0-9]+', ' ', 'g')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'jobs',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_jobs_search_vector', 'jobs', ['search_vector'],
+        unique=False, postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_search_vector', table_name='jobs')
+    op.drop_column('jobs', 'search_vector')
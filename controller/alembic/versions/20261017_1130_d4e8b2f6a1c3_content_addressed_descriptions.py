@@ -0,0 +1,200 @@
+"""content-addressed descriptions
+
+Revision ID: d4e8b2f6a1c3
+Revises: c3d7a9e2f4b1
+Create Date: 2026-10-17 11:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from shared.utils.descriptions import description_hash, normalize_description
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8b2f6a1c3'
+down_revision: Union[str, None] = 'c3d7a9e2f4b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _tsvector_sql(title: str, company: str, description: str) -> str:
+    return " || ".join(
+        f"setweight(to_tsvector('simple'::regconfig, regexp_replace("
+        f"lower(coalesce({column}, '')), '[^a-z0-9]+', ' ', 'g')), '{weight}')"
+        for column, weight in ((title, 'A'), (company, 'B'), (description, 'C'))
+    )
+
+
+SEARCH_VECTOR_FUNCTION_SQL = (
+    "CREATE OR REPLACE FUNCTION job_search_vector("
+    "title text, company text, description text) "
+    "RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ SELECT "
+    + _tsvector_sql('title', 'company', 'description')
+    + " $$"
+)
+
+COMPRESSION_SQL = """DO $$
+BEGIN
+    ALTER TABLE job_descriptions ALTER COLUMN body SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    RAISE NOTICE 'lz4 not available, job_descriptions.body stays pglz';
+END $$"""
+
+REFCOUNT_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION job_descriptions_refcount() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE job_descriptions d SET ref_count = d.ref_count + delta.n
+        FROM (
+            SELECT description_hash AS hash, count(*) AS n FROM new_rows
+            WHERE description_hash IS NOT NULL GROUP BY description_hash
+        ) delta
+        WHERE d.hash = delta.hash;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE job_descriptions d SET ref_count = d.ref_count - delta.n
+        FROM (
+            SELECT description_hash AS hash, count(*) AS n FROM old_rows
+            WHERE description_hash IS NOT NULL GROUP BY description_hash
+        ) delta
+        WHERE d.hash = delta.hash;
+    ELSE
+        UPDATE job_descriptions SET ref_count = ref_count - 1
+        WHERE hash = OLD.description_hash;
+        UPDATE job_descriptions SET ref_count = ref_count + 1
+        WHERE hash = NEW.description_hash;
+    END IF;
+    RETURN NULL;
+END $$
+"""
+
+REFCOUNT_TRIGGERS_SQL = (
+    """CREATE TRIGGER jobs_description_refcount_insert AFTER INSERT ON jobs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_descriptions_refcount()""",
+    """CREATE TRIGGER jobs_description_refcount_delete AFTER DELETE ON jobs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_descriptions_refcount()""",
+    """CREATE TRIGGER jobs_description_refcount_update
+    AFTER UPDATE OF description_hash ON jobs
+    FOR EACH ROW WHEN (OLD.description_hash IS DISTINCT FROM NEW.description_hash)
+    EXECUTE FUNCTION job_descriptions_refcount()""",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_descriptions',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+    op.execute(COMPRESSION_SQL)
+    op.create_index(
+        'ix_job_descriptions_unreferenced', 'job_descriptions', ['hash'],
+        unique=False, postgresql_where=sa.text('ref_count = 0'),
+    )
+
+    op.add_column('jobs', sa.Column('description_hash', sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        'jobs_description_hash_fkey', 'jobs', 'job_descriptions',
+        ['description_hash'], ['hash'],
+    )
+    op.create_index('ix_jobs_description_hash', 'jobs', ['description_hash'], unique=False)
+
+    # Backfill in batches with the same normalization the application uses
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, description FROM jobs WHERE id > :last_id "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        bodies = {}
+        updates = []
+        for row in rows:
+            body = normalize_description(row.description)
+            if body is None:
+                continue
+            digest = description_hash(body)
+            bodies[digest] = body
+            updates.append({"id": row.id, "hash": digest})
+        if not updates:
+            continue
+        conn.execute(
+            sa.text(
+                "INSERT INTO job_descriptions (hash, body, ref_count, created_at) "
+                "VALUES (:hash, :body, 0, now()) ON CONFLICT (hash) DO NOTHING"
+            ),
+            [{"hash": digest, "body": body} for digest, body in sorted(bodies.items())],
+        )
+        conn.execute(
+            sa.text("UPDATE jobs SET description_hash = :hash WHERE id = :id"), updates
+        )
+
+    op.execute(
+        "UPDATE job_descriptions d SET ref_count = refs.n FROM ("
+        "SELECT description_hash, count(*) AS n FROM jobs "
+        "WHERE description_hash IS NOT NULL GROUP BY description_hash"
+        ") refs WHERE d.hash = refs.description_hash"
+    )
+
+    # The search document keeps its values but is maintained by ingest from
+    # now on, since a generated column cannot read job_descriptions
+    op.execute(SEARCH_VECTOR_FUNCTION_SQL)
+    op.execute('ALTER TABLE jobs ALTER COLUMN search_vector DROP EXPRESSION')
+    op.drop_column('jobs', 'description')
+
+    op.execute(REFCOUNT_FUNCTION_SQL)
+    for statement in REFCOUNT_TRIGGERS_SQL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER jobs_description_refcount_update ON jobs')
+    op.execute('DROP TRIGGER jobs_description_refcount_delete ON jobs')
+    op.execute('DROP TRIGGER jobs_description_refcount_insert ON jobs')
+    op.execute('DROP FUNCTION job_descriptions_refcount()')
+
+    op.add_column('jobs', sa.Column('description', sa.Text(), nullable=True))
+    op.execute(
+        "UPDATE jobs SET description = d.body FROM job_descriptions d "
+        "WHERE d.hash = jobs.description_hash"
+    )
+
+    op.drop_index('ix_jobs_search_vector', table_name='jobs')
+    op.drop_column('jobs', 'search_vector')
+    op.add_column(
+        'jobs',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(_tsvector_sql('title', 'company', 'description'), persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_jobs_search_vector', 'jobs', ['search_vector'],
+        unique=False, postgresql_using='gin',
+    )
+    op.execute('DROP FUNCTION job_search_vector(text, text, text)')
+
+    op.drop_index('ix_jobs_description_hash', table_name='jobs')
+    op.drop_constraint('jobs_description_hash_fkey', 'jobs', type_='foreignkey')
+    op.drop_column('jobs', 'description_hash')
+    op.drop_index('ix_job_descriptions_unreferenced', table_name='job_descriptions')
+    op.drop_table('job_descriptions')
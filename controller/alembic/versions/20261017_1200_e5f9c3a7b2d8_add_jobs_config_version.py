@@ -0,0 +1,28 @@
+"""add jobs.config_version
+
+Revision ID: e5f9c3a7b2d8
+Revises: d4e8b2f6a1c3
+Create Date: 2026-10-17 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f9c3a7b2d8'
+down_revision: Union[str, None] = 'd4e8b2f6a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable without default: a metadata-only change, existing rows read as
+    # "not evaluated under any known config"
+    op.add_column('jobs', sa.Column('config_version', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'config_version')
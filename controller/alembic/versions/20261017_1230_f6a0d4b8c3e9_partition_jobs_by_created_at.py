@@ -0,0 +1,145 @@
+"""partition jobs by created_at
+
+Revision ID: f6a0d4b8c3e9
+Revises: e5f9c3a7b2d8
+Create Date: 2026-10-17 12:30:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a0d4b8c3e9'
+down_revision: Union[str, None] = 'e5f9c3a7b2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created past the current month; later ones are added
+# by shared.db.partitions.ensure_partitions
+MONTHS_AHEAD = 3
+
+JOBS_INDEXES = (
+    ('ix_jobs_id', ['id'], {}),
+    ('ix_jobs_description_hash', ['description_hash'], {}),
+    ('ix_jobs_pending_filter', ['id'], {'postgresql_where': sa.text('new')}),
+    (
+        'ix_jobs_pending_alert', ['id'],
+        {'postgresql_where': sa.text('relevant AND NOT duplicate AND NOT notified')},
+    ),
+    ('ix_jobs_date_id', ['date', 'id'], {}),
+    ('ix_jobs_job_source_date_id', ['job_source', 'date', 'id'], {}),
+    ('ix_jobs_company_date_id', ['company', 'date', 'id'], {}),
+    ('ix_jobs_location_date_id', ['location', 'date', 'id'], {}),
+    ('ix_jobs_relevant_date_id', ['date', 'id'], {'postgresql_where': sa.text('relevant')}),
+    ('ix_jobs_promising_date_id', ['date', 'id'], {'postgresql_where': sa.text('promising')}),
+    ('ix_jobs_search_vector', ['search_vector'], {'postgresql_using': 'gin'}),
+)
+
+REFCOUNT_TRIGGERS_SQL = (
+    """CREATE TRIGGER jobs_description_refcount_insert AFTER INSERT ON jobs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_descriptions_refcount()""",
+    """CREATE TRIGGER jobs_description_refcount_delete AFTER DELETE ON jobs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION job_descriptions_refcount()""",
+    """CREATE TRIGGER jobs_description_refcount_update
+    AFTER UPDATE OF description_hash ON jobs
+    FOR EACH ROW WHEN (OLD.description_hash IS DISTINCT FROM NEW.description_hash)
+    EXECUTE FUNCTION job_descriptions_refcount()""",
+)
+
+# Rows are copied between the old and new table with the triggers absent,
+# so ref_count keeps its value
+_DROP_TRIGGERS_SQL = (
+    'DROP TRIGGER IF EXISTS jobs_description_refcount_update ON jobs',
+    'DROP TRIGGER IF EXISTS jobs_description_refcount_delete ON jobs',
+    'DROP TRIGGER IF EXISTS jobs_description_refcount_insert ON jobs',
+)
+
+_CREATE_PARTITIONS_SQL = f"""
+DO $$
+DECLARE
+    month date := date_trunc('month', coalesce(
+        (SELECT min(created_at) FROM jobs), now()
+    ))::date;
+    last_month date := (date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date;
+BEGIN
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF jobs_partitioned FOR VALUES FROM (%L) TO (%L)',
+            'jobs_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+        );
+        month := month + interval '1 month';
+    END LOOP;
+END $$
+"""
+
+
+def _swap_in(new_table: str) -> None:
+    """Replace jobs by new_table, keeping the id sequence."""
+    op.execute('ALTER SEQUENCE jobs_id_seq OWNED BY NONE')
+    op.drop_table('jobs')
+    op.rename_table(new_table, 'jobs')
+    op.execute('ALTER SEQUENCE jobs_id_seq OWNED BY jobs.id')
+
+
+def _create_indexes() -> None:
+    for name, columns, options in JOBS_INDEXES:
+        op.create_index(name, 'jobs', columns, unique=False, **options)
+    op.create_foreign_key(
+        'jobs_description_hash_fkey', 'jobs', 'job_descriptions',
+        ['description_hash'], ['hash'],
+    )
+    for statement in REFCOUNT_TRIGGERS_SQL:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    for statement in _DROP_TRIGGERS_SQL:
+        op.execute(statement)
+    op.execute(
+        'UPDATE jobs SET created_at = coalesce(date, now()) WHERE created_at IS NULL'
+    )
+
+    op.execute(
+        'CREATE TABLE jobs_partitioned (LIKE jobs INCLUDING DEFAULTS INCLUDING STORAGE) '
+        'PARTITION BY RANGE (created_at)'
+    )
+    op.alter_column('jobs_partitioned', 'created_at', nullable=False)
+    op.execute(_CREATE_PARTITIONS_SQL)
+    op.execute('CREATE TABLE jobs_default PARTITION OF jobs_partitioned DEFAULT')
+    op.execute('INSERT INTO jobs_partitioned SELECT * FROM jobs')
+
+    op.create_table(
+        'job_urls',
+        sa.Column('job_url_hash', sa.String(length=64), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('archived', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+        sa.PrimaryKeyConstraint('job_url_hash'),
+    )
+    op.execute(
+        'INSERT INTO job_urls (job_url_hash, job_id, created_at, archived) '
+        'SELECT job_url_hash, id, created_at, false FROM jobs'
+    )
+
+    _swap_in('jobs_partitioned')
+    op.create_primary_key('jobs_pkey', 'jobs', ['id', 'created_at'])
+    _create_indexes()
+
+
+def downgrade() -> None:
+    # Archived partitions are not restored; their rows stay in the archive
+    for statement in _DROP_TRIGGERS_SQL:
+        op.execute(statement)
+    op.execute('CREATE TABLE jobs_unpartitioned (LIKE jobs INCLUDING DEFAULTS INCLUDING STORAGE)')
+    op.execute('INSERT INTO jobs_unpartitioned SELECT * FROM jobs')
+    op.alter_column('jobs_unpartitioned', 'created_at', nullable=True)
+    _swap_in('jobs_unpartitioned')
+    op.create_primary_key('jobs_pkey', 'jobs', ['id'])
+    op.create_unique_constraint('uq_jobs_job_url_hash', 'jobs', ['job_url_hash'])
+    _create_indexes()
+    op.drop_table('job_urls')
@@ -0,0 +1,27 @@
+"""add jobs.alert_claimed_at
+
+Revision ID: a7b1e5c9d3f0
+Revises: f6a0d4b8c3e9
+Create Date: 2026-10-17 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b1e5c9d3f0'
+down_revision: Union[str, None] = 'f6a0d4b8c3e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Added to the partitioned parent, so every partition gets it
+    op.add_column('jobs', sa.Column('alert_claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'alert_claimed_at')
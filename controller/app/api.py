@@ -1,4 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from temporalio.client import WorkflowExecutionStatus
+from temporalio.exceptions import WorkflowAlreadyStartedError
+from temporalio.service import RPCError, RPCStatusCode
 #from typing import List, Optional, Dict, Any, Tuple
 #from sqlalchemy import select
 #from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,11 +22,25 @@ import logging
 #from shared.clients.minio_client import MinioClient
 #from shared.utils.content_hash import generate_input_hash
 
+from app.client import temporal_clients
+from shared.db.database import get_db
+from shared.db.export import EXPORT_FORMATS, export_jobs
+from shared.db.filters import JobFilter
+from shared.db.listing import (DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor,
+                               facet_cache, list_jobs, page_body)
+from shared.db.models import JobSource
+from shared.db.schemas import JobPage
+from shared.db.search import (DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT,
+                              search_body, search_jobs)
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/run", response_model=PipelineRunSchema)
+SCOUT_WORKFLOW_ID = "job-scout"
+SCOUT_TASK_QUEUE = "main-pipeline"
+
+@router.post("/run")
 async def run():
     """Test the endpoint to prove its running."""
     try:
@@ -31,11 +52,127 @@ async def run():
 
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/services/alert", response_model=ServiceResponse)
+@router.post("/services/alert")
 async def alert():
     """Send an alert with a message"""
     try:
         logger.info(f"Sending an ALERT was successful")
     except Exception as e:
         logger.error(f"Error sending alert: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def job_filter(
+    source: Optional[JobSource] = None,
+    company: Optional[str] = None,
+    location: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    new: Optional[bool] = None,
+    duplicate: Optional[bool] = None,
+    relevant: Optional[bool] = None,
+    promising: Optional[bool] = None,
+    notified: Optional[bool] = None,
+) -> JobFilter:
+    """Job filters from query parameters."""
+    return JobFilter(
+        source=source,
+        company=company,
+        location=location,
+        since=since,
+        until=until,
+        new=new,
+        duplicate=duplicate,
+        relevant=relevant,
+        promising=promising,
+        notified=notified,
+    )
+
+@router.post("/scout")
+async def start_scout(
+    interval_minutes: float = Query(60, gt=0),
+    rounds: int = Query(0, ge=0),
+    rounds_per_run: Optional[int] = Query(None, ge=1),
+):
+    """Start scheduled scouting: one round every interval, rounds=0 runs until cancelled."""
+    client = await temporal_clients.get()
+    input_data = {"interval_minutes": interval_minutes, "rounds": rounds}
+    if rounds_per_run:
+        input_data["rounds_per_run"] = rounds_per_run
+    try:
+        handle = await client.start_workflow(
+            "MainPipelineWorkflow",
+            input_data,
+            id=SCOUT_WORKFLOW_ID,
+            task_queue=SCOUT_TASK_QUEUE,
+        )
+    except WorkflowAlreadyStartedError:
+        raise HTTPException(status_code=409, detail="Scouting is already running")
+    return {"workflow_id": handle.id, "run_id": handle.result_run_id}
+
+@router.get("/scout/progress")
+async def scout_progress():
+    """Counters of the scouting workflow, answered from workflow memory."""
+    client = await temporal_clients.get()
+    # Without a run id the handle follows continue-as-new to the latest run
+    handle = client.get_workflow_handle(SCOUT_WORKFLOW_ID)
+    try:
+        progress = await handle.query("get_progress")
+    except RPCError as e:
+        if e.status == RPCStatusCode.NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Scouting was never started")
+        raise
+    description = await handle.describe()
+    return {
+        **progress,
+        "running": description.status == WorkflowExecutionStatus.RUNNING,
+        "run_id": description.run_id,
+    }
+
+@router.get("/jobs", response_model=JobPage)
+async def jobs(
+    filters: JobFilter = Depends(job_filter),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """List jobs newest first; pass next_cursor back as cursor for the next page."""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    async with get_db() as session:
+        rows, next_cursor = await list_jobs(session, filters, cursor, limit)
+        facets = await facet_cache.get(session, filters)
+    return Response(
+        page_body(rows, next_cursor, facets["total"]), media_type="application/json"
+    )
+
+@router.get("/jobs/search")
+async def search(
+    q: str = Query(..., min_length=1),
+    filters: JobFilter = Depends(job_filter),
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0, le=10000),
+):
+    """Ranked full-text search; supports "quoted phrases", `or` and `-word`."""
+    async with get_db() as session:
+        results = await search_jobs(session, q, filters, limit, offset)
+    return Response(search_body(results), media_type="application/json")
+
+@router.get("/jobs/facets")
+async def job_facets(filters: JobFilter = Depends(job_filter)):
+    """Counts for the filtered jobs, cached briefly."""
+    async with get_db() as session:
+        return await facet_cache.get(session, filters)
+
+@router.get("/jobs/export")
+async def export(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    filters: JobFilter = Depends(job_filter),
+):
+    """Stream the filtered jobs table as NDJSON, CSV or Parquet."""
+    return StreamingResponse(
+        export_jobs(format, filters),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="jobs.{format}"'},
+    )
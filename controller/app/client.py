@@ -1,32 +1,81 @@
 import asyncio
 import logging
+from typing import Optional
+
 from temporalio.client import Client
+from temporalio.service import RPCError, RPCStatusCode
+
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# The shared client connects lazily on a request path, so it makes one
+# bounded attempt; the next use tries again
+CONNECT_TIMEOUT_SECONDS = 5
+
+
+class TemporalClientManager:
+    """
+    Process-wide Temporal client.
+
+    The client multiplexes all calls over one gRPC channel and is safe to
+    share between requests, so it is connected once and reused. After a
+    connection failure it is dropped and reconnected on the next use.
+    """
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        connect_timeout: float = CONNECT_TIMEOUT_SECONDS,
+    ) -> None:
+        self.address = address or settings.TEMPORAL_ADDRESS
+        self.connect_timeout = connect_timeout
+        self._client: Optional[Client] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    async def get(self) -> Client:
+        """Return the shared client, connecting it on first use."""
+        if self._client is not None:
+            return self._client
+        async with self._lock:
+            if self._client is None:
+                logger.info(f"Connecting to Temporal server at {self.address}")
+                self._client = await asyncio.wait_for(
+                    Client.connect(self.address), self.connect_timeout
+                )
+            return self._client
+
+    def invalidate(self) -> None:
+        """Drop the shared client so the next call reconnects."""
+        if self._client is not None:
+            logger.warning("Dropping Temporal client, will reconnect on next use")
+        self._client = None
+
+    async def close(self) -> None:
+        self._client = None
+
 
-async def connect_with_retry(max_retries=5, retry_delay=5):
-    """Connect to Temporal server with retry logic."""
-    logger.info("Connecting to Temporal server")
-    for attempt in range(max_retries):
-        try:
-            return await Client.connect("temporal:7233")
-        except Exception as e:
-            logger.error(
-                f"Failed to connect to Temporal server (attempt {attempt + 1}/{max_retries}): {e}"
-            )
-            if attempt == max_retries - 1:
-                raise
-            logger.warning(
-                f"Failed to connect to Temporal server (attempt {attempt + 1}/{max_retries}): {e}"
-            )
-            await asyncio.sleep(retry_delay)
+temporal_clients = TemporalClientManager()
 
 
 async def start_workflow(workflow_type, workflow_id, task_queue, args=None):
     """Start a workflow with the given parameters."""
     logger.info(f"Starting workflow: {workflow_id}")
-    client = await connect_with_retry()
-    return await client.start_workflow(
-        workflow_type, id=workflow_id, task_queue=task_queue, args=args or []
-    )
+    client = await temporal_clients.get()
+    try:
+        return await client.start_workflow(
+            workflow_type, id=workflow_id, task_queue=task_queue, args=args or []
+        )
+    except RPCError as e:
+        if e.status != RPCStatusCode.UNAVAILABLE:
+            raise
+        # Connection went away; reconnect once and retry
+        temporal_clients.invalidate()
+        client = await temporal_clients.get()
+        return await client.start_workflow(
+            workflow_type, id=workflow_id, task_queue=task_queue, args=args or []
+        )
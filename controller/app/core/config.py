@@ -1,34 +1,29 @@
-from pydantic_settings import BaseSettings
 import os
 
-class Settings(BaseSettings):
+from shared.db.database import DatabaseSettings
+
+
+class Settings(DatabaseSettings):
     PROJECT_NAME: str = "Configuration Service"
     VERSION: str = "1.0.0"
     API_V1_STR: str = "/api/v1"
     LOG_LEVEL: str = "INFO"
 
-    # Database
-    POSTGRES_USER: str
-    POSTGRES_PASSWORD: str
-    POSTGRES_HOST: str
-    POSTGRES_PORT: str
-    POSTGRES_DB: str
-
-    @property
-    def DATABASE_URL(self) -> str:
-        return (
-            f"postgresql://{self.POSTGRES_USER}:"
-            f"{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:"
-            f"{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
-        )
-        
-    @property
-    def DATABASE_URL_ASYNC(self) -> str:
-        return (
-            f"postgresql+asyncpg://{self.POSTGRES_USER}:"
-            f"{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:"
-            f"{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
-        )
+    # Database: POSTGRES_*, DATABASE_URL and DB_* pool settings are inherited
+
+    # Temporal
+    TEMPORAL_ADDRESS: str = "temporal:7233"
+
+    # Worker processes started by app.worker; 0 starts one per available core.
+    # They split the per-host scraping rate budget between them
+    WORKER_PROCESSES: int = 0
+    WORKER_MAX_CONCURRENT_ACTIVITIES: int = 20
+    WORKER_MAX_CONCURRENT_WORKFLOW_TASKS: int = 20
+    # Processes per worker for CPU-bound work, see shared.utils.cpu_pool;
+    # 0 runs it on threads, which suits one worker process per core
+    WORKER_CPU_POOL_SIZE: int = 0
+    # In-flight activities get this long to finish on SIGTERM
+    WORKER_SHUTDOWN_GRACE_SECONDS: float = 30.0
 
     class Config:
         case_sensitive = True
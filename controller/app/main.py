@@ -1,12 +1,64 @@
-from fastapi import FastAPI
 import asyncio
-from temporalio.client import Client
+import logging
+import uuid
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from prometheus_fastapi_instrumentator import Instrumentator
+from sqlalchemy import text
+
+from app.api import router
+from app.client import start_workflow, temporal_clients
+from app.core.config import settings
+from shared.db.database import close_db, configure, get_engine, pool_stats
+
+configure(profile="api", settings=settings)
+
+logger = logging.getLogger(__name__)
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect the shared Temporal client up front with a single short
+    # attempt; if Temporal is not up yet the first request will connect instead.
+    try:
+        await temporal_clients.get()
+    except Exception as e:
+        logger.warning(f"Temporal not reachable at startup: {e}")
+    yield
+    await temporal_clients.close()
+    await close_db()
 
-# Connect to Temporal server (make sure it's running locally)
-async def get_temporal_client():
-    return await Client.connect("localhost:7233")
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(router)
+# Request latency per route plus the shared registry (DB pool, stages) on /metrics
+Instrumentator(excluded_handlers=["/metrics", "/health"]).instrument(app).expose(
+    app, include_in_schema=False
+)
+
+HEALTH_DB_TIMEOUT_SECONDS = 5
+# Queue the worker in app.worker polls
+TASK_QUEUE = "main-pipeline"
+
+
+@app.get("/health", include_in_schema=False)
+async def health():
+    """Liveness for the compose healthcheck: 503 unless the database answers."""
+    temporal = "connected" if temporal_clients.connected else "disconnected"
+    checks = {"temporal": temporal}
+    try:
+        async with get_engine().connect() as conn:
+            await asyncio.wait_for(
+                conn.execute(text("SELECT 1")), HEALTH_DB_TIMEOUT_SECONDS
+            )
+        checks["database"] = "ok"
+    except Exception as e:
+        logger.warning(f"Health check failed: {e}")
+        checks["database"] = "unavailable"
+        return JSONResponse({"status": "unhealthy", **checks}, status_code=503)
+    return {"status": "ok", **checks, "pools": pool_stats()}
 
 @app.get("/")
 async def root():
@@ -14,16 +66,10 @@ async def root():
 
 @app.post("/trigger-workflow")
 async def trigger_workflow():
-    # Connect to Temporal server
-    client = await get_temporal_client()
-
-    # Start the workflow
-    handle = await client.start_workflow(
-        workflow_class="DummyWorkflow",  # Workflow name to trigger
-        task_queue="test-task-queue",   # Task queue your worker is listening on
-        args=[],                        # Arguments to pass to the workflow (empty for now)
-        id="dummy-workflow-id",         # Workflow ID (must be unique)
+    # Reconnects and retries once if the shared client lost its connection
+    handle = await start_workflow(
+        "DummyWorkflow",
+        workflow_id=f"dummy-workflow-{uuid.uuid4()}",
+        task_queue=TASK_QUEUE,
     )
-
-    return {"workflow_id": handle.id, "run_id": handle.run_id}
-
+    return {"workflow_id": handle.id, "run_id": handle.result_run_id}
@@ -0,0 +1,170 @@
+"""
+Prometheus metrics of the Temporal worker process.
+
+MetricsInterceptor times every activity the worker executes, and
+TemporalMetricsBridge exposes the SDK's own metrics (task slots available
+and used, poll and schedule-to-start latencies, ...) next to them: the
+Temporal runtime writes into a MetricBuffer that the bridge drains into a
+prometheus_client collector.
+
+    bridge = TemporalMetricsBridge()
+    client = await Client.connect(address, runtime=bridge.runtime)
+    bridge.start()
+    start_metrics_server(9100)
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import Metric
+from temporalio import activity
+from temporalio.runtime import (
+    BUFFERED_METRIC_KIND_COUNTER,
+    BUFFERED_METRIC_KIND_GAUGE,
+    MetricBuffer,
+    MetricBufferDurationFormat,
+    Runtime,
+    TelemetryConfig,
+)
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    Interceptor,
+)
+
+from shared.utils.metrics import ACTIVITY_DURATION
+
+logger = logging.getLogger(__name__)
+
+DRAIN_INTERVAL_SECONDS = 1.0
+# Temporal histograms are latencies, reported in seconds by the buffer; the
+# workflow's own stage timings run to tens of minutes
+HISTOGRAM_BUCKETS = (
+    0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800
+)
+
+
+class _ActivityMetricsInbound(ActivityInboundInterceptor):
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        name = activity.info().activity_type
+        started = time.perf_counter()
+        status = "completed"
+        try:
+            return await super().execute_activity(input)
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            ACTIVITY_DURATION.labels(name, status).observe(elapsed)
+
+
+class MetricsInterceptor(Interceptor):
+    """Worker interceptor observing activity durations by type and outcome."""
+
+    def intercept_activity(
+        self, next: ActivityInboundInterceptor
+    ) -> ActivityInboundInterceptor:
+        return _ActivityMetricsInbound(next)
+
+
+@dataclass
+class _Series:
+    value: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(HISTOGRAM_BUCKETS))
+    count: int = 0
+    total: float = 0.0
+
+
+class TemporalMetricsBridge:
+    """Collector for the Temporal runtime's metrics, fed from a MetricBuffer."""
+
+    def __init__(self, buffer_size: int = 10_000) -> None:
+        self.buffer = MetricBuffer(
+            buffer_size, duration_format=MetricBufferDurationFormat.SECONDS
+        )
+        self.runtime = Runtime(telemetry=TelemetryConfig(metrics=self.buffer))
+        # name -> (kind, description, {sorted attributes: series})
+        self._metrics: Dict[str, Tuple[int, str, Dict[tuple, _Series]]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        REGISTRY.register(self)
+
+    def drain(self) -> int:
+        """Fold the buffered updates into the series; returns how many."""
+        updates = self.buffer.retrieve_updates()
+        with self._lock:
+            for update in updates:
+                metric = update.metric
+                _, _, series_by_labels = self._metrics.setdefault(
+                    metric.name, (metric.kind, metric.description or "", {})
+                )
+                attributes = update.attributes.items()
+                labels = tuple(sorted((key, str(value)) for key, value in attributes))
+                series = series_by_labels.setdefault(labels, _Series())
+                if metric.kind == BUFFERED_METRIC_KIND_COUNTER:
+                    series.value += update.value
+                elif metric.kind == BUFFERED_METRIC_KIND_GAUGE:
+                    series.value = update.value
+                else:
+                    # Values above the last bound only land in +Inf
+                    index = bisect.bisect_left(HISTOGRAM_BUCKETS, update.value)
+                    if index < len(series.buckets):
+                        series.buckets[index] += 1
+                    series.count += 1
+                    series.total += update.value
+        return len(updates)
+
+    def collect(self):
+        families = []
+        with self._lock:
+            for name, (kind, description, series_by_labels) in self._metrics.items():
+                if kind == BUFFERED_METRIC_KIND_COUNTER:
+                    base = name[: -len("_total")] if name.endswith("_total") else name
+                    family = Metric(base, description, "counter")
+                    for labels, series in series_by_labels.items():
+                        family.add_sample(f"{base}_total", dict(labels), series.value)
+                elif kind == BUFFERED_METRIC_KIND_GAUGE:
+                    family = Metric(name, description, "gauge")
+                    for labels, series in series_by_labels.items():
+                        family.add_sample(name, dict(labels), series.value)
+                else:
+                    family = Metric(name, description, "histogram")
+                    for labels, series in series_by_labels.items():
+                        cumulative = 0
+                        for bound, count in zip(HISTOGRAM_BUCKETS, series.buckets):
+                            cumulative += count
+                            family.add_sample(
+                                f"{name}_bucket",
+                                {**dict(labels), "le": str(float(bound))},
+                                cumulative,
+                            )
+                        family.add_sample(
+                            f"{name}_bucket",
+                            {**dict(labels), "le": "+Inf"},
+                            series.count,
+                        )
+                        family.add_sample(f"{name}_count", dict(labels), series.count)
+                        family.add_sample(f"{name}_sum", dict(labels), series.total)
+                families.append(family)
+        return families
+
+    def start(self, interval: float = DRAIN_INTERVAL_SECONDS) -> asyncio.Task:
+        """Drain the buffer every interval seconds on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(interval))
+        return self._task
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                self.drain()
+            except Exception as e:
+                logger.warning(f"Failed to drain Temporal metrics: {e}")
+            await asyncio.sleep(interval)
@@ -1,17 +1,78 @@
+"""
+Temporal worker launcher.
+
+Starts WORKER_PROCESSES worker processes (0: one per core available to the
+container), each polling the main-pipeline task queue with its own client,
+database pool, CPU pool and /metrics port (WORKER_METRICS_PORT + index), so
+throughput scales with the cores. Scraping does not: the per-host request
+rates in activities.scrape_activities are a budget for the whole worker,
+and each process gets an equal share of it. Sync activities run on a thread pool
+sized to max_concurrent_activities; async ones hand their CPU-bound parts
+to shared.utils.cpu_pool. SIGTERM or SIGINT makes every process stop
+polling and wait up to WORKER_SHUTDOWN_GRACE_SECONDS for in-flight
+activities; a process that dies meanwhile is restarted.
+
+    python -m app.worker --processes 4 --max-concurrent-activities 20
+"""
+
+import argparse
+import asyncio
 import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict
+
+from temporalio import workflow
+from temporalio.client import (
+    Client,
+    Schedule,
+    ScheduleActionStartWorkflow,
+    ScheduleAlreadyRunningError,
+    ScheduleOverlapPolicy,
+    SchedulePolicy,
+    ScheduleSpec,
+)
+from temporalio.worker import Worker
+
+from activities.dedup_activities import dedup_new_jobs
+from activities.partition_activities import (
+    archive_job_partitions,
+    ensure_job_partitions,
+)
+from activities.scoring_activities import count_alerted_jobs, score_new_jobs
+from activities.scrape_activities import (
+    configure_rate_budget,
+    load_search_plan,
+    replay_archived_pages,
+    scrape_search_query,
+)
+from app.core.config import settings
+from app.metrics import MetricsInterceptor, TemporalMetricsBridge
+from shared.db.database import close_db, configure
+from shared.utils.cpu_pool import available_cpus, configure_cpu_pool, shutdown_cpu_pool
+from shared.utils.metrics import start_metrics_server
+from workflows.main_pipeline_workflow import MainPipelineWorkflow
+from workflows.partition_maintenance_workflow import PartitionMaintenanceWorkflow
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 logger.info("Worker.py is running!")
 
-import asyncio
-from temporalio.worker import Worker
-from temporalio.client import Client
-from temporalio import workflow
-import os
-
 # Constants
 TEMPORAL_ADDRESS = os.getenv("TEMPORAL_ADDRESS", "temporal:7233")
 TASK_QUEUE = "main-pipeline"
+# Prometheus /metrics of the first worker process, the others use the next
+# ports; uvicorn serves the API's on its own port
+METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+PARTITION_SCHEDULE_ID = "partition-maintenance"
+PARTITION_SCHEDULE_CRON = os.getenv("PARTITION_MAINTENANCE_CRON", "30 3 * * *")
+RESTART_DELAY_SECONDS = 5.0
 
 # Define a dummy workflow
 
@@ -22,21 +83,200 @@ class DummyWorkflow:
     async def run(self) -> str:
         return "Hello, Temporal!"
 
-async def test():
+async def ensure_partition_schedule(client: Client) -> None:
+    """Create the daily jobs partition maintenance schedule unless it exists."""
+    try:
+        await client.create_schedule(
+            PARTITION_SCHEDULE_ID,
+            Schedule(
+                action=ScheduleActionStartWorkflow(
+                    PartitionMaintenanceWorkflow.run,
+                    {},
+                    id=PARTITION_SCHEDULE_ID,
+                    task_queue=TASK_QUEUE,
+                    execution_timeout=timedelta(hours=3),
+                ),
+                spec=ScheduleSpec(cron_expressions=[PARTITION_SCHEDULE_CRON]),
+                policy=SchedulePolicy(overlap=ScheduleOverlapPolicy.SKIP),
+            ),
+        )
+        logger.info(f"Created schedule {PARTITION_SCHEDULE_ID} ({PARTITION_SCHEDULE_CRON})")
+    except ScheduleAlreadyRunningError:
+        pass
+
+@dataclass(frozen=True)
+class WorkerOptions:
+    """Per-process worker tuning, passed to each spawned process."""
+
+    max_concurrent_activities: int = settings.WORKER_MAX_CONCURRENT_ACTIVITIES
+    max_concurrent_workflow_tasks: int = settings.WORKER_MAX_CONCURRENT_WORKFLOW_TASKS
+    cpu_pool_size: int = settings.WORKER_CPU_POOL_SIZE
+    shutdown_grace_seconds: float = settings.WORKER_SHUTDOWN_GRACE_SECONDS
+    # Processes sharing the scraping rate budget
+    processes: int = 1
+
+
+async def run_worker(index: int = 0, options: WorkerOptions = WorkerOptions()) -> None:
+    """Run one worker until SIGTERM/SIGINT, then drain it gracefully."""
+    configure(profile="worker", settings=settings)
+    configure_cpu_pool(options.cpu_pool_size)
+    configure_rate_budget(options.processes)
+
+    # Route the SDK's metrics (task slots, poll latencies) to /metrics
+    bridge = TemporalMetricsBridge()
+    start_metrics_server(METRICS_PORT + index)
+
     # Connect to the Temporal server (default localhost:7233)
-    client = await Client.connect(TEMPORAL_ADDRESS)
+    client = await Client.connect(TEMPORAL_ADDRESS, runtime=bridge.runtime)
+    bridge.start()
+    if index == 0:
+        await ensure_partition_schedule(client)
 
-    # Create a worker that listens to a task queue
-    worker = Worker(
-        client,
-        task_queue=TASK_QUEUE,
-        workflows=[DummyWorkflow],  # Register the dummy workflow
-    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    # Sync (def) activities run on this pool, one thread per activity slot
+    with ThreadPoolExecutor(options.max_concurrent_activities) as activity_executor:
+        worker = Worker(
+            client,
+            task_queue=TASK_QUEUE,
+            workflows=[DummyWorkflow, MainPipelineWorkflow, PartitionMaintenanceWorkflow],
+            activities=[
+                load_search_plan,
+                scrape_search_query,
+                replay_archived_pages,
+                dedup_new_jobs,
+                score_new_jobs,
+                count_alerted_jobs,
+                ensure_job_partitions,
+                archive_job_partitions,
+            ],
+            activity_executor=activity_executor,
+            max_concurrent_activities=options.max_concurrent_activities,
+            max_concurrent_workflow_tasks=options.max_concurrent_workflow_tasks,
+            graceful_shutdown_timeout=timedelta(seconds=options.shutdown_grace_seconds),
+            interceptors=[MetricsInterceptor()],
+        )
+        logger.info(f"Starting worker {index} in process {os.getpid()}: {options}")
+        running = asyncio.create_task(worker.run())
+        stopping = asyncio.create_task(stop.wait())
+        await asyncio.wait({running, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        if not running.done():
+            logger.info(f"Stopping worker {index}, draining in-flight activities")
+            await worker.shutdown()
+        stopping.cancel()
+        try:
+            await running
+        finally:
+            shutdown_cpu_pool()
+            await close_db()
+    logger.info(f"Worker {index} stopped")
+
+
+def _worker_process(index: int, options: WorkerOptions) -> None:
+    asyncio.run(run_worker(index, options))
+
+
+def supervise(processes: int, options: WorkerOptions) -> None:
+    """
+    Run `processes` worker processes, restarting any that die, until
+    SIGTERM/SIGINT; then forward it and wait for them to drain.
+    """
+    # Spawned, not forked: each process builds its own runtime and pools
+    context = multiprocessing.get_context("spawn")
+    children: Dict[int, multiprocessing.Process] = {}
+    deadline = None
+
+    def start(index: int) -> None:
+        child = context.Process(
+            target=_worker_process, args=(index, options), name=f"worker-{index}"
+        )
+        child.start()
+        children[index] = child
 
-    print("Starting worker...")
+    def stop(signum, frame) -> None:
+        nonlocal deadline
+        if deadline is None:
+            logger.info(f"Received signal {signum}, stopping {len(children)} workers")
+            deadline = time.monotonic() + options.shutdown_grace_seconds + 10
+        for child in children.values():
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
 
-    # Run the worker (this will block until the worker is stopped)
-    await worker.run()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for index in range(processes):
+        start(index)
+
+    restart_at: Dict[int, float] = {}
+    while children or (restart_at and deadline is None):
+        now = time.monotonic()
+        for index, due in list(restart_at.items()):
+            if deadline is None and due <= now:
+                del restart_at[index]
+                start(index)
+        waits = [due - now for due in restart_at.values()] if deadline is None else []
+        if deadline is not None:
+            waits.append(deadline - now)
+        multiprocessing.connection.wait(
+            [child.sentinel for child in children.values()],
+            max(0.0, min(waits)) if waits else None,
+        )
+        for index, child in list(children.items()):
+            if child.is_alive():
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.warning(f"Worker {index} did not stop in time, killing it")
+                    child.kill()
+                continue
+            child.join()
+            del children[index]
+            if deadline is None:
+                logger.warning(
+                    f"Worker {index} exited with code {child.exitcode}, "
+                    f"restarting in {RESTART_DELAY_SECONDS:.0f}s"
+                )
+                restart_at[index] = time.monotonic() + RESTART_DELAY_SECONDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.WORKER_PROCESSES,
+        help="worker processes (default: one per available core)",
+    )
+    parser.add_argument(
+        "--max-concurrent-activities",
+        type=int,
+        default=settings.WORKER_MAX_CONCURRENT_ACTIVITIES,
+    )
+    parser.add_argument(
+        "--max-concurrent-workflow-tasks",
+        type=int,
+        default=settings.WORKER_MAX_CONCURRENT_WORKFLOW_TASKS,
+    )
+    parser.add_argument(
+        "--cpu-pool-size",
+        type=int,
+        default=settings.WORKER_CPU_POOL_SIZE,
+        help="processes for CPU-bound work per worker (default: threads)",
+    )
+    args = parser.parse_args()
+
+    processes = args.processes or available_cpus()
+    options = WorkerOptions(
+        max_concurrent_activities=args.max_concurrent_activities,
+        max_concurrent_workflow_tasks=args.max_concurrent_workflow_tasks,
+        cpu_pool_size=args.cpu_pool_size,
+        processes=processes,
+    )
+    if processes == 1:
+        asyncio.run(run_worker(0, options))
+    else:
+        supervise(processes, options)
 
 if __name__ == "__main__":
-    asyncio.run(test())
+    main()
@@ -24,9 +24,14 @@ echo "Starting the FastAPI application..."
 uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload &
 FASTAPI_PID=$!
 
-# Start the Temporal worker
+# Start the Temporal worker processes; forward SIGTERM (docker stop) so
+# they drain their in-flight activities before exiting
 echo "Starting the Temporal worker..."
-python -m app.worker
+python -m app.worker &
+WORKER_PID=$!
+trap 'kill -TERM $WORKER_PID 2>/dev/null' TERM INT
+wait $WORKER_PID || true
+wait $WORKER_PID 2>/dev/null || true
 
 # If the worker exits, kill the FastAPI server
 kill $FASTAPI_PID
\ No newline at end of file
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+
 from temporalio import workflow
 from temporalio.common import RetryPolicy
+from temporalio.exceptions import ActivityError
 from typing import (
     Dict,
     Any,
@@ -12,19 +15,70 @@ from typing import (
     Protocol,
     runtime_checkable,
 )
-from datetime import timedelta
+from datetime import datetime, timedelta
 import logging
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+
+with workflow.unsafe.imports_passed_through():
+    from activities.scrape_activities import (
+        ScrapeQueryResult,
+        SearchPlan,
+        load_search_plan,
+        replay_archived_pages,
+        scrape_search_query,
+    )
+    from activities.dedup_activities import dedup_new_jobs
+    from activities.scoring_activities import count_alerted_jobs, score_new_jobs
+    from shared.utils.search_config import query_key, query_source
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONCURRENCY = 8
+# Per job source: concurrent queries and minimum spacing between query starts
+DEFAULT_SOURCE_BUDGETS: Dict[str, Dict[str, float]] = {
+    "linkedin": {"max_concurrent": 4, "min_interval_seconds": 2.0},
+    "indeed": {"max_concurrent": 2, "min_interval_seconds": 5.0},
+}
+
+# Scheduled scouting continues as a new run after this many rounds or once
+# the event history reaches this length, whichever comes first
+DEFAULT_ROUNDS_PER_RUN = 24
+DEFAULT_MAX_HISTORY_EVENTS = 10_000
+# Slowest queries kept for the result
+MAX_QUERY_LATENCIES = 100
+# New job ids checked for near-duplicates per dedup activity
+DEDUP_BATCH_SIZE = 5000
+
+SCRAPE_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(seconds=10),
+    backoff_coefficient=2.0,
+    maximum_attempts=3,
+)
+
 
 # Type definitions
 @dataclass
 class WorkflowState:
-    """State for the workflow."""
+    """
+    State for the workflow. Only counters, so a scheduled scout can carry
+    it into its next run as is.
+    """
 
-    status: str
+    status: str = "pending"
+    round: int = 0
+    runs: int = 1
+    started_at: Optional[str] = None
+    next_round_at: Optional[str] = None
+    queries_total: int = 0
+    queries_done: int = 0
+    queries_failed: int = 0
+    jobs_found: int = 0
+    jobs_new: int = 0
+    jobs_duplicate: int = 0
+    jobs_scored: int = 0
+    jobs_relevant: int = 0
+    jobs_promising: int = 0
+    jobs_alerted: int = 0
 
 
 class WorkflowResult(TypedDict, total=False):
@@ -33,11 +87,34 @@ class WorkflowResult(TypedDict, total=False):
     status: str
 
 
+class QueryLatency(TypedDict, total=False):
+    """Wall-clock cost of one search query in one round."""
+
+    query: str
+    round: int
+    latency_seconds: float
+    found: int
+    inserted: int
+    error: Optional[str]
+
+
 class PipelineResult(TypedDict, total=False):
     """Result type for the entire pipeline."""
 
     status: str
     error: Optional[str]
+    rounds: int
+    queries: int
+    queries_failed: int
+    jobs_found: int
+    jobs_new: int
+    jobs_duplicate: int
+    jobs_scored: int
+    jobs_relevant: int
+    jobs_promising: int
+    jobs_alerted: int
+    query_latencies: List[QueryLatency]
+    replay: Dict[str, Any]
 
 
 @runtime_checkable
@@ -50,6 +127,24 @@ class WorkflowProtocol(Protocol):
     async def run(self, input_data: Dict[str, Any]) -> PipelineResult: ...
 
 
+class _SourceBudget:
+    """Concurrency cap and start spacing for one job source."""
+
+    def __init__(self, max_concurrent: int, min_interval_seconds: float) -> None:
+        self.semaphore = asyncio.Semaphore(max(1, int(max_concurrent)))
+        self.interval = timedelta(seconds=min_interval_seconds)
+        self.next_start: Optional[datetime] = None
+
+    async def wait_turn(self) -> None:
+        """Reserve the next start slot and sleep until it is due."""
+        now = workflow.now()
+        start = max(now, self.next_start or now)
+        self.next_start = start + self.interval
+        delay = (start - now).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
 @workflow.defn
 class MainPipelineWorkflow:
     """Main pipeline workflow"""
@@ -57,24 +152,306 @@ class MainPipelineWorkflow:
     def __init__(self) -> None:
         """Initialize workflow state."""
         self._state = WorkflowState()
+        self._latencies: List[QueryLatency] = []
+        # Inserted since the last dedup pass
+        self._new_ids: List[int] = []
 
     @workflow.query
     def get_progress(self) -> Dict[str, Any]:
-        """Get current workflow progress."""
+        """Get current workflow progress from the in-memory counters."""
+        progress = asdict(self._state)
+        progress["state"] = progress.pop("status")
+        return progress
+
+    def _observe_stage(self, stage: str, started: datetime) -> None:
+        """Record a stage's duration in the worker's Temporal metrics."""
+        workflow.metric_meter().create_histogram_timedelta(
+            "pipeline_workflow_stage_duration",
+            "Workflow time spent in each pipeline stage",
+        ).record(workflow.now() - started, {"stage": stage})
+
+    def _record(self, round_no: int, query: Dict[str, Any], latency: float,
+                result: Optional[ScrapeQueryResult], error: Optional[str]) -> None:
+        """Fold one finished query into the running totals."""
+        self._state.queries_done += 1
+        entry: QueryLatency = {
+            "query": query_key(query),
+            "round": round_no,
+            "latency_seconds": round(latency, 3),
+        }
+        if result is not None:
+            self._state.jobs_found += result.get("found", 0)
+            self._state.jobs_new += result.get("inserted", 0)
+            self._new_ids.extend(result.get("inserted_ids", []))
+            entry["found"] = result.get("found", 0)
+            entry["inserted"] = result.get("inserted", 0)
+        else:
+            self._state.queries_failed += 1
+            entry["error"] = error
+        self._latencies.append(entry)
+        if len(self._latencies) >= 2 * MAX_QUERY_LATENCIES:
+            self._latencies = self._slowest_queries()
+
+    def _slowest_queries(self) -> List[QueryLatency]:
+        return sorted(
+            self._latencies, key=lambda entry: entry["latency_seconds"], reverse=True
+        )[:MAX_QUERY_LATENCIES]
+
+    async def _run_query(
+        self,
+        round_no: int,
+        query: Dict[str, Any],
+        plan: SearchPlan,
+        pages: int,
+        incremental: bool,
+        archive_pages: Optional[bool],
+        limiter: asyncio.Semaphore,
+        budgets: Dict[str, _SourceBudget],
+    ) -> None:
+        """Scrape one query once its source budget and a global slot allow it."""
+        budget = budgets[query_source(query)]
+        async with budget.semaphore:
+            await budget.wait_turn()
+            async with limiter:
+                started = workflow.now()
+                result: Optional[ScrapeQueryResult] = None
+                error: Optional[str] = None
+                try:
+                    params = {
+                        "query": query,
+                        "pages": pages,
+                        "timespan": plan["timespan"],
+                        "incremental": incremental,
+                    }
+                    if archive_pages is not None:
+                        params["archive_pages"] = archive_pages
+                    result = await workflow.execute_activity(
+                        scrape_search_query,
+                        params,
+                        start_to_close_timeout=timedelta(minutes=15),
+                        heartbeat_timeout=timedelta(minutes=2),
+                        retry_policy=SCRAPE_RETRY_POLICY,
+                    )
+                except ActivityError as e:
+                    error = str(e.cause or e)
+                    workflow.logger.warning(f"Query {query_key(query)} failed: {error}")
+                latency = (workflow.now() - started).total_seconds()
+                self._record(round_no, query, latency, result, error)
+
+    async def _dedup(self) -> None:
+        """Mark the jobs inserted since the last pass that near-duplicate others."""
+        new_ids, self._new_ids = self._new_ids, []
+        if not new_ids:
+            return
+        self._state.status = "dedup"
+        stage_started = workflow.now()
+        for start in range(0, len(new_ids), DEDUP_BATCH_SIZE):
+            dedup = await workflow.execute_activity(
+                dedup_new_jobs,
+                {"job_ids": new_ids[start:start + DEDUP_BATCH_SIZE]},
+                start_to_close_timeout=timedelta(minutes=10),
+                retry_policy=SCRAPE_RETRY_POLICY,
+            )
+            self._state.jobs_duplicate += dedup.get("duplicates", 0)
+        self._observe_stage("dedup", stage_started)
+
+    async def _score(self, input_data: Dict[str, Any]) -> None:
+        """Score everything this run (or an earlier one) left in the FILTER stage."""
+        self._state.status = "scoring"
+        stage_started = workflow.now()
+        scoring = await workflow.execute_activity(
+            score_new_jobs,
+            {"config_path": input_data["config_path"]}
+            if "config_path" in input_data
+            else {},
+            start_to_close_timeout=timedelta(minutes=10),
+            retry_policy=SCRAPE_RETRY_POLICY,
+        )
+        self._state.jobs_scored += scoring.get("scored", 0)
+        self._state.jobs_relevant += scoring.get("relevant", 0)
+        self._state.jobs_promising += scoring.get("promising", 0)
+        self._observe_stage("filter", stage_started)
+
+    def _result(self, status: str) -> PipelineResult:
         return {
-            "state": self._state.current_video_index,
+            "status": status,
+            "rounds": self._state.round,
+            "queries": self._state.queries_done,
+            "queries_failed": self._state.queries_failed,
+            "jobs_found": self._state.jobs_found,
+            "jobs_new": self._state.jobs_new,
+            "jobs_duplicate": self._state.jobs_duplicate,
+            "jobs_scored": self._state.jobs_scored,
+            "jobs_relevant": self._state.jobs_relevant,
+            "jobs_promising": self._state.jobs_promising,
+            "jobs_alerted": self._state.jobs_alerted,
+            "query_latencies": self._slowest_queries(),
         }
 
+    async def _replay(self, input_data: Dict[str, Any]) -> PipelineResult:
+        """Ingest the archived pages instead of scraping, then score."""
+        options = input_data["replay"] if isinstance(input_data["replay"], dict) else {}
+        stage_started = workflow.now()
+        replay = await workflow.execute_activity(
+            replay_archived_pages,
+            {
+                **{
+                    key: options[key]
+                    for key in ("since", "until", "workers", "archive_dir", "rescore")
+                    if key in options
+                },
+                **({"config_path": input_data["config_path"]}
+                   if "config_path" in input_data else {}),
+            },
+            start_to_close_timeout=timedelta(hours=2),
+            retry_policy=SCRAPE_RETRY_POLICY,
+        )
+        self._observe_stage("replay", stage_started)
+        self._state.jobs_found += replay.get("jobs", 0)
+        self._state.jobs_new += replay.get("inserted", 0)
+        self._state.jobs_duplicate += replay.get("duplicates", 0)
+        await self._score(input_data)
+        self._state.status = "completed"
+        return {**self._result("completed"), "replay": replay}
+
+    def _should_continue_as_new(self, rounds_this_run: int, input_data: Dict[str, Any]) -> bool:
+        info = workflow.info()
+        max_events = int(input_data.get("max_history_events") or DEFAULT_MAX_HISTORY_EVENTS)
+        return (
+            rounds_this_run >= int(input_data.get("rounds_per_run") or DEFAULT_ROUNDS_PER_RUN)
+            or info.get_current_history_length() >= max_events
+            or info.is_continue_as_new_suggested()
+        )
+
     @workflow.run
     async def run(self, input_data: Dict[str, Any]) -> PipelineResult:
-        """Run the main pipeline workflow."""
+        """
+        Run the main pipeline workflow.
+
+        Every search query of every round is scraped as its own activity.
+        Queries run concurrently up to `max_concurrency`, further limited
+        per job source by `source_budgets`, and results are folded into the
+        workflow state as each query completes. The inserted jobs are then
+        checked for near-duplicates before everything new is scored.
+
+        With `interval_minutes` set the workflow scouts on a schedule
+        instead: it scrapes and scores one round every interval, up to
+        `rounds` rounds in total (0 runs until cancelled). Every
+        `rounds_per_run` rounds, or once the history reaches
+        `max_history_events`, it continues as a new run carrying its
+        counters along, so the history stays small however long it runs.
+
+        With `replay` set (True or the options of replay_archived_pages)
+        nothing is scraped: the pages in the page archive are parsed and
+        ingested offline and the new jobs scored. `archive_pages` turns
+        archiving of the scraped pages on or off for a regular run.
+        """
+        input_data = input_data or {}
+        interval_minutes = float(input_data.get("interval_minutes") or 0)
+        if input_data.get("state"):
+            self._state = WorkflowState(**input_data["state"])
+        else:
+            self._state.started_at = workflow.now().isoformat()
         try:
-            logger.info("The main workflow is running")
+            workflow.logger.info("The main workflow is running")
+            self._state.status = "running"
+            if input_data.get("replay"):
+                return await self._replay(input_data)
+
+            stage_started = workflow.now()
+            plan = await workflow.execute_activity(
+                load_search_plan,
+                {
+                    key: input_data[key]
+                    for key in ("config_path", "skip_after", "merge_keywords")
+                    if key in input_data
+                },
+                start_to_close_timeout=timedelta(minutes=1),
+            )
+            self._observe_stage("plan", stage_started)
+            if interval_minutes:
+                rounds = int(input_data.get("rounds") or 0)
+            else:
+                rounds = int(input_data.get("rounds") or plan["rounds"])
+            pages = int(input_data.get("pages_to_scrape") or plan["pages_to_scrape"])
+            queries = plan["queries"]
+            # Stop paginating at the first page of known postings
+            incremental = bool(input_data.get("incremental", True))
+            archive_pages = input_data.get("archive_pages")
+
+            limiter = asyncio.Semaphore(
+                int(input_data.get("max_concurrency") or DEFAULT_MAX_CONCURRENCY)
+            )
+            budget_overrides = input_data.get("source_budgets") or {}
+            budgets = {
+                source: _SourceBudget(**{
+                    **DEFAULT_SOURCE_BUDGETS.get(
+                        source, DEFAULT_SOURCE_BUDGETS["linkedin"]
+                    ),
+                    **budget_overrides.get(source, {}),
+                })
+                for source in sorted({query_source(q) for q in queries})
+            }
+
+            async def scrape_round() -> None:
+                self._state.round += 1
+                self._state.status = "running"
+                stage_started = workflow.now()
+                await asyncio.gather(
+                    *(
+                        self._run_query(
+                            self._state.round, query, plan, pages, incremental,
+                            archive_pages, limiter, budgets,
+                        )
+                        for query in queries
+                    )
+                )
+                self._observe_stage("scrape", stage_started)
+
+            if not interval_minutes:
+                self._state.queries_total = rounds * len(queries)
+                for _ in range(rounds):
+                    await scrape_round()
+                await self._dedup()
+                await self._score(input_data)
+                self._state.status = "completed"
+                return self._result("completed")
+
+            rounds_this_run = 0
+            while True:
+                self._state.queries_total += len(queries)
+                await scrape_round()
+                await self._dedup()
+                await self._score(input_data)
+                self._state.jobs_alerted = await workflow.execute_activity(
+                    count_alerted_jobs,
+                    {"since": self._state.started_at},
+                    start_to_close_timeout=timedelta(minutes=1),
+                    retry_policy=SCRAPE_RETRY_POLICY,
+                )
+                rounds_this_run += 1
+                if rounds and self._state.round >= rounds:
+                    self._state.status = "completed"
+                    self._state.next_round_at = None
+                    return self._result("completed")
+
+                interval = timedelta(minutes=interval_minutes)
+                self._state.status = "sleeping"
+                self._state.next_round_at = (workflow.now() + interval).isoformat()
+                await workflow.sleep(interval)
 
-            return await True
+                if self._should_continue_as_new(rounds_this_run, input_data):
+                    workflow.logger.info(
+                        f"Continuing as new after round {self._state.round}"
+                    )
+                    self._state.runs += 1
+                    workflow.continue_as_new(
+                        {**input_data, "state": asdict(self._state)}
+                    )
 
         except Exception as e:
-            logger.error(f"Workflow error: {e}")
+            workflow.logger.error(f"Workflow error: {e}")
+            self._state.status = "error"
             return {
                 "status": "error",
                 "error": str(e),
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, TypedDict
+
+from temporalio import workflow
+from temporalio.common import RetryPolicy
+
+with workflow.unsafe.imports_passed_through():
+    from activities.partition_activities import (
+        archive_job_partitions,
+        ensure_job_partitions,
+    )
+
+MAINTENANCE_RETRY_POLICY = RetryPolicy(
+    initial_interval=timedelta(minutes=1),
+    backoff_coefficient=2.0,
+    maximum_attempts=5,
+)
+
+
+class MaintenanceResult(TypedDict, total=False):
+    """Partitions created and archived by one maintenance run."""
+
+    created: List[str]
+    partitions: int
+    default_rows: int
+    archived: List[Dict[str, Any]]
+
+
+@workflow.defn
+class PartitionMaintenanceWorkflow:
+    """
+    Keep the monthly partitions of jobs ahead of time and archive the ones
+    past the retention. Runs on a daily schedule; both steps are no-ops
+    when there is nothing to do.
+    """
+
+    @workflow.run
+    async def run(self, input_data: Optional[Dict[str, Any]] = None) -> MaintenanceResult:
+        input_data = input_data or {}
+        ensured = await workflow.execute_activity(
+            ensure_job_partitions,
+            {k: input_data[k] for k in ("months_ahead",) if k in input_data},
+            start_to_close_timeout=timedelta(minutes=10),
+            retry_policy=MAINTENANCE_RETRY_POLICY,
+        )
+        result: MaintenanceResult = {**ensured, "archived": []}
+        if input_data.get("archive", True):
+            result["archived"] = await workflow.execute_activity(
+                archive_job_partitions,
+                {
+                    k: input_data[k]
+                    for k in ("keep_months", "mode", "archive_dir")
+                    if k in input_data
+                },
+                start_to_close_timeout=timedelta(hours=2),
+                retry_policy=MAINTENANCE_RETRY_POLICY,
+            )
+        workflow.logger.info(f"Partition maintenance: {result}")
+        return result
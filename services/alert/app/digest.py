@@ -0,0 +1,273 @@
+"""
+Digest-mode alert delivery.
+
+Pending jobs (relevant, original, not yet notified) are claimed from the
+ALERT work queue, coalesced into digests of at most DIGEST_MAX_JOBS and
+posted to the webhook concurrently over one pooled HTTP session. A digest
+goes out once it is full or its oldest job has waited DIGEST_MAX_WAIT_SEC.
+
+Claiming and delivery are separate transactions: the jobs of due digests
+get a delivery lease (alert_claimed_at) that is committed before any
+webhook call, so no transaction stays open while the webhook is retried.
+Afterwards every job in a delivered digest is marked notified with a
+single UPDATE and failed ones are released. Jobs of a sender that died
+mid-delivery become claimable again once their lease expires.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiohttp
+from sqlalchemy import or_, update
+
+from shared.db.database import get_db
+from shared.db.models import Jobs
+from shared.db.queue import PipelineStage, claim_jobs
+from shared.utils.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUEST_TIMEOUT_SECONDS = 30
+MAX_BACKOFF_SECONDS = 30.0
+# Longest pause of run_forever after consecutive failed passes
+MAX_PASS_BACKOFF_SECONDS = 300.0
+
+
+@dataclass
+class DigestReport:
+    """Outcome of one delivery pass."""
+
+    pending: int = 0
+    digests_sent: int = 0
+    digests_failed: int = 0
+    jobs_notified: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Counters plus end-to-end latency (job created -> notified) in seconds."""
+        result = asdict(self)
+        latencies = sorted(result.pop("latencies"))
+        if latencies:
+            result["latency_p50"] = round(statistics.median(latencies), 3)
+            result["latency_p95"] = round(
+                latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3
+            )
+            result["latency_max"] = round(latencies[-1], 3)
+        return result
+
+
+def digest_payload(webhook_id: str, jobs: Sequence[Jobs]) -> Dict[str, Any]:
+    """Webhook body for one digest."""
+    lines = [f"{len(jobs)} new job{'s' if len(jobs) != 1 else ''}"]
+    lines += [f"- {job.title} @ {job.company} ({job.location}) {job.job_url}" for job in jobs]
+    return {
+        "webhook_id": webhook_id,
+        "text": "\n".join(lines),
+        "jobs": [
+            {
+                "id": job.id,
+                "title": job.title,
+                "company": job.company,
+                "location": job.location,
+                "job_url": job.job_url,
+                "date": job.date.isoformat() if job.date else None,
+            }
+            for job in jobs
+        ],
+    }
+
+
+class DigestSender:
+    """Coalesces pending jobs into digests and delivers them."""
+
+    def __init__(
+        self,
+        webhook_url: str,
+        webhook_id: str = "",
+        max_jobs: int = 25,
+        max_wait_seconds: float = 60,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        lease_seconds: Optional[float] = None,
+    ) -> None:
+        self.webhook_url = webhook_url
+        self.webhook_id = webhook_id
+        self.max_jobs = max_jobs
+        self.max_wait_seconds = max_wait_seconds
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        # Longer than the worst case of one delivery with all its retries
+        self.lease = timedelta(
+            seconds=lease_seconds
+            if lease_seconds is not None
+            else 2 * max_retries * (REQUEST_TIMEOUT_SECONDS + MAX_BACKOFF_SECONDS)
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def send_digest(self, jobs: Sequence[Jobs]) -> bool:
+        """Post one digest, retrying transient failures with backoff."""
+        with track_stage("alert", len(jobs)):
+            return await self._post_digest(jobs)
+
+    async def _post_digest(self, jobs: Sequence[Jobs]) -> bool:
+        payload = digest_payload(self.webhook_id, jobs)
+        for attempt in range(1, self.max_retries + 1):
+            delay = min(MAX_BACKOFF_SECONDS, 2.0 ** attempt)
+            try:
+                async with self._get_session().post(self.webhook_url, json=payload) as response:
+                    if response.status < 300:
+                        return True
+                    if response.status not in RETRY_STATUSES:
+                        logger.error(f"Webhook rejected digest: HTTP {response.status}")
+                        return False
+                    retry_after = response.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = float(retry_after)
+                    logger.warning(
+                        f"Webhook returned HTTP {response.status} "
+                        f"(attempt {attempt}/{self.max_retries})"
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(
+                    f"Failed to send digest (attempt {attempt}/{self.max_retries}): {e}"
+                )
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+        return False
+
+    def _due(self, jobs: Sequence[Jobs], now: datetime) -> bool:
+        if len(jobs) >= self.max_jobs:
+            return True
+        oldest = min((job.created_at for job in jobs if job.created_at), default=now)
+        return (now - oldest).total_seconds() >= self.max_wait_seconds
+
+    async def _claim_due(self, report: DigestReport) -> List[List[Jobs]]:
+        """
+        Lease the jobs of every due digest and commit. A partial digest is
+        held back (its rows released) until its oldest job has waited
+        max_wait_seconds.
+        """
+        now = datetime.now()
+        async with get_db() as session:
+            jobs = await claim_jobs(
+                session,
+                PipelineStage.ALERT,
+                limit=self.max_jobs * self.concurrency,
+                where=or_(
+                    Jobs.alert_claimed_at.is_(None),
+                    Jobs.alert_claimed_at < now - self.lease,
+                ),
+            )
+            report.pending = len(jobs)
+            digests = [
+                digest
+                for digest in (
+                    jobs[i : i + self.max_jobs] for i in range(0, len(jobs), self.max_jobs)
+                )
+                if self._due(digest, now)
+            ]
+            if digests:
+                await session.execute(
+                    update(Jobs)
+                    .where(Jobs.id.in_([job.id for digest in digests for job in digest]))
+                    .values(alert_claimed_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+        return digests
+
+    async def run_once(self) -> DigestReport:
+        """
+        Lease the due digests, send them outside any transaction and mark
+        the delivered jobs notified. Leased rows are skipped by other alert
+        workers, so no job is sent twice while its lease holds.
+        """
+        report = DigestReport()
+        digests = await self._claim_due(report)
+        if not digests:
+            return report
+
+        results = await asyncio.gather(*(self.send_digest(d) for d in digests))
+
+        sent: List[Jobs] = []
+        failed: List[Jobs] = []
+        for digest, ok in zip(digests, results):
+            if ok:
+                report.digests_sent += 1
+                sent.extend(digest)
+            else:
+                report.digests_failed += 1
+                failed.extend(digest)
+
+        async with get_db() as session:
+            if sent:
+                await session.execute(
+                    update(Jobs)
+                    .where(Jobs.id.in_([job.id for job in sent]))
+                    .values(notified=True, alert_claimed_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+            if failed:
+                # Retried on the next pass
+                await session.execute(
+                    update(Jobs)
+                    .where(Jobs.id.in_([job.id for job in failed]))
+                    .values(alert_claimed_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+        if sent:
+            now = datetime.now()
+            report.jobs_notified = len(sent)
+            report.latencies = [
+                (now - job.created_at).total_seconds()
+                for job in sent
+                if job.created_at
+            ]
+
+        logger.info(f"Digest pass: {report.to_dict()}")
+        return report
+
+    async def run_forever(self, poll_interval: float = 10) -> None:
+        """
+        Deliver digests until cancelled; drains backlogs without sleeping.
+        A failed pass (database or network down) is logged and retried with
+        backoff instead of stopping the service.
+        """
+        failures = 0
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    report = await self.run_once()
+                except Exception:
+                    failures += 1
+                    delay = min(MAX_PASS_BACKOFF_SECONDS, poll_interval * 2 ** (failures - 1))
+                    logger.exception(
+                        f"Digest pass failed ({failures} in a row), retrying in {delay:.0f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                failures = 0
+                backlog = report.pending >= self.max_jobs * self.concurrency
+                if not (backlog and report.jobs_notified):
+                    await asyncio.sleep(max(0.0, poll_interval - (time.monotonic() - started)))
+        finally:
+            await self.close()
@@ -8,6 +8,14 @@ class Settings(BaseSettings):
     MAX_FILE_MINUTES: int = 1  # Allow up to 1 minute
     HEARTBEAT_SEC: int = 20
 
+    # Digest batching
+    DIGEST_MAX_JOBS: int = 25  # jobs per webhook call
+    DIGEST_MAX_WAIT_SEC: int = 60  # oldest pending job waits at most this long
+    DIGEST_CONCURRENCY: int = 4  # webhook calls in flight
+    DIGEST_MAX_RETRIES: int = 5
+    POLL_INTERVAL_SEC: int = 10
+    METRICS_PORT: int = 9101  # Prometheus /metrics, 0 disables
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,56 @@
+"""
+Local stand-in for the alert webhook.
+
+Accepts digests, logs them and keeps counts, optionally failing a share of
+requests to exercise retries. Point WEBHOOK_URL at it for local runs:
+
+    python -m app.stub_receiver --port 9000 --fail-rate 0.2
+"""
+
+import argparse
+import logging
+import random
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(fail_rate: float = 0.0) -> web.Application:
+    app = web.Application()
+    app["digests"] = []
+
+    async def receive(request: web.Request) -> web.Response:
+        if random.random() < fail_rate:
+            return web.Response(status=503)
+        payload = await request.json()
+        app["digests"].append(payload)
+        logger.info(
+            f"Digest #{len(app['digests'])} with {len(payload.get('jobs', []))} jobs"
+        )
+        return web.json_response({"ok": True})
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "digests": len(app["digests"]),
+                "jobs": sum(len(d.get("jobs", [])) for d in app["digests"]),
+            }
+        )
+
+    app.router.add_post("/", receive)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in alert webhook receiver")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(args.fail_rate), port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import asyncio
+import logging
+
+from app.digest import DigestSender
+from app.settings import settings
+from shared.db.database import configure
+from shared.utils.metrics import start_metrics_server
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    configure(profile="worker")
+    start_metrics_server(settings.METRICS_PORT)
+    sender = DigestSender(
+        webhook_url=settings.WEBHOOK_URL,
+        webhook_id=settings.WEBHOOK_ID,
+        max_jobs=settings.DIGEST_MAX_JOBS,
+        max_wait_seconds=settings.DIGEST_MAX_WAIT_SEC,
+        concurrency=settings.DIGEST_CONCURRENCY,
+        max_retries=settings.DIGEST_MAX_RETRIES,
+    )
+    logger.info(f"Sending job digests to webhook {settings.WEBHOOK_ID}")
+    await sender.run_forever(poll_interval=settings.POLL_INTERVAL_SEC)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
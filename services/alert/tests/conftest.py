@@ -0,0 +1,6 @@
+import os
+import sys
+
+# app.* lives in services/alert, shared.* at the repository root
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), os.path.abspath(os.path.join(HERE, "..", "..", ".."))]
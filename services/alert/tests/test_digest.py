@@ -0,0 +1,228 @@
+"""
+DigestSender against the stand-in receiver and a real Postgres.
+
+Tables are created in their own schema of TEST_DATABASE_URL; the tests
+are skipped without it.
+
+    TEST_DATABASE_URL=postgresql+asyncpg://... python -m pytest services/alert/tests
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.digest import DigestReport, DigestSender
+from app.stub_receiver import create_app
+from shared.db import database
+from shared.db.database import Base
+from shared.db.models import Jobs
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "test_alert"
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+async def _setup_db(jobs: int):
+    """Fresh tables holding `jobs` pending alerts, used by get_db()."""
+    engine = create_async_engine(
+        DATABASE_URL, connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    database.configure(profile="worker")
+    database.engines._engines["worker"] = engine
+    database.engines._session_makers["worker"] = session_maker
+
+    created = datetime.now() - timedelta(hours=1)
+    async with session_maker() as session:
+        session.add_all(
+            Jobs(
+                title=f"Engineer {i}",
+                company="Acme",
+                location="Remote",
+                job_url=f"https://www.linkedin.com/jobs/view/{i}",
+                created_at=created,
+                new=False,
+                relevant=True,
+            )
+            for i in range(jobs)
+        )
+        await session.commit()
+    return engine, session_maker
+
+
+async def _teardown_db(engine) -> None:
+    database.engines._engines.pop("worker", None)
+    database.engines._session_makers.pop("worker", None)
+    await engine.dispose()
+
+
+async def _counts(session_maker):
+    async with session_maker() as session:
+        row = (
+            await session.execute(
+                select(
+                    func.count().filter(Jobs.notified),
+                    func.count().filter(Jobs.alert_claimed_at.is_not(None)),
+                )
+            )
+        ).one()
+    return tuple(row)
+
+
+def _sender(server: TestServer, **kwargs) -> DigestSender:
+    return DigestSender(
+        webhook_url=str(server.make_url("/")),
+        max_jobs=25,
+        max_wait_seconds=0,
+        **kwargs,
+    )
+
+
+def test_delivers_digests_and_marks_jobs_notified():
+    async def scenario():
+        engine, session_maker = await _setup_db(30)
+        app = create_app()
+        server = TestServer(app)
+        await server.start_server()
+        sender = _sender(server)
+        try:
+            report = await sender.run_once()
+            assert report.digests_sent == 2
+            assert report.jobs_notified == 30
+            assert sum(len(d["jobs"]) for d in app["digests"]) == 30
+            assert await _counts(session_maker) == (30, 0)
+
+            again = await sender.run_once()
+            assert again.pending == 0
+            assert len(app["digests"]) == 2
+        finally:
+            await sender.close()
+            await server.close()
+            await _teardown_db(engine)
+
+    asyncio.run(scenario())
+
+
+def test_no_rows_locked_while_posting():
+    async def scenario():
+        engine, session_maker = await _setup_db(5)
+        locked = []
+
+        async def receive(request: web.Request) -> web.Response:
+            # Fails if the sender still held the claimed rows' locks
+            async with session_maker() as session:
+                await session.execute(text("SET LOCAL lock_timeout = '1s'"))
+                rows = await session.execute(
+                    select(Jobs.id).with_for_update(nowait=True)
+                )
+                locked.append(len(rows.all()))
+                await session.rollback()
+            return web.json_response({"ok": True})
+
+        app = web.Application()
+        app.router.add_post("/", receive)
+        server = TestServer(app)
+        await server.start_server()
+        sender = _sender(server)
+        try:
+            report = await sender.run_once()
+            assert report.jobs_notified == 5
+            assert locked == [5]
+        finally:
+            await sender.close()
+            await server.close()
+            await _teardown_db(engine)
+
+    asyncio.run(scenario())
+
+
+def test_failed_digest_is_released_for_the_next_pass():
+    async def scenario():
+        engine, session_maker = await _setup_db(10)
+        server = TestServer(create_app(fail_rate=1.0))
+        await server.start_server()
+        sender = _sender(server, max_retries=1)
+        try:
+            report = await sender.run_once()
+            assert report.digests_failed == 1
+            assert await _counts(session_maker) == (0, 0)
+        finally:
+            await sender.close()
+            await server.close()
+            await _teardown_db(engine)
+
+    asyncio.run(scenario())
+
+
+def test_only_unleased_or_expired_jobs_are_claimed():
+    async def scenario():
+        engine, session_maker = await _setup_db(10)
+        now = datetime.now()
+        async with session_maker() as session:
+            await session.execute(
+                update(Jobs).where(Jobs.id <= 3).values(alert_claimed_at=now)
+            )
+            await session.execute(
+                update(Jobs)
+                .where(Jobs.id.between(4, 5))
+                .values(alert_claimed_at=now - timedelta(hours=1))
+            )
+            await session.commit()
+        app = create_app()
+        server = TestServer(app)
+        await server.start_server()
+        sender = _sender(server, lease_seconds=600)
+        try:
+            report = await sender.run_once()
+            assert report.jobs_notified == 7
+            assert sorted(job["id"] for job in app["digests"][0]["jobs"]) == list(range(4, 11))
+            assert await _counts(session_maker) == (7, 3)
+        finally:
+            await sender.close()
+            await server.close()
+            await _teardown_db(engine)
+
+    asyncio.run(scenario())
+
+
+def test_run_forever_survives_failed_passes():
+    async def scenario():
+        sender = DigestSender(webhook_url="http://127.0.0.1:9/", max_wait_seconds=0)
+        passes = []
+        done = asyncio.Event()
+
+        async def run_once():
+            passes.append(time.monotonic())
+            if len(passes) <= 2:
+                raise ConnectionResetError("database restarted")
+            done.set()
+            return DigestReport()
+
+        sender.run_once = run_once
+        task = asyncio.create_task(sender.run_forever(poll_interval=0.05))
+        await asyncio.wait_for(done.wait(), 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # Closed by run_forever, and usable again afterwards
+        assert sender._session is None
+        assert not sender._get_session().closed
+        await sender.close()
+        return passes
+
+    passes = asyncio.run(scenario())
+    assert len(passes) == 3
+    # Backoff doubles between consecutive failures
+    assert passes[2] - passes[1] >= 2 * 0.05 * 0.9
@@ -0,0 +1,271 @@
+"""
+On-disk HTTP response cache for the scrapers.
+
+Bodies are stored zlib-compressed in a SQLite file keyed by normalized URL,
+together with their ETag/Last-Modified validators. Fresh entries are
+served without touching the network; stale ones are revalidated with a
+conditional request so an unchanged page costs a 304 instead of a full
+download. The store is bounded in bytes and evicts least recently used
+entries first. fetch() runs all SQLite work and decompression on a worker
+thread, and access times are written in batches rather than per hit.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Union
+
+import aiohttp
+
+from shared.utils.urls import normalize_url
+
+if TYPE_CHECKING:
+    from shared.clients.http_fetcher import HttpFetcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "data/http_cache")
+DEFAULT_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+DEFAULT_TTL_SECONDS = 3600
+# Pending access times are written once this many hits have accumulated
+ACCESS_FLUSH_SIZE = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at);
+"""
+
+
+@dataclass
+class CacheStats:
+    """Counters for cache effectiveness."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+    evicted: int = 0
+    bytes_saved: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.fetched_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators to send when revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+
+class HttpCache:
+    """Size-bounded, compressed, LRU-evicted response store."""
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        # url -> last access time not yet written to the store
+        self._accessed: Dict[str, float] = {}
+        # The connection is used from to_thread workers, one call at a time
+        self._lock = threading.Lock()
+
+        # WAL lets several worker processes share the same cache file
+        self._db = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._total_bytes = self._db.execute(
+            "SELECT coalesce(sum(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_accessed()
+            self._db.close()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the stored entry for url, fresh or not."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+        body, etag, last_modified, fetched_at = row
+        return CacheEntry(key, zlib.decompress(body), etag, last_modified, fetched_at)
+
+    def _flush_accessed(self) -> None:
+        """Write the batched access times; callers hold the lock."""
+        if not self._accessed:
+            return
+        pending = [(accessed_at, url) for url, accessed_at in self._accessed.items()]
+        self._accessed.clear()
+        self._db.execute("BEGIN")
+        self._db.executemany("UPDATE responses SET accessed_at = ? WHERE url = ?", pending)
+        self._db.execute("COMMIT")
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        key = normalize_url(url)
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._accessed.pop(key, None)
+            previous = self._db.execute(
+                "SELECT size FROM responses WHERE url = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, body, size, raw_size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), len(body), etag, last_modified, now, now),
+            )
+            self._total_bytes += len(compressed) - (previous[0] if previous else 0)
+            self.stats.stored += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def touch(self, entry: CacheEntry) -> None:
+        """Mark an entry as freshly validated."""
+        now = time.time()
+        entry.fetched_at = now
+        with self._lock:
+            self._accessed.pop(entry.url, None)
+            self._db.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, entry.url),
+            )
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """Drop least recently used entries until under target_ratio of max_bytes."""
+        with self._lock:
+            return self._evict(target_ratio)
+
+    def _evict(self, target_ratio: float = 0.9) -> int:
+        # Recency must be on disk before it decides what goes
+        self._flush_accessed()
+        self._total_bytes = self._db.execute(
+            "SELECT coalesce(sum(size), 0) FROM responses"
+        ).fetchone()[0]
+        target = int(self.max_bytes * target_ratio)
+        evicted = 0
+        # Walked lazily through the index, so only the victims are read
+        rows = self._db.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        )
+        victims = []
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            victims.append((url,))
+            self._total_bytes -= size
+            evicted += 1
+        rows.close()
+        if victims:
+            self._db.executemany("DELETE FROM responses WHERE url = ?", victims)
+        self.stats.evicted += evicted
+        logger.debug(f"Evicted {evicted} cached responses")
+        return evicted
+
+    async def fetch(
+        self,
+        session: Union[aiohttp.ClientSession, "HttpFetcher"],
+        url: str,
+        ttl_seconds: Optional[float] = None,
+        allow_stale: bool = False,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[str]:
+        """
+        GET url through the cache and return the body text, or None on 404.
+        session is an aiohttp session or a rate-limited HttpFetcher.
+
+        Entries younger than ttl_seconds are served directly. With
+        allow_stale any stored entry is served without revalidation, which
+        suits pages whose content is already known to be in the database.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = await asyncio.to_thread(self.get, url)
+        if entry is not None and (allow_stale or entry.age() < ttl):
+            self.stats.hits += 1
+            self.stats.bytes_saved += len(entry.body)
+            return entry.text()
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            request_headers.update(entry.conditional_headers())
+
+        async with session.get(url, headers=request_headers) as response:
+            if response.status == 304 and entry is not None:
+                await asyncio.to_thread(self.touch, entry)
+                self.stats.revalidated += 1
+                self.stats.bytes_saved += len(entry.body)
+                return entry.text()
+            if response.status == 404:
+                self.stats.misses += 1
+                return None
+            response.raise_for_status()
+            body = await response.read()
+            self.stats.misses += 1
+            await asyncio.to_thread(
+                self.put,
+                url,
+                body,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            return body.decode(response.get_encoding(), errors="replace")
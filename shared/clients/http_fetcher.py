@@ -0,0 +1,256 @@
+"""
+Shared async HTTP fetcher.
+
+One keep-alive connection pool per fetcher, a cap on in-flight requests and
+a token bucket per host. Buckets are adaptive: a throttling response
+(429, LinkedIn's 999, 503) halves the host's rate and pauses it, and every
+success creeps the rate back up towards the configured budget, so
+throughput settles at whatever the host tolerates without fixed sleeps.
+"""
+
+import asyncio
+import codecs
+import contextlib
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from shared.utils.metrics import HTTP_REQUEST_DURATION
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = {429, 503, 999}
+
+DEFAULT_RATE = 2.0  # requests per second per host
+DEFAULT_BURST = 4
+DEFAULT_MAX_IN_FLIGHT = 32
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class ThrottledError(Exception):
+    """Raised when a host keeps throttling after all retries."""
+
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"{url} still throttled with HTTP {status}")
+        self.url = url
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Adaptive token bucket for one host.
+
+    `rate` moves between `min_rate` and `max_rate`: halved on throttling,
+    increased by `recovery_step` on every success.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        burst: int = DEFAULT_BURST,
+        min_rate: Optional[float] = None,
+        recovery_step: Optional[float] = None,
+    ) -> None:
+        self.max_rate = max_rate
+        self.min_rate = min_rate if min_rate is not None else max_rate / 32
+        self.recovery_step = recovery_step if recovery_step is not None else max_rate / 20
+        self.rate = max_rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._throttle_streak = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def on_success(self) -> None:
+        self._throttle_streak = 0
+        self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> float:
+        """Slow down after a throttling response; returns the pause applied."""
+        self._throttle_streak += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0
+        pause = retry_after
+        if pause is None:
+            pause = min(60.0, 2.0 ** self._throttle_streak)
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        return pause
+
+
+@dataclass
+class FetcherStats:
+    requests: int = 0
+    throttled: int = 0
+    errors: int = 0
+    bytes_received: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if value and value.isdigit():
+        return float(value)
+    return None
+
+
+class HttpFetcher:
+    """Rate-limited, pooled HTTP client shared by all scrapers in a process."""
+
+    def __init__(
+        self,
+        host_rates: Optional[Mapping[str, float]] = None,
+        default_rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: float = 30,
+    ) -> None:
+        self.host_rates = dict(host_rates or {})
+        self.default_rate = default_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.stats = FetcherStats()
+        self._headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._max_in_flight,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=self._headers, timeout=self._timeout
+            )
+        return self._session
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            rate = self.host_rates.get(host, self.default_rate)
+            self._buckets[host] = TokenBucket(rate, burst=self.burst)
+        return self._buckets[host]
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "HttpFetcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def get(
+        self, url: str, headers: Optional[Mapping[str, str]] = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        GET url under the host's rate budget and yield the unread response.
+
+        Throttling responses are retried after the bucket backs off; any
+        other status is handed to the caller. The body is not buffered, so
+        callers can stream it. Same call shape as aiohttp.ClientSession.get,
+        so HttpCache.fetch accepts a fetcher in place of a session.
+        """
+        host = urlsplit(url).netloc.lower()
+        bucket = self.bucket(host)
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            async with self._in_flight:
+                self.stats.requests += 1
+                started = time.perf_counter()
+                try:
+                    response = await session.get(url, headers=headers)
+                except aiohttp.ClientError:
+                    self.stats.errors += 1
+                    HTTP_REQUEST_DURATION.labels(host, "error").observe(
+                        time.perf_counter() - started
+                    )
+                    raise
+                HTTP_REQUEST_DURATION.labels(host, str(response.status)).observe(
+                    time.perf_counter() - started
+                )
+                if response.status in THROTTLE_STATUSES:
+                    self.stats.throttled += 1
+                    retry_after = _retry_after(response.headers)
+                    response.release()
+                    pause = bucket.on_throttle(retry_after)
+                    logger.warning(
+                        f"HTTP {response.status} from {url}, rate now "
+                        f"{bucket.rate:.2f}/s, pausing {pause:.1f}s"
+                    )
+                    if attempt == self.max_retries:
+                        raise ThrottledError(url, response.status)
+                    continue
+                bucket.on_success()
+                try:
+                    yield response
+                finally:
+                    response.release()
+                return
+
+    async def stream(
+        self,
+        url: str,
+        chunk_size: int = 64 * 1024,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield the response body in chunks; raises for error statuses."""
+        async with self.get(url, headers=headers) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                self.stats.bytes_received += len(chunk)
+                yield chunk
+
+    async def stream_text(
+        self, url: str, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[str]:
+        """Yield the response body as decoded text chunks."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        async for chunk in self.stream(url, chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
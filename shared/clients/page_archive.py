@@ -0,0 +1,283 @@
+"""
+Append-only archive of raw scraped pages.
+
+Every page the scrapers fetch can be kept here so the pipeline can be
+re-run offline: after a parser or search_config.json change, or as a
+deterministic load test on real data. Pages are written as zlib-compressed
+records to segment files (pages-<start>-<pid>-<n>.dat) that are only ever
+appended to, each with a companion .idx of fixed-width entries (offset,
+size, URL key, body CRC, kind, fetch time). Both are read through mmap, so
+scanning an archive costs one decompression per page and looking a URL up
+costs a dict probe. Each writing process owns its own segments, so the
+worker processes share a directory without locking. A page identical to
+the last archived copy of its URL is skipped. Within a process, appends
+and lookups are serialized by a lock, so they can run on worker threads
+off the event loop.
+
+    archive = PageArchive()
+    await asyncio.to_thread(archive.append, PAGE_SEARCH, url, html)
+    for page in archive.pages(kind=PAGE_SEARCH):
+        jobs = linkedin.parse_search_results(page.text())
+"""
+
+import glob
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from shared.utils.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", "data/page_archive")
+DEFAULT_SEGMENT_BYTES = int(os.getenv("PAGE_ARCHIVE_SEGMENT_BYTES", str(256 * 1024 * 1024)))
+
+PAGE_SEARCH = 0
+PAGE_DETAIL = 1
+PAGE_KINDS = {"search": PAGE_SEARCH, "detail": PAGE_DETAIL}
+
+# Record: magic, kind, fetched_at, url length, compressed body length,
+# then the URL and the compressed body
+_RECORD = struct.Struct("<4sBdHI")
+_MAGIC = b"PGA1"
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("size", "<u4"),
+        ("url_key", "<u8"),
+        ("crc", "<u4"),
+        ("kind", "u1"),
+        ("fetched_at", "<f8"),
+    ]
+)
+
+
+def url_key(url: str) -> int:
+    """64-bit key of the normalized URL."""
+    digest = hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass
+class ArchivedPage:
+    kind: int
+    url: str
+    fetched_at: float
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class _Segment:
+    """One data file and its index, mapped read-only."""
+
+    def __init__(self, data_path: str) -> None:
+        self.data_path = data_path
+        self.index_path = data_path[: -len(".dat")] + ".idx"
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.data_path)
+
+    def index(self) -> np.ndarray:
+        """Index entries whose record is fully on disk."""
+        try:
+            size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        count = size // INDEX_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        # A writer that died mid-append may leave a partial trailing entry
+        entries = np.memmap(self.index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,))
+        data_size = os.path.getsize(self.data_path)
+        return entries[entries["offset"] + entries["size"] <= data_size]
+
+    def _data(self, end: int) -> mmap.mmap:
+        # The active segment grows, so remap once a record lies past the map
+        if self._map is None or len(self._map) < end:
+            self.close()
+            with open(self.data_path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, offset: int, size: int) -> ArchivedPage:
+        data = self._data(offset + size)
+        magic, kind, fetched_at, url_size, body_size = _RECORD.unpack_from(data, offset)
+        if magic != _MAGIC:
+            raise ValueError(f"Corrupt record at {self.name}:{offset}")
+        start = offset + _RECORD.size
+        url = data[start:start + url_size].decode("utf-8")
+        start += url_size
+        body = zlib.decompress(data[start:start + body_size])
+        return ArchivedPage(kind, url, fetched_at, body)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class PageArchive:
+    """Compressed, append-only page store with an offset index per segment."""
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_PAGE_ARCHIVE_DIR,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.appended = 0
+        self.skipped = 0
+        self._segments: Dict[str, _Segment] = {}
+        # url key -> (segment path, offset, size, crc) of its latest record
+        self._latest: Optional[Dict[int, Tuple[str, int, int, int]]] = None
+        self._data_file = None
+        self._index_file = None
+        self._sequence = 0
+        # Writer state, the latest-record map and segment maps are shared
+        self._lock = threading.Lock()
+
+    def segments(self) -> List[_Segment]:
+        """All segments in the directory, oldest first."""
+        for path in sorted(glob.glob(os.path.join(self.directory, "pages-*.dat"))):
+            if path not in self._segments:
+                self._segments[path] = _Segment(path)
+        return [self._segments[path] for path in sorted(self._segments)]
+
+    def _load_latest(self) -> Dict[int, Tuple[str, int, int, int]]:
+        if self._latest is None:
+            latest = {}
+            for segment in self.segments():
+                for entry in segment.index():
+                    latest[int(entry["url_key"])] = (
+                        segment.data_path, int(entry["offset"]),
+                        int(entry["size"]), int(entry["crc"]),
+                    )
+            self._latest = latest
+        return self._latest
+
+    def _open_segment(self) -> None:
+        self.close_writer()
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+        path = os.path.join(
+            self.directory, f"pages-{stamp}-{os.getpid()}-{self._sequence:04d}.dat"
+        )
+        self._data_file = open(path, "ab")
+        self._index_file = open(path[: -len(".dat")] + ".idx", "ab")
+        self._segments[path] = _Segment(path)
+        logger.info(f"Opened page archive segment {path}")
+
+    def append(
+        self,
+        kind: int,
+        url: str,
+        body: Union[str, bytes],
+        fetched_at: Optional[float] = None,
+    ) -> bool:
+        """Archive a page; False if it equals the last archived copy of url."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        key = url_key(url)
+        crc = zlib.crc32(body)
+        with self._lock:
+            return self._append(kind, url, body, key, crc, fetched_at)
+
+    def _append(
+        self, kind: int, url: str, body: bytes, key: int, crc: int, fetched_at: Optional[float]
+    ) -> bool:
+        latest = self._load_latest()
+        if key in latest and latest[key][3] == crc:
+            self.skipped += 1
+            return False
+
+        if self._data_file is None or self._data_file.tell() >= self.segment_bytes:
+            self._open_segment()
+        url_bytes = url.encode("utf-8")
+        compressed = zlib.compress(body, 6)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        offset = self._data_file.tell()
+        record = (
+            _RECORD.pack(_MAGIC, kind, fetched_at, len(url_bytes), len(compressed))
+            + url_bytes
+            + compressed
+        )
+        # Data first, then its index entry, so readers never see a dangling one
+        self._data_file.write(record)
+        self._data_file.flush()
+        entry = np.array(
+            [(offset, len(record), key, crc, kind, fetched_at)], dtype=INDEX_DTYPE
+        )
+        self._index_file.write(entry.tobytes())
+        self._index_file.flush()
+        latest[key] = (self._data_file.name, offset, len(record), crc)
+        self.appended += 1
+        return True
+
+    def get(self, url: str) -> Optional[ArchivedPage]:
+        """Latest archived copy of url."""
+        key = url_key(url)
+        with self._lock:
+            found = self._load_latest().get(key)
+            if found is None:
+                return None
+            path, offset, size, _ = found
+            return self._segments[path].read(offset, size)
+
+    def pages(
+        self,
+        kind: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[ArchivedPage]:
+        """Archived pages in append order, optionally of one kind and time range."""
+        for segment in self.segments():
+            entries = segment.index()
+            if kind is not None:
+                entries = entries[entries["kind"] == kind]
+            if since is not None:
+                entries = entries[entries["fetched_at"] >= since]
+            if until is not None:
+                entries = entries[entries["fetched_at"] < until]
+            for offset, size in zip(entries["offset"].tolist(), entries["size"].tolist()):
+                with self._lock:
+                    page = segment.read(offset, size)
+                yield page
+
+    def stats(self) -> Dict[str, int]:
+        """Segment, page and byte counts of the archive."""
+        entries = [segment.index() for segment in self.segments()]
+        return {
+            "segments": len(entries),
+            "pages": sum(len(e) for e in entries),
+            "search_pages": sum(int((e["kind"] == PAGE_SEARCH).sum()) for e in entries),
+            "detail_pages": sum(int((e["kind"] == PAGE_DETAIL).sum()) for e in entries),
+            "bytes": sum(int(e["size"].sum()) for e in entries),
+        }
+
+    def close_writer(self) -> None:
+        for f in (self._data_file, self._index_file):
+            if f is not None:
+                f.close()
+        self._data_file = self._index_file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self.close_writer()
+            for segment in self._segments.values():
+                segment.close()
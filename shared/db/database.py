@@ -1,56 +1,338 @@
+"""
+Database settings, engines and sessions.
+
+Engines are created lazily, one per pool profile and process, from
+DatabaseSettings (environment / .env, or the service's own Settings passed
+to configure()). Profiles size the pool for the kind of process:
+
+    api     many short requests; small pool, fails fast
+    worker  Temporal activities and services; moderate pool
+    batch   CLIs, backfills and exports; one or two long connections
+
+Each process calls configure() once at startup to pick its default profile;
+get_db() and get_engine() then use it:
+
+    configure(profile="batch")
+    async with get_db() as session:
+        ...
+
+With DB_PGBOUNCER=true the engines work behind PgBouncer in transaction
+mode: no prepared-statement caching and no per-connection server settings.
+"""
+
 from __future__ import annotations
+
 import contextlib
+import json
 import logging
 import os
-from typing import AsyncIterator
-import backoff
-import json
+import threading
+import uuid
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+
+import backoff
+from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import DBAPIError, SQLAlchemyError
-from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession, async_sessionmaker,
                                     create_async_engine)
-from sqlalchemy.orm import declarative_base, MappedAsDataclass
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from sqlalchemy.sql import text
 
+from shared.utils.metrics import InstrumentedAsyncQueuePool, instrument_engine
 
 logger = logging.getLogger(__name__)
 
-# Asynchronous Database URL
-POSTGRES_USER='default_user'
-POSTGRES_PASSWORD='default_pass'
-POSTGRES_HOST='postgres'
-POSTGRES_PORT=5432
-POSTGRES_DB='jobdb'
-
-SQLALCHEMY_DATABASE_URL =f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-
-# Create engine with optimized configurations
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=False,  # Set to False in production for better performance
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_size=20,  # Number of connections to maintain
-    max_overflow=20,  # Maximum number of connections to create above pool_size
-    pool_timeout=30,  # Seconds to wait before giving up on getting a connection
-    pool_recycle=1800,  # Recycle connections after 30 minutes
-    connect_args={
-        "command_timeout": 120,  # Command timeout in seconds
+
+class DatabaseSettings(BaseSettings):
+    """Connection and pool settings; service Settings classes extend this."""
+
+    POSTGRES_USER: str = "default_user"
+    POSTGRES_PASSWORD: str = "default_pass"
+    POSTGRES_HOST: str = "postgres"
+    POSTGRES_PORT: int = 5432
+    POSTGRES_DB: str = "jobdb"
+    # A full URL (compose sets one) takes precedence over the parts above
+    DATABASE_URL: Optional[str] = None
+
+    DB_POOL_PROFILE: str = "worker"
+    # Override the profile's values when set
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    DB_PGBOUNCER: bool = False
+    DB_APPLICATION_NAME: str = "datadive_app"  # For better monitoring
+    DB_ECHO: bool = False
+
+    @property
+    def DATABASE_URL_ASYNC(self) -> str:
+        return self._url("postgresql+asyncpg")
+
+    @property
+    def DATABASE_URL_SYNC(self) -> str:
+        return self._url("postgresql")
+
+    def _url(self, drivername: str) -> str:
+        if self.DATABASE_URL:
+            url = make_url(self.DATABASE_URL).set(drivername=drivername)
+            return url.render_as_string(hide_password=False)
+        return (
+            f"{drivername}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
+
+    class Config:
+        case_sensitive = True
+        env_file = ".env"
+        extra = "ignore"
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float  # Seconds to wait for a connection before giving up
+    statement_timeout_ms: int  # 0 disables the timeout
+    pool_recycle: int = 1800  # Recycle connections after 30 minutes
+
+
+POOL_PROFILES: Dict[str, PoolProfile] = {
+    "api": PoolProfile(
+        pool_size=5, max_overflow=10, pool_timeout=10, statement_timeout_ms=30_000
+    ),
+    "worker": PoolProfile(
+        pool_size=5, max_overflow=5, pool_timeout=30, statement_timeout_ms=120_000
+    ),
+    "batch": PoolProfile(
+        pool_size=2, max_overflow=0, pool_timeout=60, statement_timeout_ms=0
+    ),
+}
+
+
+@dataclass
+class PoolStats:
+    profile: str
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    pgbouncer: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _statement_name() -> str:
+    # Unique names: behind PgBouncer a statement may land on another backend
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def build_engine(
+    settings: Optional[DatabaseSettings] = None,
+    profile: Optional[str] = None,
+    null_pool: bool = False,
+) -> AsyncEngine:
+    """
+    Create an engine for a pool profile outside the registry; the caller
+    disposes it. null_pool opens a connection per checkout (one-off checks).
+    """
+    settings = settings or DatabaseSettings()
+    profile = profile or settings.DB_POOL_PROFILE
+    if profile not in POOL_PROFILES:
+        raise ValueError(
+            f"Unknown pool profile {profile!r}, expected one of {sorted(POOL_PROFILES)}"
+        )
+    values = POOL_PROFILES[profile]
+    statement_timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if statement_timeout is None:
+        statement_timeout = values.statement_timeout_ms
+
+    server_settings = {"application_name": f"{settings.DB_APPLICATION_NAME}:{profile}"}
+    connect_args: Dict[str, Any] = {
+        # Client-side limit a little above the server's, none for batch
+        "command_timeout": statement_timeout / 1000 + 5 if statement_timeout else None,
         "timeout": 60,  # Connection timeout in seconds
-        "server_settings": {
-            "statement_timeout": "120000",  # 120 seconds in milliseconds
-            "idle_in_transaction_session_timeout": "120000",
-            "application_name": "datadive_app",  # For better monitoring
-        },
-    },
-)
+        "server_settings": server_settings,
+    }
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling shares backends between clients: nothing may
+        # be cached per connection, and startup parameters are rejected
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _statement_name
+    else:
+        server_settings["statement_timeout"] = str(statement_timeout)
+        server_settings["idle_in_transaction_session_timeout"] = "120000"
+
+    pool_args: Dict[str, Any]
+    if null_pool:
+        pool_args = {"poolclass": NullPool}
+    else:
+        pool_args = {
+            "poolclass": InstrumentedAsyncQueuePool,  # Times checkouts for /metrics
+            "pool_pre_ping": True,  # Enable connection health checks
+            "pool_size": settings.DB_POOL_SIZE or values.pool_size,
+            "max_overflow": (
+                settings.DB_MAX_OVERFLOW
+                if settings.DB_MAX_OVERFLOW is not None
+                else values.max_overflow
+            ),
+            "pool_timeout": settings.DB_POOL_TIMEOUT or values.pool_timeout,
+            "pool_recycle": values.pool_recycle,
+        }
+    return create_async_engine(
+        settings.DATABASE_URL_ASYNC,
+        echo=settings.DB_ECHO,
+        connect_args=connect_args,
+        **pool_args,
+    )
+
+
+class EngineRegistry:
+    """
+    Engines and session makers of this process, one per pool profile.
+
+    Created on first use and recreated after a fork, so a child process
+    never shares the parent's connections.
+    """
+
+    def __init__(self) -> None:
+        self.settings: Optional[DatabaseSettings] = None
+        self.default_profile: Optional[str] = None
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._session_makers: Dict[str, async_sessionmaker] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        profile: Optional[str] = None,
+        settings: Optional[DatabaseSettings] = None,
+    ) -> None:
+        if settings is not None:
+            self.settings = settings
+        if profile is not None:
+            if profile not in POOL_PROFILES:
+                raise ValueError(f"Unknown pool profile {profile!r}")
+            self.default_profile = profile
+
+    def _profile(self, profile: Optional[str]) -> str:
+        if profile:
+            return profile
+        if self.default_profile:
+            return self.default_profile
+        return self._settings().DB_POOL_PROFILE
+
+    def _settings(self) -> DatabaseSettings:
+        if self.settings is None:
+            self.settings = DatabaseSettings()
+        return self.settings
+
+    def _check_pid(self) -> None:
+        if self._pid == os.getpid():
+            return
+        # Forked: drop the parent's pooled connections without closing them
+        for engine in self._engines.values():
+            engine.sync_engine.dispose(close=False)
+        self._engines.clear()
+        self._session_makers.clear()
+        self._pid = os.getpid()
+
+    def engine(self, profile: Optional[str] = None) -> AsyncEngine:
+        profile = self._profile(profile)
+        with self._lock:
+            self._check_pid()
+            if profile not in self._engines:
+                engine = build_engine(self._settings(), profile)
+                instrument_engine(engine, profile)
+                self._engines[profile] = engine
+                logger.info(
+                    f"Created {profile} database engine in process {self._pid}"
+                )
+            return self._engines[profile]
+
+    def session_maker(self, profile: Optional[str] = None) -> async_sessionmaker:
+        profile = self._profile(profile)
+        engine = self.engine(profile)
+        with self._lock:
+            if profile not in self._session_makers:
+                self._session_makers[profile] = async_sessionmaker(
+                    engine, expire_on_commit=False, autocommit=False, autoflush=False
+                )
+            return self._session_makers[profile]
+
+    def stats(self) -> Dict[str, PoolStats]:
+        with self._lock:
+            engines = dict(self._engines)
+        pgbouncer = self._settings().DB_PGBOUNCER
+        stats = {}
+        for profile, engine in engines.items():
+            pool = engine.pool
+            if not isinstance(pool, AsyncAdaptedQueuePool):
+                continue
+            stats[profile] = PoolStats(
+                profile=profile,
+                pid=self._pid,
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+                pgbouncer=pgbouncer,
+            )
+        return stats
+
+    async def dispose(self) -> None:
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+            self._session_makers.clear()
+        for engine in engines:
+            await engine.dispose()
+
+
+engines = EngineRegistry()
+
+
+def configure(
+    profile: Optional[str] = None, settings: Optional[DatabaseSettings] = None
+) -> None:
+    """Pick this process's default pool profile and/or its settings."""
+    engines.configure(profile, settings)
+
+
+def get_engine(profile: Optional[str] = None) -> AsyncEngine:
+    """The process-wide engine of a pool profile (the default one if None)."""
+    return engines.engine(profile)
+
+
+def get_session_maker(profile: Optional[str] = None) -> async_sessionmaker:
+    return engines.session_maker(profile)
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every pool this process has opened, by profile."""
+    return {profile: stats.to_dict() for profile, stats in engines.stats().items()}
+
+
+def __getattr__(name: str) -> Any:
+    # `engine` and `async_session_maker` used to be created at import time
+    if name == "engine":
+        return get_engine()
+    if name == "async_session_maker":
+        return get_session_maker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Base class for declarative class definitions
 Base = declarative_base()
 
-# Create a sessionmaker with optimized settings
-async_session_maker = async_sessionmaker(
-    engine, expire_on_commit=False, autocommit=False, autoflush=False
-)
 
 def handle_db_error(e: Exception):
     """Handle database errors with appropriate logging"""
@@ -65,12 +347,12 @@ def handle_db_error(e: Exception):
     backoff.expo, (SQLAlchemyError, ConnectionError), max_tries=3, max_time=30
 )
 @contextlib.asynccontextmanager
-async def get_db() -> AsyncIterator[AsyncSession]:
+async def get_db(profile: Optional[str] = None) -> AsyncIterator[AsyncSession]:
     """
     Async context manager for database sessions with retry logic.
     Creates a new session for each context with proper error handling and connection management.
     """
-    session = async_session_maker()
+    session = get_session_maker(profile)()
     try:
         logger.debug("Creating new database session")
         yield session
@@ -98,7 +380,7 @@ def _log_db_err(e: Exception) -> None:
 # Optional self-test – run once at startup
 # ---------------------------------------------------------------------
 async def _json_roundtrip() -> None:
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         # Convert UTC datetime to naive for storage
         val = {"now": datetime.now().isoformat(), "ok": True}
         json_val = json.dumps(val)  # Convert dict to JSON string
@@ -111,10 +393,10 @@ async def _json_roundtrip() -> None:
 
 
 async def init_db():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     await _json_roundtrip()
 
 
 async def close_db():
-    await engine.dispose()
+    await engines.dispose()
@@ -0,0 +1,162 @@
+"""
+Dedup stage: mark newly ingested jobs that near-duplicate an earlier one.
+
+mark_duplicates runs a shared.utils.dedup.DedupIndex over the given job
+ids in id order and sets `duplicate` on the matches with a single UPDATE,
+so they never reach the ALERT stage. Every worker process keeps its own
+index; before checking, it catches up with the jobs other processes stored
+since it last looked (ids above its watermark), and a transaction-level
+advisory lock keeps two processes from checking at the same time, so
+every job is compared with all earlier originals. Caught-up jobs that are
+still new may not have been checked by their own process yet, so they are
+checked here as well rather than taken as originals.
+
+    python -m shared.db.dedup rebuild
+    python -m shared.db.dedup check 1041 1042 1043
+"""
+
+import argparse
+import asyncio
+import logging
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.database import configure, get_db
+from shared.db.models import Jobs
+from shared.utils.dedup import DEFAULT_INDEX_PATH, DedupIndex
+
+logger = logging.getLogger(__name__)
+
+DEDUP_COLUMNS = (Jobs.id, Jobs.title, Jobs.company, Jobs.description)
+CATCH_UP_COLUMNS = DEDUP_COLUMNS + (Jobs.new,)
+CATCH_UP_BATCH_SIZE = 1000
+_LOCK_KEY = zlib.crc32(b"jobs_dedup")
+
+
+@dataclass
+class DedupReport:
+    """Totals of one dedup pass."""
+
+    checked: int = 0
+    duplicates: int = 0
+    caught_up: int = 0
+
+    def summary(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def _index_caught_up(index: DedupIndex, rows: List[Dict[str, Any]]) -> List[int]:
+    """Index caught-up rows; returns the ids of pending ones that are duplicates."""
+    duplicates = []
+    for row in rows:
+        if not row["new"]:
+            index.add(row["id"], row)
+        elif index.check_and_add(row["id"], row) is not None:
+            duplicates.append(row["id"])
+    return duplicates
+
+
+async def _catch_up(
+    session: AsyncSession, index: DedupIndex, exclude: Sequence[int], report: DedupReport
+) -> None:
+    """
+    Index the originals stored since the index's watermark, except exclude;
+    jobs still pending are checked first and marked if they are duplicates.
+    """
+    stmt = (
+        select(*CATCH_UP_COLUMNS)
+        .where(Jobs.id > index.watermark, Jobs.duplicate.is_not(True))
+        .order_by(Jobs.id)
+        .execution_options(yield_per=CATCH_UP_BATCH_SIZE)
+    )
+    if exclude:
+        stmt = stmt.where(Jobs.id.not_in(exclude))
+    duplicates: List[int] = []
+    result = await session.stream(stmt)
+    async for partition in result.mappings().partitions(CATCH_UP_BATCH_SIZE):
+        rows = [dict(row) for row in partition]
+        duplicates += await asyncio.to_thread(_index_caught_up, index, rows)
+        index.watermark = max(index.watermark, rows[-1]["id"])
+        report.caught_up += len(rows)
+    if duplicates:
+        await _set_duplicate(session, duplicates)
+        logger.info(f"Marked {len(duplicates)} pending jobs of other workers as duplicates")
+
+
+async def _set_duplicate(session: AsyncSession, job_ids: Sequence[int]) -> None:
+    await session.execute(
+        update(Jobs)
+        .where(Jobs.id.in_(list(job_ids)))
+        .values(duplicate=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def mark_duplicates(
+    index: DedupIndex,
+    job_ids: Sequence[int],
+    session: Optional[AsyncSession] = None,
+) -> DedupReport:
+    """
+    Check the jobs with job_ids against the index (and each other) and set
+    `duplicate` on the near-duplicates. Originals are added to the index.
+    """
+    report = DedupReport()
+    if not job_ids:
+        return report
+    job_ids = sorted(set(job_ids))
+    if session is None:
+        async with get_db() as session:
+            return await _mark(session, index, job_ids, report)
+    return await _mark(session, index, job_ids, report)
+
+
+async def _mark(
+    session: AsyncSession, index: DedupIndex, job_ids: List[int], report: DedupReport
+) -> DedupReport:
+    await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    await _catch_up(session, index, job_ids, report)
+
+    stmt = select(*DEDUP_COLUMNS).where(Jobs.id.in_(job_ids)).order_by(Jobs.id)
+    rows = [dict(row) for row in (await session.execute(stmt)).mappings()]
+    # Numpy MinHash over the batch; off the loop, the index is this process's
+    matches = await asyncio.to_thread(index.apply_batch, rows)
+    index.watermark = max(index.watermark, job_ids[-1])
+    report.checked = len(rows)
+    report.duplicates = len(matches)
+    if matches:
+        await _set_duplicate(session, list(matches))
+    logger.info(f"Dedup of {len(job_ids)} jobs: {report.summary()}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("ids", nargs="*", type=int, help="job ids to check")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="index snapshot path")
+    args = parser.parse_args()
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "rebuild":
+        index = asyncio.run(DedupIndex.rebuild())
+        index.save(args.index)
+        print(f"Indexed {len(index)} jobs up to id {index.watermark}")
+        return
+
+    async def check() -> Dict[str, Any]:
+        index = await DedupIndex.load_or_rebuild(args.index)
+        report = await mark_duplicates(index, args.ids)
+        index.save(args.index)
+        return report.summary()
+
+    print(asyncio.run(check()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Maintenance of the content-addressed description store.
+
+Each distinct (normalized) description is stored once in job_descriptions,
+compressed by Postgres, and jobs point at it by hash. Triggers keep
+ref_count equal to the number of jobs referencing a description; rows that
+drop to zero are kept until pruned so a reposted text does not churn.
+
+    python -m shared.db.description_store stats
+    python -m shared.db.description_store prune
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.database import configure, get_db
+
+logger = logging.getLogger(__name__)
+
+PRUNE_BATCH_SIZE = 1000
+
+_PRUNE_SQL = text(
+    """
+    DELETE FROM job_descriptions WHERE hash IN (
+        SELECT hash FROM job_descriptions
+        WHERE ref_count = 0
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    """
+)
+
+_STATS_SQL = text(
+    """
+    SELECT
+        count(*) AS descriptions,
+        coalesce(sum(ref_count), 0) AS job_refs,
+        count(*) FILTER (WHERE ref_count = 0) AS unreferenced,
+        coalesce(sum(octet_length(body)), 0) AS text_bytes,
+        coalesce(sum(octet_length(body) * ref_count), 0) AS inline_bytes,
+        coalesce(sum(pg_column_size(body)), 0) AS stored_bytes
+    FROM job_descriptions
+    """
+)
+
+
+async def prune_descriptions(
+    session: Optional[AsyncSession] = None,
+    batch_size: int = PRUNE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Delete unreferenced descriptions, committing after each batch so locks
+    stay short. Returns how many were removed.
+    """
+    if session is None:
+        async with get_db() as session:
+            return await prune_descriptions(session, batch_size, max_batches)
+    removed = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = await session.execute(_PRUNE_SQL, {"limit": batch_size})
+        await session.commit()
+        removed += result.rowcount
+        batches += 1
+        if result.rowcount < batch_size:
+            break
+    logger.info(f"Pruned {removed} unreferenced descriptions")
+    return removed
+
+
+async def description_stats(session: Optional[AsyncSession] = None) -> Dict[str, Any]:
+    """
+    Size of the store: text_bytes is every distinct text once, inline_bytes
+    what storing it per job would take and stored_bytes the compressed size.
+    """
+    if session is None:
+        async with get_db() as session:
+            return await description_stats(session)
+    row = (await session.execute(_STATS_SQL)).one()
+    stats = dict(row._mapping)
+    stats["dedup_ratio"] = _ratio(stats["inline_bytes"], stats["text_bytes"])
+    stats["compression_ratio"] = _ratio(stats["text_bytes"], stats["stored_bytes"])
+    return stats
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 2) if denominator else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["stats", "prune"])
+    parser.add_argument("--batch-size", type=int, default=PRUNE_BATCH_SIZE)
+    args = parser.parse_args()
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "prune":
+        asyncio.run(prune_descriptions(batch_size=args.batch_size))
+    else:
+        for key, value in asyncio.run(description_stats()).items():
+            print(f"{key:<18} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Stream the jobs table out as NDJSON, CSV or Parquet.
+
+Rows are read through a server-side cursor in fixed-size batches and each
+batch is encoded and handed on before the next one is fetched, so memory
+stays flat regardless of table size and the first bytes go out as soon as
+the first batch is read.
+
+    python -m shared.db.export --format csv --relevant true -o jobs.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import enum
+import io
+import logging
+import sys
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import Select, select, text
+
+from shared.db.database import configure, get_db
+from shared.db.filters import FLAG_COLUMNS, JobFilter
+from shared.db.models import JOB_COLUMNS, JOB_SERIALIZER, Jobs, JobSource
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_SIZE = 2000
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = JOB_COLUMNS
+
+# An export is paced by its client, so the per-statement and idle limits
+# configured on the engine do not apply
+_EXPORT_SESSION_SETTINGS = (
+    "SET LOCAL statement_timeout = 0",
+    "SET LOCAL idle_in_transaction_session_timeout = 0",
+)
+
+
+def export_query(filters: Optional[JobFilter] = None) -> Select:
+    stmt = select(*EXPORT_COLUMNS).order_by(Jobs.id)
+    return (filters or JobFilter()).apply(stmt)
+
+
+async def stream_job_rows(
+    filters: Optional[JobFilter] = None, fetch_size: int = DEFAULT_FETCH_SIZE
+) -> AsyncIterator[Sequence[Any]]:
+    """Yield batches of at most fetch_size rows from a server-side cursor."""
+    stmt = export_query(filters).execution_options(yield_per=fetch_size)
+    async with get_db() as session:
+        for setting in _EXPORT_SESSION_SETTINGS:
+            await session.execute(text(setting))
+        result = await session.stream(stmt)
+        async for partition in result.partitions():
+            yield partition
+
+
+def encode_ndjson(rows: Sequence[Any]) -> bytes:
+    return JOB_SERIALIZER.dumps_lines(rows)
+
+
+def encode_csv(rows: Sequence[Any], header: Optional[List[str]] = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(map(JOB_SERIALIZER.row_to_values, rows))
+    return buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_schema():
+    """Arrow schema of exported (and archived) job rows."""
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "date": pa.timestamp("us"),
+        "created_at": pa.timestamp("us"),
+        "updated_at": pa.timestamp("us"),
+    }
+    types.update({flag: pa.bool_() for flag in FLAG_COLUMNS})
+    return pa.schema(
+        [(column.name, types.get(column.name, pa.string())) for column in EXPORT_COLUMNS]
+    )
+
+
+def parquet_batch(rows: Sequence[Any], schema):
+    """Record batch of rows in EXPORT_COLUMNS order."""
+    import pyarrow as pa
+
+    columns = list(zip(*rows))
+    arrays = [
+        [value.name if isinstance(value, enum.Enum) else value for value in columns[i]]
+        for i in range(len(schema))
+    ]
+    return pa.record_batch(arrays, schema=schema)
+
+
+async def _parquet_chunks(
+    batches: AsyncIterator[Sequence[Any]],
+) -> AsyncIterator[bytes]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow") from e
+
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    # One row group per fetched batch, flushed as soon as it is written
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        async for rows in batches:
+            writer.write_batch(parquet_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def export_jobs(
+    fmt: str = "ndjson",
+    filters: Optional[JobFilter] = None,
+    fetch_size: int = DEFAULT_FETCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """Encoded export of the filtered jobs table, one chunk per fetched batch."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    keys = [column.name for column in EXPORT_COLUMNS]
+    batches = stream_job_rows(filters, fetch_size)
+
+    if fmt == "parquet":
+        async for chunk in _parquet_chunks(batches):
+            if chunk:
+                yield chunk
+        return
+
+    if fmt == "csv":
+        yield encode_csv([], header=keys)
+    async for rows in batches:
+        yield encode_ndjson(rows) if fmt == "ndjson" else encode_csv(rows)
+
+
+def _flag(value: str) -> bool:
+    if value.lower() in ("true", "1", "yes"):
+        return True
+    if value.lower() in ("false", "0", "no"):
+        return False
+    raise argparse.ArgumentTypeError(f"expected true/false, got {value!r}")
+
+
+async def _export_to(output, fmt: str, filters: JobFilter, fetch_size: int) -> int:
+    written = 0
+    async for chunk in export_jobs(fmt, filters, fetch_size):
+        output.write(chunk)
+        written += len(chunk)
+    output.flush()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--source", choices=[s.value for s in JobSource])
+    parser.add_argument("--company")
+    parser.add_argument("--location")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    for flag in FLAG_COLUMNS:
+        parser.add_argument(f"--{flag}", type=_flag, metavar="true|false")
+    parser.add_argument("--fetch-size", type=int, default=DEFAULT_FETCH_SIZE)
+    args = parser.parse_args()
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.WARNING)
+    filters = JobFilter(
+        source=JobSource(args.source) if args.source else None,
+        company=args.company,
+        location=args.location,
+        since=args.since,
+        until=args.until,
+        **{flag: getattr(args, flag) for flag in FLAG_COLUMNS},
+    )
+    if args.output:
+        with open(args.output, "wb") as output:
+            written = asyncio.run(_export_to(output, args.format, filters, args.fetch_size))
+        print(f"Wrote {written} bytes to {args.output}", file=sys.stderr)
+    else:
+        asyncio.run(_export_to(sys.stdout.buffer, args.format, filters, args.fetch_size))
+
+
+if __name__ == "__main__":
+    main()
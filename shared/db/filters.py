@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select
+
+from shared.db.models import Jobs, JobSource
+
+FLAG_COLUMNS = ("new", "duplicate", "relevant", "promising", "notified")
+
+
+@dataclass(frozen=True)
+class JobFilter:
+    """Filters shared by the jobs listing and export; unset fields do not filter."""
+
+    source: Optional[JobSource] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    new: Optional[bool] = None
+    duplicate: Optional[bool] = None
+    relevant: Optional[bool] = None
+    promising: Optional[bool] = None
+    notified: Optional[bool] = None
+
+    def apply(self, stmt: Select) -> Select:
+        if self.source is not None:
+            stmt = stmt.where(Jobs.job_source == self.source)
+        if self.company is not None:
+            stmt = stmt.where(Jobs.company == self.company)
+        if self.location is not None:
+            stmt = stmt.where(Jobs.location == self.location)
+        if self.since is not None:
+            stmt = stmt.where(Jobs.date >= self.since)
+        if self.until is not None:
+            stmt = stmt.where(Jobs.date < self.until)
+        for flag in FLAG_COLUMNS:
+            value = getattr(self, flag)
+            if value is not None:
+                stmt = stmt.where(getattr(Jobs, flag).is_(value))
+        return stmt
@@ -0,0 +1,309 @@
+"""
+Bulk ingestion of scraped jobs.
+
+A batch is written with a fixed handful of statements regardless of its
+size: (re)create a temporary staging table, COPY the batch into it with
+asyncpg's binary copy protocol, add new description texts to
+job_descriptions and merge the batch into jobs in one statement that claims
+new normalized job URL hashes in job_urls, inserts their postings and
+refreshes the ones already stored.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.database import get_db
+from shared.db.models import Jobs, JobSource, JobUrls
+from shared.utils.descriptions import description_hash, normalize_description
+from shared.utils.metrics import track_stage
+from shared.utils.urls import job_url_hash
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "jobs_staging"
+
+# Scraped fields copied into staging, in COPY column order
+STAGING_COLUMNS: Tuple[str, ...] = (
+    "ord",
+    "job_source",
+    "title",
+    "company",
+    "description",
+    "description_hash",
+    "location",
+    "date",
+    "job_url",
+    "job_url_hash",
+)
+
+# Columns refreshed when an existing posting is scraped again; a field the
+# scrape did not fill in (e.g. a skipped detail page) keeps its stored value
+UPDATE_COLUMNS: Tuple[str, ...] = (
+    "title",
+    "company",
+    "description_hash",
+    "location",
+)
+
+# Dropped first so several batches can share one transaction
+_DROP_STAGING_SQL = f"DROP TABLE IF EXISTS {STAGING_TABLE}"
+
+_CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    ord integer,
+    job_source text,
+    title text,
+    company text,
+    description text,
+    description_hash text,
+    location text,
+    date timestamp,
+    job_url text,
+    job_url_hash text
+) ON COMMIT DROP
+"""
+
+# Stores each distinct description once. Existing rows are locked (the
+# WHERE false update never writes) so a concurrent prune cannot remove a
+# description between here and the jobs insert that references it.
+_DESCRIPTIONS_SQL = f"""
+INSERT INTO job_descriptions (hash, body, ref_count, created_at)
+SELECT DISTINCT ON (description_hash) description_hash, description, 0, $1
+FROM {STAGING_TABLE}
+WHERE description_hash IS NOT NULL
+ORDER BY description_hash
+ON CONFLICT (hash) DO UPDATE SET ref_count = job_descriptions.ref_count WHERE false
+"""
+
+_CHANGED = (
+    f"({', '.join(f'jobs.{c}' for c in UPDATE_COLUMNS)}) IS DISTINCT FROM "
+    f"({', '.join(f'coalesce(latest.{c}, jobs.{c})' for c in UPDATE_COLUMNS)})"
+)
+
+# jobs is partitioned, so it cannot enforce job_url_hash uniqueness itself:
+# a new posting first claims its URL in job_urls, and only the claimed rows
+# are inserted. Postings that were already stored are refreshed in place,
+# found through job_urls by (id, created_at) so a single partition is
+# touched. All parts see the same snapshot, so a row inserted here is never
+# also updated. Archived postings are neither re-inserted nor updated.
+_UPSERT_SQL = f"""
+WITH latest AS (
+    SELECT DISTINCT ON (job_url_hash) *
+    FROM {STAGING_TABLE}
+    ORDER BY job_url_hash, ord DESC
+), claimed AS (
+    INSERT INTO job_urls (job_url_hash, job_id, created_at, archived)
+    SELECT job_url_hash, nextval(pg_get_serial_sequence('jobs', 'id')), $1, false
+    FROM latest
+    ORDER BY job_url_hash
+    ON CONFLICT (job_url_hash) DO NOTHING
+    RETURNING job_url_hash, job_id
+), inserted AS (
+    INSERT INTO jobs (
+        id, job_source, title, company, description_hash, location, date,
+        job_url, job_url_hash, search_vector, created_at, updated_at, new,
+        duplicate, relevant, promising, notified
+    )
+    SELECT
+        claimed.job_id, job_source::jobsource, title, company, description_hash,
+        location, coalesce(date, $1), job_url, latest.job_url_hash,
+        job_search_vector(title, company, description), $1, $1,
+        true, false, false, false, false
+    FROM latest JOIN claimed USING (job_url_hash)
+    RETURNING id, job_url_hash
+), updated AS (
+    UPDATE jobs SET
+        {", ".join(f"{c} = coalesce(latest.{c}, jobs.{c})" for c in UPDATE_COLUMNS)},
+        search_vector = job_search_vector(
+            coalesce(latest.title, jobs.title),
+            coalesce(latest.company, jobs.company),
+            (SELECT body FROM job_descriptions
+             WHERE hash = coalesce(latest.description_hash, jobs.description_hash))
+        ),
+        updated_at = $1
+    FROM latest JOIN job_urls urls USING (job_url_hash)
+    WHERE NOT urls.archived
+        AND jobs.id = urls.job_id AND jobs.created_at = urls.created_at
+        AND {_CHANGED}
+    RETURNING jobs.id, jobs.job_url_hash
+)
+SELECT id, job_url_hash, true AS inserted FROM inserted
+UNION ALL
+SELECT id, job_url_hash, false AS inserted FROM updated
+"""
+
+
+@dataclass
+class IngestResult:
+    """Outcome of a bulk upsert, keyed by job_url_hash."""
+
+    inserted: Dict[str, int] = field(default_factory=dict)
+    updated: Dict[str, int] = field(default_factory=dict)
+    unchanged: int = 0
+    skipped: int = 0
+    # Jobs stored without their unparseable date
+    invalid_dates: int = 0
+
+    @property
+    def inserted_ids(self) -> List[int]:
+        return list(self.inserted.values())
+
+    @property
+    def updated_ids(self) -> List[int]:
+        return list(self.updated.values())
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "inserted": len(self.inserted),
+            "updated": len(self.updated),
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+            "invalid_dates": self.invalid_dates,
+        }
+
+
+def _job_source_name(value: Any) -> str:
+    if isinstance(value, JobSource):
+        return value.name
+    if not value:
+        return JobSource.LINKEDIN.name
+    value = str(value)
+    for source in JobSource:
+        if value.upper() == source.name or value.lower() == source.value:
+            return source.name
+    raise ValueError(f"Unknown job source: {value}")
+
+
+def _truncate(value: Optional[str], column: str) -> Optional[str]:
+    length = getattr(Jobs.__table__.c[column].type, "length", None)
+    if value is None or length is None:
+        return value
+    return value[:length]
+
+
+def _job_date(value: Any) -> Optional[datetime]:
+    """
+    Posting date as a naive UTC datetime; ISO 8601 strings (as jobs arrive
+    after a JSON round trip) are parsed. Raises ValueError if unparseable.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        raise ValueError(f"Not a date: {value!r}")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _staging_record(
+    position: int, job: Mapping[str, Any], result: "IngestResult"
+) -> Optional[tuple]:
+    url = job.get("job_url")
+    url_hash = job.get("job_url_hash") or job_url_hash(url)
+    if not url_hash or not job.get("title"):
+        return None
+    try:
+        date = _job_date(job.get("date"))
+    except ValueError:
+        result.invalid_dates += 1
+        date = None
+    description = normalize_description(job.get("description"))
+    return (
+        position,
+        _job_source_name(job.get("job_source")),
+        _truncate(job["title"], "title"),
+        _truncate(job.get("company") or "", "company"),
+        description,
+        description_hash(description),
+        _truncate(job.get("location") or "", "location"),
+        date,
+        _truncate(url, "job_url"),
+        url_hash,
+    )
+
+
+async def _upsert(session: AsyncSession, records: List[tuple]) -> List[Any]:
+    conn = await session.connection()
+    # Going through SQLAlchemy first opens the session transaction, which
+    # the staging table (ON COMMIT DROP) and the raw COPY below then share
+    await conn.exec_driver_sql(_DROP_STAGING_SQL)
+    await conn.exec_driver_sql(_CREATE_STAGING_SQL)
+
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection  # asyncpg.Connection
+    await driver.copy_records_to_table(
+        STAGING_TABLE, records=records, columns=list(STAGING_COLUMNS)
+    )
+    now = datetime.now()
+    await driver.execute(_DESCRIPTIONS_SQL, now)
+    return await driver.fetch(_UPSERT_SQL, now)
+
+
+async def bulk_upsert_jobs(
+    jobs: Sequence[Mapping[str, Any]],
+    session: Optional[AsyncSession] = None,
+) -> IngestResult:
+    """
+    Insert or refresh a batch of scraped jobs in one round trip.
+
+    Each job is a mapping with the Jobs column names. Rows are matched on
+    the hash of the normalized job_url; later duplicates in the batch win.
+    Postings whose partition was archived count as unchanged.
+    Existing rows only have their non-empty scraped fields refreshed, so
+    pipeline flags (new/relevant/notified, ...) are never reset by a
+    re-scrape.
+    """
+    result = IngestResult()
+    records = []
+    for position, job in enumerate(jobs):
+        record = _staging_record(position, job, result)
+        if record is None:
+            result.skipped += 1
+        else:
+            records.append(record)
+    if result.invalid_dates:
+        logger.warning(
+            f"{result.invalid_dates} of {len(jobs)} jobs had an unparseable date, "
+            "stored without it"
+        )
+    if not records:
+        return result
+
+    with track_stage("ingest", len(records)):
+        if session is None:
+            async with get_db() as session:
+                rows = await _upsert(session, records)
+        else:
+            rows = await _upsert(session, records)
+
+    for row in rows:
+        target = result.inserted if row["inserted"] else result.updated
+        target[row["job_url_hash"]] = row["id"]
+    distinct = len({record[-1] for record in records})
+    result.unchanged = distinct - len(rows)
+
+    logger.info(f"Bulk upsert of {len(records)} jobs: {result.summary()}")
+    return result
+
+
+async def existing_job_url_hashes(
+    hashes: Sequence[str], session: Optional[AsyncSession] = None
+) -> Set[str]:
+    """
+    Return the subset of job_url_hash values already stored, archived
+    postings included.
+    """
+    if not hashes:
+        return set()
+    stmt = select(JobUrls.job_url_hash).where(JobUrls.job_url_hash.in_(set(hashes)))
+    if session is None:
+        async with get_db() as session:
+            return set((await session.execute(stmt)).scalars())
+    return set((await session.execute(stmt)).scalars())
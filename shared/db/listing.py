@@ -0,0 +1,175 @@
+"""
+Keyset-paginated jobs listing with cached facet counts.
+
+Pages are ordered newest first on (date, id) and continue from an opaque
+cursor holding the last row's (date, id), so every page is an index range
+scan of `limit` rows no matter how deep it is. Counts for a filter set
+(total, flags, top sources/companies/locations) are the only part that
+scans the whole match, so they are computed once per FACET_TTL_SECONDS and
+shared by every page of that filter.
+"""
+
+import asyncio
+import base64
+import binascii
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.filters import FLAG_COLUMNS, JobFilter
+from shared.db.models import JOB_COLUMNS, JOB_SERIALIZER, Jobs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+FACET_TTL_SECONDS = 30.0
+FACET_TOP = 20
+
+LIST_COLUMNS = JOB_COLUMNS
+
+
+def encode_cursor(date: datetime, job_id: int) -> str:
+    payload = orjson.dumps([date.isoformat(), job_id])
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, job_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date), int(job_id)
+    except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+
+
+def page_query(
+    filters: Optional[JobFilter] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Select:
+    stmt = (filters or JobFilter()).apply(select(*LIST_COLUMNS))
+    if cursor:
+        # Row comparison, so Postgres uses it as an index condition on (date, id)
+        stmt = stmt.where(tuple_(Jobs.date, Jobs.id) < tuple_(*decode_cursor(cursor)))
+    return stmt.order_by(Jobs.date.desc(), Jobs.id.desc()).limit(limit + 1)
+
+
+async def list_jobs(
+    session: AsyncSession,
+    filters: Optional[JobFilter] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """One page of rows (in LIST_COLUMNS order) and the cursor for the next."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = (await session.execute(page_query(filters, cursor, limit))).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.date, last.id)
+
+
+async def facet_counts(
+    session: AsyncSession, filters: Optional[JobFilter] = None, top: int = FACET_TOP
+) -> Dict[str, Any]:
+    """Total, per-flag counts and the most common sources, companies and locations."""
+    filters = filters or JobFilter()
+    totals = select(
+        func.count().label("total"),
+        *(func.count().filter(getattr(Jobs, flag)).label(flag) for flag in FLAG_COLUMNS),
+    )
+    row = (await session.execute(filters.apply(totals))).one()
+    result: Dict[str, Any] = {
+        "total": row.total,
+        "flags": {flag: getattr(row, flag) for flag in FLAG_COLUMNS},
+    }
+    for name, column in (
+        ("job_source", Jobs.job_source),
+        ("company", Jobs.company),
+        ("location", Jobs.location),
+    ):
+        stmt = filters.apply(select(column, func.count().label("count")))
+        stmt = stmt.group_by(column).order_by(func.count().desc()).limit(top)
+        result[name] = [
+            {"value": value.name if name == "job_source" else value, "count": count}
+            for value, count in (await session.execute(stmt)).all()
+        ]
+    return result
+
+
+class FacetCache:
+    """
+    Per-filter facet counts kept for ttl_seconds. Concurrent requests for
+    the same filter wait on one computation instead of each running it.
+    """
+
+    def __init__(
+        self, ttl_seconds: float = FACET_TTL_SECONDS, max_entries: int = 256
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[JobFilter, Tuple[float, Dict[str, Any]]] = {}
+        self._locks: Dict[JobFilter, asyncio.Lock] = {}
+
+    def _fresh(self, filters: JobFilter) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(filters)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    async def get(
+        self, session: AsyncSession, filters: Optional[JobFilter] = None
+    ) -> Dict[str, Any]:
+        filters = filters or JobFilter()
+        cached = self._fresh(filters)
+        if cached is not None:
+            return cached
+        lock = self._locks.setdefault(filters, asyncio.Lock())
+        async with lock:
+            cached = self._fresh(filters)
+            if cached is not None:
+                return cached
+            facets = await facet_counts(session, filters)
+            if len(self._entries) >= self.max_entries:
+                self._expire()
+            self._entries[filters] = (time.monotonic(), facets)
+        return facets
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for key, (stored_at, _) in list(self._entries.items()):
+            if now - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                self._locks.pop(key, None)
+        # Still full of live entries: drop the oldest
+        while len(self._entries) >= self.max_entries:
+            oldest = min(self._entries, key=lambda key: self._entries[key][0])
+            del self._entries[oldest]
+            self._locks.pop(oldest, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+facet_cache = FacetCache()
+
+
+def page_body(
+    rows: Sequence[Any], next_cursor: Optional[str], total: Optional[int]
+) -> bytes:
+    """JSON body of one page, rows encoded by the compiled job serializer."""
+    return orjson.dumps(
+        {
+            "items": orjson.Fragment(JOB_SERIALIZER.dumps(rows)),
+            "next_cursor": next_cursor,
+            "total": total,
+        }
+    )
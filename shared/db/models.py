@@ -1,35 +1,192 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import (ARRAY, Boolean, Column, DateTime, Enum, Float,
-                        ForeignKey, Integer, Interval, PrimaryKeyConstraint,
-                        String, Text)
-from sqlalchemy.orm import relationship
+from sqlalchemy import (ARRAY, DDL, Boolean, Column, DateTime, Enum, Float,
+                        ForeignKey, Index, Integer, Interval,
+                        PrimaryKeyConstraint, String, Text, event, select,
+                        text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import column_property, deferred, relationship
 
 from shared.db.database import Base
+from shared.db.serializers import RowSerializer
+from shared.utils.urls import job_url_hash
+
+# Search document for full-text search, see shared.db.search. Text is reduced
+# to the same [a-z0-9]+ tokens as shared.utils.keyword_filter and indexed
+# without stemming, weighted by field: title A, company B, description C.
+# The description lives in job_descriptions, so ingest fills the column
+# through this function rather than a generated column.
+SEARCH_VECTOR_FUNCTION_SQL = (
+    "CREATE OR REPLACE FUNCTION job_search_vector("
+    "title text, company text, description text) "
+    "RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ SELECT "
+    + " || ".join(
+        f"setweight(to_tsvector('simple'::regconfig, regexp_replace("
+        f"lower(coalesce({column}, '')), '[^a-z0-9]+', ' ', 'g')), '{weight}')"
+        for column, weight in (("title", "A"), ("company", "B"), ("description", "C"))
+    )
+    + " $$"
+)
+
+# job_descriptions.ref_count follows the jobs pointing at each description.
+# Inserts and deletes adjust it once per statement from the transition
+# table; changing a job's description is rare and handled per row, so flag
+# updates never pay for it.
+DESCRIPTION_REFCOUNT_SQL = (
+    """CREATE OR REPLACE FUNCTION job_descriptions_refcount() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE job_descriptions d SET ref_count = d.ref_count + delta.n
+        FROM (
+            SELECT description_hash AS hash, count(*) AS n FROM new_rows
+            WHERE description_hash IS NOT NULL GROUP BY description_hash
+        ) delta
+        WHERE d.hash = delta.hash;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE job_descriptions d SET ref_count = d.ref_count - delta.n
+        FROM (
+            SELECT description_hash AS hash, count(*) AS n FROM old_rows
+            WHERE description_hash IS NOT NULL GROUP BY description_hash
+        ) delta
+        WHERE d.hash = delta.hash;
+    ELSE
+        UPDATE job_descriptions SET ref_count = ref_count - 1
+        WHERE hash = OLD.description_hash;
+        UPDATE job_descriptions SET ref_count = ref_count + 1
+        WHERE hash = NEW.description_hash;
+    END IF;
+    RETURN NULL;
+END $$""",
+    """CREATE TRIGGER jobs_description_refcount_insert AFTER INSERT ON jobs
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION job_descriptions_refcount()""",
+    """CREATE TRIGGER jobs_description_refcount_delete AFTER DELETE ON jobs
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION job_descriptions_refcount()""",
+    """CREATE TRIGGER jobs_description_refcount_update
+AFTER UPDATE OF description_hash ON jobs
+FOR EACH ROW WHEN (OLD.description_hash IS DISTINCT FROM NEW.description_hash)
+EXECUTE FUNCTION job_descriptions_refcount()""",
+)
+
+# jobs is range-partitioned by created_at into monthly partitions, see
+# shared.db.partitions. Rows outside every partition land in the default
+# one until maintenance creates their month.
+DEFAULT_PARTITION_SQL = "CREATE TABLE jobs_default PARTITION OF jobs DEFAULT"
+
+# Description bodies are long and compress well; lz4 is much cheaper to
+# read than the default pglz. Servers built without lz4 keep pglz.
+DESCRIPTION_COMPRESSION_SQL = """DO $$
+BEGIN
+    ALTER TABLE job_descriptions ALTER COLUMN body SET COMPRESSION lz4;
+EXCEPTION WHEN feature_not_supported THEN
+    RAISE NOTICE 'lz4 not available, job_descriptions.body stays pglz';
+END $$"""
 
 class JobSource(enum.Enum):
     LINKEDIN = "linkedin"
     INDEED = "indeed"
 
+def _default_job_url_hash(context):
+    return job_url_hash(context.get_current_parameters()["job_url"])
+
+class JobDescriptions(Base):
+    """Description text stored once per distinct (normalized) content."""
+
+    __tablename__ = "job_descriptions"
+    __table_args__ = (
+        # Candidates for shared.db.description_store.prune_descriptions
+        Index(
+            "ix_job_descriptions_unreferenced",
+            "hash",
+            postgresql_where=text("ref_count = 0"),
+        ),
+    )
+
+    hash = Column(String(64), primary_key=True)  # see shared.utils.descriptions
+    body = Column(Text, nullable=False)  # see DESCRIPTION_COMPRESSION_SQL
+    ref_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f"<JobDescription {self.hash[:12]} x{self.ref_count}>"
+
+class JobUrls(Base):
+    """
+    Every job URL ever stored, including those of archived partitions.
+    Unique constraints on jobs must include the partition key, so this is
+    where a posting's URL is claimed exactly once, see shared.db.ingest.
+    """
+
+    __tablename__ = "job_urls"
+
+    job_url_hash = Column(String(64), primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)  # locates the job's partition
+    # Set once the job's partition moved out of the table
+    archived = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+
+    def __repr__(self):
+        return f"<JobUrl {self.job_url_hash[:12]} -> {self.job_id}>"
+
 class Jobs(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Work queues for pipeline stages, see shared.db.queue
+        Index("ix_jobs_pending_filter", "id", postgresql_where=text("new")),
+        Index(
+            "ix_jobs_pending_alert",
+            "id",
+            postgresql_where=text("relevant AND NOT duplicate AND NOT notified"),
+        ),
+        # Keyset pagination on (date, id), see shared.db.listing
+        Index("ix_jobs_date_id", "date", "id"),
+        Index("ix_jobs_job_source_date_id", "job_source", "date", "id"),
+        Index("ix_jobs_company_date_id", "company", "date", "id"),
+        Index("ix_jobs_location_date_id", "location", "date", "id"),
+        Index(
+            "ix_jobs_relevant_date_id", "date", "id", postgresql_where=text("relevant")
+        ),
+        Index(
+            "ix_jobs_promising_date_id", "date", "id", postgresql_where=text("promising")
+        ),
+        Index("ix_jobs_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The primary key of a partitioned table has to include created_at
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     job_source = Column(Enum(JobSource), default=JobSource.LINKEDIN)
     title = Column(String(100), nullable=False)
     company = Column(String(100), nullable=False)
-    description = Column(Text, nullable=True)
+    description_hash = Column(
+        String(64), ForeignKey("job_descriptions.hash"), nullable=True, index=True
+    )
+    # Read-only view of the shared text; writes go through shared.db.ingest
+    description = column_property(
+        select(JobDescriptions.body)
+        .where(JobDescriptions.hash == description_hash)
+        .correlate_except(JobDescriptions)
+        .scalar_subquery()
+    )
     location = Column(String(100), nullable=False)
-    date = Column(DateTime, default=datetime.now)
+    date = Column(DateTime, default=datetime.now, nullable=False)
     job_url = Column(String(250), nullable=False)
-    created_at = Column(DateTime, default=datetime.now)
+    job_url_hash = Column(String(64), nullable=False, default=_default_job_url_hash)
+    created_at = Column(DateTime, default=datetime.now, primary_key=True)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     new = Column(Boolean, default=True)
     duplicate = Column(Boolean, default=False)
     relevant = Column(Boolean, default=False)
     promising = Column(Boolean, default=False)
     notified = Column(Boolean, default=False)
+    # Search config version relevant/promising were last computed with
+    config_version = Column(String(16), nullable=True)
+    # Set while an alert sender is delivering the job, see services/alert
+    alert_claimed_at = Column(DateTime, nullable=True)
+    search_vector = deferred(Column(TSVECTOR))  # job_search_vector(), set on ingest
     
     #representation
     def __repr__(self):
@@ -37,28 +194,43 @@ class Jobs(Base):
 
     def to_dict(self):
         """Convert SQLAlchemy model instance to a dictionary."""
-        result = {}
-
-        # Loop through the column names, not the Column objects
-        for column in self.__table__.columns:
-            column_name = column.name  # Get the column name (string)
-            value = getattr(self, column_name)  # Get the actual value of the column
-
-            # Handle Enum values by converting them to a string
-            if isinstance(value, enum.Enum):
-                value = value.name  # Convert Enum to its string name
-
-            # Handle datetime objects by converting to ISO 8601 format string
-            elif isinstance(value, datetime):
-                value = value.isoformat()  # Convert datetime to string in ISO format
-
-            if isinstance(value, list):  # Handle relationships (e.g., 'job_ids')
-                # Recursively convert related objects to dictionaries if they have 'to_dict' method
-                result[column_name] = [
-                    item.to_dict() if hasattr(item, "to_dict") else item
-                    for item in value
-                ]
-            else:
-                result[column_name] = value
-
-        return result
\ No newline at end of file
+        return JOB_SERIALIZER.object_to_dict(self)
+
+# Columns of a job as exposed by listings and exports: the description text
+# in place of its hash, no search_vector or delivery lease
+JOB_COLUMNS = [
+    Jobs.description.expression.label("description")
+    if column.key == "description_hash"
+    else column
+    for column in Jobs.__table__.columns
+    if column.key not in ("search_vector", "alert_claimed_at")
+]
+
+event.listen(Base.metadata, "before_create", DDL(SEARCH_VECTOR_FUNCTION_SQL))
+event.listen(Jobs.__table__, "after_create", DDL(DEFAULT_PARTITION_SQL))
+for _statement in DESCRIPTION_REFCOUNT_SQL:
+    event.listen(Jobs.__table__, "after_create", DDL(_statement))
+event.listen(
+    JobDescriptions.__table__, "after_create", DDL(DESCRIPTION_COMPRESSION_SQL)
+)
+
+# Compiled once from the table definition, see shared.db.serializers
+JOB_SERIALIZER = RowSerializer.for_columns(JOB_COLUMNS)
+
+class SearchRuns(Base):
+    """One scrape of one (planned) search query, used to track its yield."""
+
+    __tablename__ = "search_runs"
+    __table_args__ = (
+        Index("ix_search_runs_query_key_started_at", "query_key", "started_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    query_key = Column(String(250), nullable=False)
+    started_at = Column(DateTime, default=datetime.now, nullable=False)
+    requests = Column(Integer, nullable=False, default=0)
+    found = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<SearchRun '{self.query_key}' +{self.inserted}>"
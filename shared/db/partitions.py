@@ -0,0 +1,375 @@
+"""
+Monthly partitions of the jobs table and archival of old ones.
+
+jobs is range-partitioned by created_at, one partition per month named
+jobs_pYYYYMM, plus jobs_default for rows outside all of them. Postings
+are only ever inserted into the current month, so hot queries, vacuum and
+index maintenance stay on a few small partitions. ensure_partitions creates
+the coming months ahead of time. archive_partitions takes months older than
+the retention out of the table, either detaching them as standalone tables
+or writing them to zstd-compressed Parquet files and dropping them. Their
+URLs stay in job_urls (flagged archived) so seen-URL lookups still know
+them, and archived_job_batches reads the archived rows back for the dedup
+index.
+
+    python -m shared.db.partitions list
+    python -m shared.db.partitions ensure --months-ahead 3
+    python -m shared.db.partitions archive --keep-months 6 --mode parquet
+"""
+
+import argparse
+import asyncio
+import glob
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.database import configure, get_db
+from shared.db.export import parquet_batch, parquet_schema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.getenv("JOBS_ARCHIVE_DIR", "data/archive")
+DEFAULT_MONTHS_AHEAD = int(os.getenv("JOBS_PARTITION_MONTHS_AHEAD", "3"))
+DEFAULT_KEEP_MONTHS = int(os.getenv("JOBS_ARCHIVE_AFTER_MONTHS", "6"))
+ARCHIVE_MODES = ("parquet", "detach")
+ARCHIVE_FETCH_SIZE = 5000
+
+PARENT_TABLE = "jobs"
+DEFAULT_PARTITION = "jobs_default"
+
+_PARTITIONS_SQL = text(
+    """
+    SELECT c.relname AS name,
+           pg_get_expr(c.relpartbound, c.oid) AS bound,
+           c.reltuples::bigint AS estimated_rows,
+           pg_total_relation_size(c.oid) AS total_bytes
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = to_regclass(:parent)
+    ORDER BY c.relname
+    """
+)
+_BOUND_RE = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})[^']*'\) TO \('(\d{4}-\d{2}-\d{2})")
+
+# Rows of the month that landed in the default partition are moved into the
+# new table before it is attached. The statement targets the partition, not
+# jobs, so the refcount triggers do not fire and ref_count stays correct.
+_MOVE_FROM_DEFAULT_SQL = """
+WITH moved AS (
+    DELETE FROM {default} WHERE created_at >= $1 AND created_at < $2 RETURNING *
+)
+INSERT INTO {name} SELECT * FROM moved
+"""
+
+# Archived rows no longer reference their descriptions; the ones left
+# unreferenced are removed by shared.db.description_store prune
+_RELEASE_DESCRIPTIONS_SQL = """
+UPDATE job_descriptions d SET ref_count = d.ref_count - refs.n
+FROM (
+    SELECT description_hash, count(*) AS n FROM {name}
+    WHERE description_hash IS NOT NULL GROUP BY description_hash
+) refs
+WHERE d.hash = refs.description_hash
+"""
+
+_DETACHED_SQL = text(
+    """
+    SELECT c.relname FROM pg_class c
+    WHERE c.relkind = 'r' AND NOT c.relispartition
+        AND c.relnamespace = current_schema()::regnamespace
+        AND c.relname ~ :pattern
+    ORDER BY c.relname
+    """
+)
+
+_MARK_ARCHIVED_SQL = """
+UPDATE job_urls u SET archived = true
+FROM {name} j WHERE u.job_url_hash = j.job_url_hash
+"""
+
+
+@dataclass(frozen=True)
+class Partition:
+    """One partition of jobs; month is None for the default partition."""
+
+    name: str
+    month: Optional[date]
+    estimated_rows: int
+    total_bytes: int
+
+    @property
+    def is_default(self) -> bool:
+        return self.month is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "month": self.month.isoformat() if self.month else None}
+
+
+@dataclass
+class ArchiveResult:
+    """Outcome of archiving one monthly partition."""
+
+    partition: str
+    mode: str
+    rows: int = 0
+    path: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+async def _driver(session: AsyncSession):
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection  # asyncpg.Connection
+
+
+async def list_partitions(session: Optional[AsyncSession] = None) -> List[Partition]:
+    """Attached partitions of jobs, oldest month first and the default last."""
+    if session is None:
+        async with get_db() as session:
+            return await list_partitions(session)
+    rows = (await session.execute(_PARTITIONS_SQL, {"parent": PARENT_TABLE})).all()
+    partitions = []
+    for row in rows:
+        match = _BOUND_RE.search(row.bound or "")
+        month = date.fromisoformat(match.group(1)) if match else None
+        partitions.append(
+            Partition(row.name, month, max(row.estimated_rows, 0), row.total_bytes)
+        )
+    return sorted(partitions, key=lambda p: (p.month is None, p.month or date.min))
+
+
+async def ensure_partitions(
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+    session: Optional[AsyncSession] = None,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Create the partitions of the current month and the next months_ahead
+    months that do not exist yet. Returns the names created.
+    """
+    if session is None:
+        async with get_db() as session:
+            return await ensure_partitions(months_ahead, session, today)
+
+    existing = {p.month for p in await list_partitions(session)}
+    current = month_start(today or date.today())
+    driver = await _driver(session)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        lower = datetime.combine(month, datetime.min.time())
+        upper = datetime.combine(add_months(month, 1), datetime.min.time())
+        await driver.execute(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING STORAGE)"
+        )
+        moved = await driver.execute(
+            _MOVE_FROM_DEFAULT_SQL.format(default=DEFAULT_PARTITION, name=name),
+            lower,
+            upper,
+        )
+        await driver.execute(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        created.append(name)
+        logger.info(f"Created partition {name} ({moved.split()[-1]} rows from default)")
+    return created
+
+
+def _select_list(columns: Sequence[str]) -> str:
+    # Same columns as an export: the description text in place of its hash
+    return ", ".join(
+        "(SELECT body FROM job_descriptions WHERE hash = j.description_hash) AS description"
+        if column == "description"
+        else f"j.{column}"
+        for column in columns
+    )
+
+
+async def _write_parquet(session: AsyncSession, name: str, path: str) -> int:
+    """Write every row of the detached partition `name` to path."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet archival requires pyarrow") from e
+
+    schema = parquet_schema()
+    columns = _select_list(schema.names)
+    driver = await _driver(session)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        cursor = driver.cursor(
+            f"SELECT {columns} FROM {name} j ORDER BY j.id", prefetch=ARCHIVE_FETCH_SIZE
+        )
+        batch: List[Sequence[Any]] = []
+        async for record in cursor:
+            batch.append(record)
+            if len(batch) == ARCHIVE_FETCH_SIZE:
+                writer.write_batch(parquet_batch(batch, schema))
+                rows += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(parquet_batch(batch, schema))
+            rows += len(batch)
+    with open(tmp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return rows
+
+
+async def archive_partition(
+    partition: Partition,
+    mode: str = "parquet",
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    session: Optional[AsyncSession] = None,
+) -> ArchiveResult:
+    """
+    Take one monthly partition out of jobs, in a single transaction.
+
+    "detach" leaves it as a standalone table with the same name, still
+    referencing its descriptions. "parquet" writes it to
+    archive_dir/<name>.parquet and drops the table. Either way its URLs
+    are flagged archived in job_urls.
+    """
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Unknown archive mode {mode!r}")
+    if partition.is_default:
+        raise ValueError("The default partition cannot be archived")
+    if session is None:
+        async with get_db() as session:
+            return await archive_partition(partition, mode, archive_dir, session)
+
+    name = partition.name
+    # An archive run can take a while on a big month. Going through
+    # SQLAlchemy also opens the session transaction the raw calls share.
+    await session.execute(text("SET LOCAL statement_timeout = 0"))
+    driver = await _driver(session)
+    await driver.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+    await driver.execute(_MARK_ARCHIVED_SQL.format(name=name))
+    result = ArchiveResult(name, mode)
+    if mode == "detach":
+        result.rows = await driver.fetchval(f"SELECT count(*) FROM {name}")
+    else:
+        os.makedirs(archive_dir, exist_ok=True)
+        result.path = os.path.join(archive_dir, f"{name}.parquet")
+        result.rows = await _write_parquet(session, name, result.path)
+        await driver.execute(_RELEASE_DESCRIPTIONS_SQL.format(name=name))
+        await driver.execute(f"DROP TABLE {name}")
+    logger.info(f"Archived partition {name}: {result.to_dict()}")
+    return result
+
+
+async def archive_partitions(
+    keep_months: int = DEFAULT_KEEP_MONTHS,
+    mode: str = "parquet",
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    today: Optional[date] = None,
+) -> List[ArchiveResult]:
+    """
+    Archive every monthly partition older than the last keep_months months,
+    committing after each one.
+    """
+    cutoff = add_months(month_start(today or date.today()), -keep_months)
+    results = []
+    for partition in await list_partitions():
+        if partition.is_default or partition.month >= cutoff:
+            continue
+        async with get_db() as session:
+            results.append(await archive_partition(partition, mode, archive_dir, session))
+    return results
+
+
+async def detached_partitions(session: Optional[AsyncSession] = None) -> List[str]:
+    """Names of the monthly tables archived in "detach" mode."""
+    if session is None:
+        async with get_db() as session:
+            return await detached_partitions(session)
+    pattern = f"^{PARENT_TABLE}_p[0-9]{{6}}$"
+    return list((await session.execute(_DETACHED_SQL, {"pattern": pattern})).scalars())
+
+
+async def archived_job_batches(
+    columns: Sequence[str],
+    archive_dir: str = DEFAULT_ARCHIVE_DIR,
+    batch_size: int = ARCHIVE_FETCH_SIZE,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Rows of every archived month, detached tables and Parquet files, as
+    dicts of the given export columns (description is the text).
+    """
+    async with get_db() as session:
+        for name in await detached_partitions(session):
+            result = await session.stream(
+                text(f"SELECT {_select_list(columns)} FROM {name} j ORDER BY j.id")
+            )
+            async for partition in result.mappings().partitions(batch_size):
+                yield [dict(row) for row in partition]
+
+    paths = sorted(glob.glob(os.path.join(archive_dir, f"{PARENT_TABLE}_p*.parquet")))
+    if not paths:
+        return
+    import pyarrow.parquet as pq
+
+    for path in paths:
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=list(columns)):
+            yield batch.to_pylist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["list", "ensure", "archive"])
+    parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    parser.add_argument("--keep-months", type=int, default=DEFAULT_KEEP_MONTHS)
+    parser.add_argument("--mode", choices=ARCHIVE_MODES, default="parquet")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    args = parser.parse_args()
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "ensure":
+        created = asyncio.run(ensure_partitions(args.months_ahead))
+        print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+    elif args.command == "archive":
+        for result in asyncio.run(
+            archive_partitions(args.keep_months, args.mode, args.archive_dir)
+        ):
+            print(result.to_dict())
+    else:
+        for partition in asyncio.run(list_partitions()):
+            month = partition.month.isoformat() if partition.month else "default"
+            print(
+                f"{partition.name:<16} {month:<10} "
+                f"~{partition.estimated_rows:>9} rows {partition.total_bytes:>12} bytes"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Work-queue claiming for pipeline stages.
+
+Stage membership is derived from the boolean flags on jobs. Each stage's
+predicate matches a partial index on jobs(id), so claiming the next batch
+is an index range scan over pending rows only, and FOR UPDATE SKIP LOCKED
+lets several workers drain the same stage without blocking each other or
+processing a row twice.
+"""
+
+import contextlib
+import enum
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+from sqlalchemy import and_, func, not_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.database import get_db
+from shared.db.models import Jobs
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStage(enum.Enum):
+    FILTER = "filter"  # scraped but not yet deduplicated/filtered/scored
+    ALERT = "alert"  # relevant, original and not yet notified
+
+
+# Must stay in sync with the partial indexes declared on Jobs
+STAGE_PREDICATES = {
+    PipelineStage.FILTER: Jobs.new,
+    PipelineStage.ALERT: and_(
+        Jobs.relevant, not_(Jobs.duplicate), not_(Jobs.notified)
+    ),
+}
+
+
+async def claim_jobs(
+    session: AsyncSession,
+    stage: PipelineStage,
+    limit: int = 100,
+    where: Optional[Any] = None,
+) -> List[Jobs]:
+    """
+    Lock and return up to limit pending jobs of a stage, oldest first,
+    optionally narrowed by an extra where clause.
+
+    Rows stay locked until the session's transaction ends; rows locked by
+    other workers are skipped rather than waited on.
+    """
+    predicate = STAGE_PREDICATES[stage]
+    if where is not None:
+        predicate = and_(predicate, where)
+    stmt = (
+        select(Jobs)
+        .where(predicate)
+        .order_by(Jobs.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await session.execute(stmt)
+    jobs = list(result.scalars().all())
+    logger.debug(f"Claimed {len(jobs)} jobs for stage {stage.value}")
+    return jobs
+
+
+@contextlib.asynccontextmanager
+async def claim_batch(
+    stage: PipelineStage, limit: int = 100
+) -> AsyncIterator[List[Jobs]]:
+    """
+    Claim a batch in its own session. Changes made to the yielded jobs are
+    committed, and the locks released, when the block exits.
+    """
+    async with get_db() as session:
+        yield await claim_jobs(session, stage, limit)
+
+
+async def pending_count(session: AsyncSession, stage: PipelineStage) -> int:
+    """Number of jobs waiting in a stage."""
+    stmt = select(func.count(Jobs.id)).where(STAGE_PREDICATES[stage])
+    return (await session.execute(stmt)).scalar_one()
+
+
+async def drain_stage(
+    stage: PipelineStage,
+    handler: Callable[[List[Jobs]], Awaitable[None]],
+    batch_size: int = 100,
+    max_batches: int = 0,
+) -> int:
+    """
+    Repeatedly claim batches and pass them to handler until the stage is
+    empty (or max_batches is reached). The handler must move every job out
+    of the stage, e.g. by clearing `new` or setting `notified`.
+    """
+    processed = 0
+    batches = 0
+    while not max_batches or batches < max_batches:
+        async with claim_batch(stage, batch_size) as jobs:
+            if not jobs:
+                break
+            await handler(jobs)
+            processed += len(jobs)
+        batches += 1
+    logger.info(f"Drained {processed} jobs from stage {stage.value}")
+    return processed
@@ -0,0 +1,251 @@
+"""
+Offline replay of archived pages through parse, ingest and scoring.
+
+Streams the search result pages of a PageArchive, parses them on the CPU
+pool, fills in descriptions from the archived detail pages and bulk
+upserts the jobs, exactly as scrape_search_query would but without any
+network access. Postings are deduplicated on their URL hash as in a live
+scrape, and the newly inserted ones go through the dedup stage so
+near-duplicates are marked before scoring. Afterwards new jobs are
+scored, and with --rescore every job not yet scored under the current
+search_config.json is rescored, so a filter change reaches existing
+postings without scraping again. Replaying a
+captured archive into an empty database also makes a repeatable load test.
+
+    python -m shared.db.replay stats
+    python -m shared.db.replay run --since 2026-10-01 --workers 4 --rescore
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from shared.clients.page_archive import (
+    DEFAULT_PAGE_ARCHIVE_DIR,
+    PAGE_SEARCH,
+    PageArchive,
+)
+from shared.db.database import configure
+from shared.db.dedup import mark_duplicates
+from shared.db.ingest import bulk_upsert_jobs
+from shared.db.scoring import rescore_jobs, score_pending
+from shared.scrapers import linkedin
+from shared.utils.config_service import current_config
+from shared.utils.dedup import DEFAULT_INDEX_PATH, DedupIndex
+from shared.utils.cpu_pool import (
+    available_cpus,
+    configure_cpu_pool,
+    run_cpu,
+    shutdown_cpu_pool,
+)
+from shared.utils.urls import job_url_hash
+
+logger = logging.getLogger(__name__)
+
+PAGES_PER_CHUNK = 20
+
+
+@dataclass
+class ReplayReport:
+    """Totals of one replay."""
+
+    pages: int = 0
+    jobs: int = 0
+    descriptions: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    duration_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def parse_search_pages(bodies: Sequence[bytes]) -> List[Dict[str, Any]]:
+    """Jobs of a chunk of search pages; later copies of a posting win."""
+    jobs: Dict[str, Dict[str, Any]] = {}
+    for body in bodies:
+        for job in linkedin.parse_search_results(body.decode("utf-8", errors="replace")):
+            job["job_url_hash"] = job_url_hash(job["job_url"])
+            jobs[job["job_url_hash"]] = job
+    return list(jobs.values())
+
+
+def parse_descriptions(bodies: Sequence[bytes]) -> List[Optional[str]]:
+    return [
+        linkedin.parse_job_description(body.decode("utf-8", errors="replace"))
+        for body in bodies
+    ]
+
+
+def _archived_details(
+    archive: PageArchive, jobs: List[Dict[str, Any]]
+) -> List[Tuple[Dict[str, Any], bytes]]:
+    """Jobs paired with the body of their archived detail page."""
+    details = []
+    for job in jobs:
+        url = linkedin.build_job_detail_url(job["job_url"])
+        page = archive.get(url) if url else None
+        if page is not None:
+            details.append((job, page.body))
+    return details
+
+
+async def _replay_chunk(
+    archive: PageArchive,
+    bodies: List[bytes],
+    report: ReplayReport,
+    ingest_lock: asyncio.Lock,
+    dedup_index: Optional[DedupIndex],
+    dedup_lock: asyncio.Lock,
+) -> None:
+    jobs = await run_cpu(parse_search_pages, bodies)
+    details = await asyncio.to_thread(_archived_details, archive, jobs)
+    descriptions = await run_cpu(parse_descriptions, [body for _, body in details])
+    for (job, _), description in zip(details, descriptions):
+        if description:
+            job["description"] = description
+            report.descriptions += 1
+
+    # Chunks may share postings; upserting them one chunk at a time keeps
+    # concurrent updates of the same rows from deadlocking. The chunk is
+    # deduplicated before the next one is stored, so the index never sees
+    # another chunk's unchecked jobs as originals
+    async with ingest_lock:
+        ingest = await bulk_upsert_jobs(jobs)
+        if dedup_index is not None and ingest.inserted_ids:
+            async with dedup_lock:
+                dedup = await mark_duplicates(dedup_index, ingest.inserted_ids)
+            report.duplicates += dedup.duplicates
+    report.pages += len(bodies)
+    report.jobs += len(jobs)
+    report.inserted += len(ingest.inserted)
+    report.updated += len(ingest.updated)
+    report.unchanged += ingest.unchanged
+    report.skipped += ingest.skipped
+
+
+async def replay_archive(
+    archive: Optional[PageArchive] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    workers: int = 4,
+    dedup_index: Optional[DedupIndex] = None,
+    dedup_lock: Optional[asyncio.Lock] = None,
+) -> ReplayReport:
+    """
+    Parse and ingest the archived search pages fetched in [since, until),
+    with up to workers chunks in flight. With dedup_index the inserted jobs
+    are checked for near-duplicates; pass dedup_lock when the index is
+    shared with other tasks.
+    """
+    archive = archive or PageArchive()
+    report = ReplayReport()
+    started = time.monotonic()
+    ingest_lock = asyncio.Lock()
+    dedup_lock = dedup_lock or asyncio.Lock()
+    pending: Set[asyncio.Task] = set()
+
+    async def drain(limit: int) -> None:
+        nonlocal pending
+        while len(pending) > limit:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+
+    chunk: List[bytes] = []
+    pages = archive.pages(
+        kind=PAGE_SEARCH,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None,
+    )
+    try:
+        for page in pages:
+            chunk.append(page.body)
+            if len(chunk) >= PAGES_PER_CHUNK:
+                pending.add(asyncio.create_task(
+                    _replay_chunk(archive, chunk, report, ingest_lock, dedup_index, dedup_lock)
+                ))
+                chunk = []
+                # Bounded so a large archive is streamed, not loaded
+                await drain(workers - 1)
+        if chunk:
+            pending.add(asyncio.create_task(
+                _replay_chunk(archive, chunk, report, ingest_lock, dedup_index, dedup_lock)
+            ))
+        await drain(0)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    report.duration_seconds = round(time.monotonic() - started, 3)
+    logger.info(f"Replayed page archive {archive.directory}: {report.to_dict()}")
+    return report
+
+
+async def _replay_and_score(args: argparse.Namespace) -> Dict[str, Any]:
+    archive = PageArchive(args.archive_dir)
+    dedup_index = await DedupIndex.load_or_rebuild(args.index)
+    try:
+        report = await replay_archive(
+            archive,
+            since=datetime.fromisoformat(args.since) if args.since else None,
+            until=datetime.fromisoformat(args.until) if args.until else None,
+            workers=args.workers,
+            dedup_index=dedup_index,
+        )
+    finally:
+        archive.close()
+        dedup_index.save(args.index)
+    result: Dict[str, Any] = {"replay": report.to_dict()}
+    if not args.no_score:
+        snapshot = current_config(args.config)
+        scoring = await score_pending(snapshot.scorer, config_version=snapshot.version)
+        result["scored"] = scoring.summary()
+        if args.rescore:
+            rescored = await rescore_jobs(
+                snapshot.scorer, config_version=snapshot.version, stale_only=True
+            )
+            result["rescored"] = rescored.summary()
+        result["config_version"] = snapshot.version
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["run", "stats"])
+    parser.add_argument("--archive-dir", default=DEFAULT_PAGE_ARCHIVE_DIR)
+    parser.add_argument("--since", help="ISO date or time, pages fetched from then on")
+    parser.add_argument("--until", help="ISO date or time, pages fetched before then")
+    parser.add_argument("--workers", type=int, default=available_cpus())
+    parser.add_argument("--config", help="path to search_config.json")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="dedup index snapshot path")
+    parser.add_argument("--no-score", action="store_true", help="only parse and ingest")
+    parser.add_argument(
+        "--rescore", action="store_true", help="also rescore jobs of older configs"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "stats":
+        archive = PageArchive(args.archive_dir)
+        print(archive.stats())
+        archive.close()
+        return
+
+    configure(profile="batch")
+    configure_cpu_pool(args.workers)
+    try:
+        print(asyncio.run(_replay_and_score(args)))
+    finally:
+        shutdown_cpu_pool()
+
+
+if __name__ == "__main__":
+    main()
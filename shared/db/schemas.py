@@ -1,26 +1,44 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
+
+from shared.db.models import JobSource
 
-from shared.db.models import (JobSource)
 
 class JobBase(BaseModel):
-    id = Optional[int] = None
-    job_source = JobSource = JobSource.LINKEDIN
-    title = str
-    company = str
-    description = Optional[str]
-    location = str
-    date = datetime
-    job_url = str
-    created_at = datetime
-    updated_at = datetime
-    new = bool
-    duplicate = bool
-    relevant = bool
-    promising = bool
-    notified = bool
-
-    def to_dict(self):
-        return self.model_dump()
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
+    job_source: JobSource = JobSource.LINKEDIN
+    title: str
+    company: str
+    description: Optional[str] = None
+    location: str
+    date: Optional[datetime] = None
+    job_url: str
+    job_url_hash: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    new: bool = True
+    duplicate: bool = False
+    relevant: bool = False
+    promising: bool = False
+    notified: bool = False
+    config_version: Optional[str] = None
+
+    @field_serializer("job_source")
+    def serialize_job_source(self, job_source: JobSource) -> str:
+        # Enums are exposed by name, matching Jobs.to_dict
+        return job_source.name
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.model_dump(mode="json")
+
+
+class JobPage(BaseModel):
+    """One page of jobs from a list endpoint."""
+
+    items: List[JobBase] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
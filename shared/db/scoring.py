@@ -0,0 +1,255 @@
+"""
+Scoring stage: set `relevant` and `promising` with shared.utils.scoring.
+
+Jobs are read a batch at a time as columns, scored with numpy and written
+back with a single UPDATE ... FROM unnest(...) per batch that only carries
+the rows whose flags change. Every written row is stamped with the
+search config version it was scored under. `score_pending` drains the
+FILTER stage of the work queue; `rescore_jobs` walks the table after the
+weights or phrase lists change, with stale_only just the rows scored under
+another version.
+
+    python -m shared.db.scoring pending
+    python -m shared.db.scoring rescore --stale --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.database import configure, get_db
+from shared.db.filters import JobFilter
+from shared.db.models import Jobs
+from shared.db.queue import STAGE_PREDICATES, PipelineStage
+from shared.utils.config_service import current_config
+from shared.utils.cpu_pool import run_cpu
+from shared.utils.metrics import track_stage
+from shared.utils.scoring import JobScorer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 2000
+
+SCORING_COLUMNS = (
+    Jobs.id,
+    Jobs.title,
+    Jobs.company,
+    Jobs.description,
+    Jobs.date,
+    Jobs.relevant,
+    Jobs.promising,
+    Jobs.config_version,
+)
+_KEYS = [column.key for column in SCORING_COLUMNS]
+
+_UPDATE_SQL = text(
+    """
+    UPDATE jobs
+    SET relevant = s.relevant, promising = s.promising,
+        new = jobs.new AND NOT CAST(:clear_new AS boolean),
+        config_version = COALESCE(CAST(:config_version AS varchar), jobs.config_version)
+    FROM unnest(
+        CAST(:ids AS integer[]),
+        CAST(:relevant AS boolean[]),
+        CAST(:promising AS boolean[])
+    ) AS s(id, relevant, promising)
+    WHERE jobs.id = s.id
+    """
+)
+
+
+@dataclass
+class ScoringReport:
+    """Totals of one scoring run."""
+
+    scored: int = 0
+    changed: int = 0
+    relevant: int = 0
+    promising: int = 0
+    batches: int = 0
+
+    def add(self, scored: int, changed: int, relevant: int, promising: int) -> None:
+        self.scored += scored
+        self.changed += changed
+        self.relevant += relevant
+        self.promising += promising
+        self.batches += 1
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "scored": self.scored,
+            "changed": self.changed,
+            "relevant": self.relevant,
+            "promising": self.promising,
+            "batches": self.batches,
+        }
+
+
+def _frame(rows: Sequence[Any]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(rows, columns=_KEYS)
+
+
+async def score_batch(
+    session: AsyncSession,
+    scorer: JobScorer,
+    rows: Sequence[Any],
+    report: ScoringReport,
+    clear_new: bool = False,
+    dry_run: bool = False,
+    now: Optional[datetime] = None,
+    config_version: Optional[str] = None,
+) -> None:
+    """
+    Score rows selected with SCORING_COLUMNS and write the flags in one
+    UPDATE. With clear_new every row is written so it leaves the FILTER
+    stage; otherwise only rows whose flags change or that carry another
+    config_version than the one given.
+    """
+    with track_stage("filter", len(rows)):
+        jobs = _frame(rows)
+        scores = await run_cpu(scorer.evaluate, jobs, now)
+        relevant = scores["relevant"].to_numpy()
+        promising = scores["promising"].to_numpy()
+        changed = (relevant != jobs["relevant"].eq(True).to_numpy()) | (
+            promising != jobs["promising"].eq(True).to_numpy()
+        )
+        report.add(
+            len(jobs), int(changed.sum()), int(relevant.sum()), int(promising.sum())
+        )
+
+        write = np.ones(len(jobs), dtype=bool) if clear_new else changed
+        if config_version is not None:
+            stamped = jobs["config_version"].astype(object) == config_version
+            write |= ~stamped.to_numpy(dtype=bool)
+        if dry_run or not write.any():
+            return
+        await session.execute(
+            _UPDATE_SQL,
+            {
+                "ids": jobs["id"].to_numpy()[write].tolist(),
+                "relevant": relevant[write].tolist(),
+                "promising": promising[write].tolist(),
+                "clear_new": clear_new,
+                "config_version": config_version,
+            },
+        )
+
+
+async def score_pending(
+    scorer: JobScorer,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batches: int = 0,
+    config_version: Optional[str] = None,
+) -> ScoringReport:
+    """
+    Drain the FILTER stage: claim batches of new jobs (skipping rows other
+    workers hold), score them and clear `new`, one transaction per batch.
+    """
+    report = ScoringReport()
+    stmt = (
+        select(*SCORING_COLUMNS)
+        .where(STAGE_PREDICATES[PipelineStage.FILTER])
+        .order_by(Jobs.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True, of=Jobs)
+    )
+    while not max_batches or report.batches < max_batches:
+        async with get_db() as session:
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                break
+            await score_batch(
+                session,
+                scorer,
+                rows,
+                report,
+                clear_new=True,
+                config_version=config_version,
+            )
+    logger.info(f"Scored pending jobs: {report.summary()}")
+    return report
+
+
+async def rescore_jobs(
+    scorer: JobScorer,
+    filters: Optional[JobFilter] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    config_version: Optional[str] = None,
+    stale_only: bool = False,
+) -> ScoringReport:
+    """
+    Recompute the flags of every (filtered) job in id order, committing per
+    batch; with stale_only only jobs not yet scored under config_version.
+    """
+    report = ScoringReport()
+    base = (filters or JobFilter()).apply(select(*SCORING_COLUMNS))
+    if stale_only:
+        if config_version is None:
+            raise ValueError("stale_only needs a config_version")
+        base = base.where(Jobs.config_version.is_distinct_from(config_version))
+    now = datetime.now()
+    last_id = 0
+    while True:
+        async with get_db() as session:
+            stmt = base.where(Jobs.id > last_id).order_by(Jobs.id).limit(batch_size)
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            await score_batch(
+                session,
+                scorer,
+                rows,
+                report,
+                dry_run=dry_run,
+                now=now,
+                config_version=config_version,
+            )
+    logger.info(f"Rescored jobs{' (dry run)' if dry_run else ''}: {report.summary()}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["pending", "rescore"])
+    parser.add_argument("--config", help="path to search_config.json")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="rescore only")
+    parser.add_argument(
+        "--stale", action="store_true", help="rescore only jobs of older configs"
+    )
+    args = parser.parse_args()
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.INFO)
+    snapshot = current_config(args.config)
+    if args.command == "pending":
+        report = asyncio.run(
+            score_pending(
+                snapshot.scorer, args.batch_size, config_version=snapshot.version
+            )
+        )
+    else:
+        report = asyncio.run(
+            rescore_jobs(
+                snapshot.scorer,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+                config_version=snapshot.version,
+                stale_only=args.stale,
+            )
+        )
+    print({**report.summary(), "config_version": snapshot.version})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Full-text search over jobs and keyword filtering inside Postgres.
+
+Jobs.search_vector holds title, company and description as [a-z0-9]+
+tokens (weights A, B, C) without stemming, which is exactly what
+shared.utils.keyword_filter matches against. Search ranks title hits over
+company and description hits. The same vector lets the keyword filter's
+phrase lists be evaluated in the database, so relevance can be recomputed
+for the whole table in one UPDATE instead of pulling every description
+into Python.
+
+Phrases are matched as adjacent tokens. Postgres caps token positions at
+16383, so a phrase beyond that point in a very long description can be
+missed.
+
+    python -m shared.db.search search '"help desk" remote -manager'
+    python -m shared.db.search reevaluate --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import (ColumnElement, and_, cast, false, func, literal, not_, or_,
+                        select, update)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSQUERY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.db.filters import JobFilter
+from shared.db.models import JOB_COLUMNS, JOB_SERIALIZER, Jobs
+from shared.utils.keyword_filter import FILTER_CATEGORIES, tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
+
+# Field -> tsvector weight, as built by models.SEARCH_VECTOR_FUNCTION_SQL
+FIELD_WEIGHTS: Dict[str, str] = {"title": "A", "company": "B", "description": "C"}
+
+_QUERY_JUNK_RE = re.compile(r'[^a-z0-9"\s-]+')
+_INNER_HYPHEN_RE = re.compile(r'(?<=[a-z0-9"])-')
+
+
+def normalize_search_query(query: str) -> str:
+    """
+    Reduce user input to the vector's tokens while keeping the
+    websearch_to_tsquery syntax: "quoted phrases", `or` and leading `-`.
+    """
+    query = _QUERY_JUNK_RE.sub(" ", query.lower())
+    return _INNER_HYPHEN_RE.sub(" ", query)
+
+
+def search_tsquery(query: str) -> ColumnElement:
+    return func.websearch_to_tsquery(
+        cast(literal("simple"), REGCONFIG), normalize_search_query(query)
+    )
+
+
+def phrase_tsquery(
+    phrases: Iterable[str], weight: Optional[str] = None
+) -> Optional[str]:
+    """
+    tsquery text matching any of the phrases, each as adjacent tokens
+    restricted to one field's weight. None when no phrase has tokens.
+    """
+    suffix = f":{weight}" if weight else ""
+    alternatives = []
+    for phrase in phrases:
+        tokens = tokenize(phrase)
+        if tokens:
+            alternatives.append(
+                "(" + " <-> ".join(f"'{token}'{suffix}" for token in tokens) + ")"
+            )
+    return " | ".join(alternatives) or None
+
+
+def category_predicate(category: str, phrases: Iterable[str]) -> ColumnElement:
+    """SQL condition that a job has a hit in one keyword filter category."""
+    query = phrase_tsquery(phrases, FIELD_WEIGHTS[FILTER_CATEGORIES[category]])
+    if query is None:
+        return false()
+    return Jobs.search_vector.bool_op("@@")(cast(query, TSQUERY))
+
+
+def relevance_predicate(config: Mapping[str, Any]) -> ColumnElement:
+    """
+    SQL equivalent of KeywordFilter.from_config(config) relevance: a title
+    and a description include hit and no exclude hit.
+    """
+
+    def matches(category: str) -> ColumnElement:
+        return category_predicate(category, config.get(category) or [])
+
+    return and_(
+        matches("title_include"),
+        matches("desc_include_words"),
+        not_(
+            or_(
+                matches("title_exclude"),
+                matches("company_exclude"),
+                matches("desc_exclude_words"),
+                matches("non_remote_phrases"),
+            )
+        ),
+    )
+
+
+async def reevaluate_relevance(
+    session: AsyncSession,
+    config: Mapping[str, Any],
+    filters: Optional[JobFilter] = None,
+    dry_run: bool = False,
+) -> int:
+    """
+    Recompute `relevant` for every (filtered) job in the database and
+    return how many rows change.
+    """
+    predicate = relevance_predicate(config)
+    changed = Jobs.relevant.is_distinct_from(predicate)
+    filters = filters or JobFilter()
+    if dry_run:
+        stmt = filters.apply(select(func.count()).where(changed))
+        return (await session.execute(stmt)).scalar_one()
+    stmt = filters.apply(
+        update(Jobs)
+        .where(changed)
+        .values(relevant=predicate)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    logger.info(f"Re-evaluated relevance in the database: {result.rowcount} changed")
+    return result.rowcount
+
+
+async def search_jobs(
+    session: AsyncSession,
+    query: str,
+    filters: Optional[JobFilter] = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    offset: int = 0,
+) -> List[Tuple[Sequence[Any], float]]:
+    """Best matches for a websearch-style query as (row, rank) pairs."""
+    tsquery = search_tsquery(query)
+    rank = func.ts_rank_cd(Jobs.search_vector, tsquery).label("rank")
+    stmt = (filters or JobFilter()).apply(
+        select(*JOB_COLUMNS, rank).where(Jobs.search_vector.bool_op("@@")(tsquery))
+    )
+    stmt = stmt.order_by(rank.desc(), Jobs.id.desc())
+    stmt = stmt.limit(max(1, min(limit, MAX_SEARCH_LIMIT))).offset(offset)
+    rows = (await session.execute(stmt)).all()
+    return [(row[:-1], row[-1]) for row in rows]
+
+
+def search_body(results: Sequence[Tuple[Sequence[Any], float]]) -> bytes:
+    """JSON body of search results, rank included per item."""
+    items = []
+    for row, rank in results:
+        item = JOB_SERIALIZER.row_to_dict(row)
+        item["rank"] = rank
+        items.append(item)
+    return orjson.dumps({"items": items})
+
+
+async def _search(query: str, limit: int) -> None:
+    from shared.db.database import get_db
+
+    async with get_db() as session:
+        for row, rank in await search_jobs(session, query, limit=limit):
+            job = JOB_SERIALIZER.row_to_dict(row)
+            print(f"{rank:8.4f}  {job['title']} @ {job['company']}  {job['job_url']}")
+
+
+async def _reevaluate(config_path: Optional[str], dry_run: bool) -> None:
+    from shared.db.database import get_db
+    from shared.utils.search_config import load_search_config
+
+    config = load_search_config(config_path)
+    async with get_db() as session:
+        changed = await reevaluate_relevance(session, config, dry_run=dry_run)
+    print(f"{changed} jobs {'would change' if dry_run else 'changed'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="ranked full-text search")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    reevaluate = commands.add_parser(
+        "reevaluate", help="recompute `relevant` in the database from the config"
+    )
+    reevaluate.add_argument("--config", help="path to search_config.json")
+    reevaluate.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    from shared.db.database import configure
+
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.command == "search":
+        asyncio.run(_search(args.query, args.limit))
+    else:
+        asyncio.run(_reevaluate(args.config, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Precompiled row serializers.
+
+For a table, the per-column conversions (enum to name, datetime to ISO 8601)
+are decided once and compiled into straight-line functions, so serializing
+a row costs one dict display instead of a reflective loop over columns.
+The functions work on Core result rows (positional) as well as on ORM
+objects, and rows are encoded to JSON bytes with orjson.
+
+    python -m shared.db.serializers --rows 100000
+"""
+
+import argparse
+import enum
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import orjson
+from sqlalchemy import Column, DateTime, Enum, Table
+
+# How a column's value is made JSON-friendly
+PLAIN, ENUM, DATETIME = "plain", "enum", "datetime"
+
+_CONVERSIONS = {
+    PLAIN: "{v}",
+    ENUM: "(None if ({t} := {v}) is None else {t}.name)",
+    DATETIME: "(None if ({t} := {v}) is None else {t}.isoformat())",
+}
+
+
+def column_kind(column) -> str:
+    if isinstance(column.type, Enum):
+        return ENUM
+    if isinstance(column.type, DateTime):
+        return DATETIME
+    return PLAIN
+
+
+def _compile(
+    name: str,
+    fields: Sequence[Tuple[str, str]],
+    by_index: bool,
+    native: Iterable[str] = (),
+) -> Callable:
+    """
+    Build `name(row) -> dict` for (key, kind) fields. Kinds listed in
+    native are passed through untouched for an encoder that handles them.
+    """
+    items = []
+    for i, (key, kind) in enumerate(fields):
+        access = f"row[{i}]" if by_index else f"row.{key}"
+        template = _CONVERSIONS[PLAIN if kind in native else kind]
+        items.append(f"        {key!r}: {template.format(v=access, t=f'_v{i}')},")
+    source = "\n".join([f"def {name}(row):", "    return {", *items, "    }"])
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<serializer {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+class RowSerializer:
+    """Serializers for one fixed column list, compiled once."""
+
+    def __init__(self, fields: Sequence[Tuple[str, str]]) -> None:
+        self.fields = list(fields)
+        self.keys = [key for key, _ in self.fields]
+        # Plain-Python dicts, same conventions as the old Jobs.to_dict
+        self.row_to_dict = _compile("row_to_dict", self.fields, by_index=True)
+        self.object_to_dict = _compile("object_to_dict", self.fields, by_index=False)
+        # orjson writes naive datetimes exactly like isoformat(), so leave them
+        self._row_to_json_dict = _compile(
+            "row_to_json_dict", self.fields, by_index=True, native=(DATETIME,)
+        )
+
+    @classmethod
+    def for_columns(cls, columns: Iterable[Column]) -> "RowSerializer":
+        return cls([(column.key, column_kind(column)) for column in columns])
+
+    @classmethod
+    def for_table(cls, table: Table) -> "RowSerializer":
+        return cls.for_columns(table.columns)
+
+    def dumps(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        """JSON array of rows."""
+        convert = self._row_to_json_dict
+        return orjson.dumps([convert(row) for row in rows])
+
+    def dumps_lines(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        """NDJSON, one row per line."""
+        convert = self._row_to_json_dict
+        dumps = orjson.dumps
+        option = orjson.OPT_APPEND_NEWLINE
+        return b"".join([dumps(convert(row), option=option) for row in rows])
+
+    def row_to_values(self, row: Sequence[Any]) -> List[Any]:
+        return list(self.row_to_dict(row).values())
+
+
+def reflective_to_dict(obj) -> Dict[str, Any]:
+    """The previous Jobs.to_dict loop, kept as the benchmark baseline."""
+    result = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.name)
+        if isinstance(value, enum.Enum):
+            value = value.name
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        if isinstance(value, list):
+            result[column.name] = [
+                item.to_dict() if hasattr(item, "to_dict") else item for item in value
+            ]
+        else:
+            result[column.name] = value
+    return result
+
+
+def benchmark(rows: int = 100_000, repeat: int = 3) -> Dict[str, float]:
+    """Rows/sec of each serialization path over synthetic jobs."""
+    import json
+
+    from shared.db.models import JOB_COLUMNS, Jobs, JobSource
+
+    serializer = RowSerializer.for_columns(JOB_COLUMNS)
+    now = datetime.now()
+    values = [
+        {
+            "id": i,
+            "job_source": JobSource.LINKEDIN,
+            "title": f"Data Engineer {i}",
+            "company": "Acme",
+            "description": "Build pipelines. " * 40,
+            "location": "Remote",
+            "date": now,
+            "job_url": f"https://www.linkedin.com/jobs/view/{i}",
+            "job_url_hash": f"{i:064x}",
+            "created_at": now,
+            "updated_at": now,
+            "new": False,
+            "duplicate": False,
+            "relevant": i % 3 == 0,
+            "promising": False,
+            "notified": False,
+            "config_version": None,
+        }
+        for i in range(rows)
+    ]
+    objects = [Jobs(**v) for v in values]
+    tuples = [tuple(v[key] for key in serializer.keys) for v in values]
+
+    cases = {
+        "to_dict_reflective+json": lambda: json.dumps(
+            [reflective_to_dict(o) for o in objects]
+        ).encode(),
+        "object_to_dict+json": lambda: json.dumps(
+            [serializer.object_to_dict(o) for o in objects]
+        ).encode(),
+        "row_to_dict": lambda: [serializer.row_to_dict(r) for r in tuples],
+        "dumps(rows)": lambda: serializer.dumps(tuples),
+        "dumps_lines(rows)": lambda: serializer.dumps_lines(tuples),
+    }
+    results = {}
+    for name, case in cases.items():
+        best = min(_timed(case) for _ in range(repeat))
+        results[name] = rows / best
+    return results
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = benchmark(args.rows, args.repeat)
+    baseline = results["to_dict_reflective+json"]
+    for name, rate in results.items():
+        print(f"{name:<26} {rate:>12,.0f} rows/s  {rate / baseline:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
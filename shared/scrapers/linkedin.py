@@ -0,0 +1,161 @@
+"""
+LinkedIn guest job search: URL building and HTML parsing.
+
+Network access lives in the callers; everything here is pure so it can be
+reused for live scraping and for reprocessing stored pages.
+"""
+
+import logging
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+from shared.db.models import JobSource
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+JOB_DETAIL_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+PAGE_SIZE = 25
+
+_JOB_ID_RE = re.compile(r"(\d+)(?:/?\?|/?$)")
+_WS_RE = re.compile(r"\s+")
+
+
+def build_search_url(query: Dict[str, Any], timespan: str = "", page: int = 0) -> str:
+    """Search results URL for one search_config.json query and page."""
+    params = {
+        "keywords": query["keywords"],
+        "geoId": query["location"],
+        "f_TPR": timespan,
+        "f_WT": query.get("f_WT", ""),
+        "start": page * PAGE_SIZE,
+    }
+    return f"{SEARCH_URL}?{urlencode({k: v for k, v in params.items() if v != ''})}"
+
+
+def job_id_from_url(job_url: str) -> Optional[str]:
+    match = _JOB_ID_RE.search(job_url)
+    return match.group(1) if match else None
+
+
+def build_job_detail_url(job_url: str) -> Optional[str]:
+    job_id = job_id_from_url(job_url)
+    return JOB_DETAIL_URL.format(job_id=job_id) if job_id else None
+
+
+def _clean(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+
+class _SearchResultsParser(HTMLParser):
+    """Collect job cards from a search results fragment."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.jobs: List[Dict[str, Any]] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._field: Optional[str] = None
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if "base-card" in classes or "job-search-card" in classes:
+            self._current = {}
+            self.jobs.append(self._current)
+        if self._current is None:
+            return
+        if tag == "a" and "base-card__full-link" in classes:
+            self._current["job_url"] = (attrs.get("href") or "").split("?")[0]
+        elif tag == "time" and attrs.get("datetime"):
+            self._current["date"] = attrs["datetime"]
+        elif "base-search-card__title" in classes:
+            self._start_field("title")
+        elif "base-search-card__subtitle" in classes:
+            self._start_field("company")
+        elif "job-search-card__location" in classes:
+            self._start_field("location")
+
+    def _start_field(self, name: str) -> None:
+        self._field = name
+        self._buffer = []
+
+    def handle_endtag(self, tag):
+        if self._field and tag in ("h3", "h4", "span"):
+            self._current[self._field] = _clean("".join(self._buffer))
+            self._field = None
+
+    def handle_data(self, data):
+        if self._field:
+            self._buffer.append(data)
+
+
+# HTML elements that never have an end tag, written as <br> as often as <br/>
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+
+class _JobDetailParser(HTMLParser):
+    """Extract the description text from a job posting page."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._depth = 0
+        self._parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._depth:
+            if tag in ("br", "p", "li"):
+                self._parts.append("\n")
+            if tag not in _VOID_TAGS:
+                self._depth += 1
+        elif "show-more-less-html__markup" in (dict(attrs).get("class") or ""):
+            self._depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self._depth and tag == "br":
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if self._depth and tag not in _VOID_TAGS:
+            self._depth -= 1
+
+    def handle_data(self, data):
+        if self._depth:
+            self._parts.append(data)
+
+    @property
+    def description(self) -> Optional[str]:
+        lines = (_clean(line) for line in "".join(self._parts).split("\n"))
+        text = "\n".join(line for line in lines if line)
+        return text or None
+
+
+def parse_search_results(html: str) -> List[Dict[str, Any]]:
+    """Parse a search results page into scraped-job dictionaries."""
+    parser = _SearchResultsParser()
+    parser.feed(html)
+    jobs = []
+    for card in parser.jobs:
+        if not card.get("job_url") or not card.get("title"):
+            continue
+        date = card.get("date")
+        try:
+            card["date"] = datetime.fromisoformat(date) if date else None
+        except ValueError:
+            card["date"] = None
+        card["job_source"] = JobSource.LINKEDIN
+        jobs.append(card)
+    return jobs
+
+
+def parse_job_description(html: str) -> Optional[str]:
+    """Parse the description out of a job detail page."""
+    parser = _JobDetailParser()
+    parser.feed(html)
+    return parser.description
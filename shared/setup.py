@@ -10,10 +10,19 @@ setup(
     install_requires=[
         "sqlalchemy>=2.0.0",
         "pydantic>=2.0.0",
+        "pydantic-settings>=2.0.0",
         "temporalio>=1.4.0",
         "asyncpg>=0.29.0",
         "python-dotenv>=1.0.0",
         "tenacity>=9.1.2",
+        "numpy>=1.26.0",
+        "pandas>=2.1.0",
+        "aiohttp>=3.9.0",
+        "orjson>=3.9.0",
+        "prometheus-client>=0.17.0",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=15.0.0"],
+    },
     python_requires=">=3.12",
 )
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# shared.* is imported from the repository root
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(HERE, "..", "..")))
@@ -0,0 +1,121 @@
+"""
+Dedup stage against a real Postgres, two indexes standing in for two
+worker processes.
+
+Tables are created in their own schema of TEST_DATABASE_URL; the tests
+are skipped without it.
+
+    TEST_DATABASE_URL=postgresql+asyncpg://... python -m pytest shared/tests
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from shared.db import database
+from shared.db.database import Base
+from shared.db.dedup import mark_duplicates
+from shared.db.ingest import bulk_upsert_jobs
+from shared.db.models import Jobs
+from shared.utils.dedup import DedupIndex
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+SCHEMA = "test_dedup"
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+DESCRIPTION = (
+    "We are hiring a senior python engineer to build data pipelines with "
+    "airflow, spark and postgres for our analytics platform in a remote team. "
+) * 3
+
+
+def _job(number: int, description: str = DESCRIPTION):
+    return {
+        "title": "Senior Python Engineer",
+        "company": "Acme",
+        "location": "Remote",
+        "job_url": f"https://www.linkedin.com/jobs/view/{number}",
+        "description": description,
+    }
+
+
+async def _setup_db():
+    engine = create_async_engine(
+        DATABASE_URL, connect_args={"server_settings": {"search_path": SCHEMA}}
+    )
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.exec_driver_sql(f"CREATE SCHEMA {SCHEMA}")
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    database.configure(profile="worker")
+    database.engines._engines["worker"] = engine
+    database.engines._session_makers["worker"] = session_maker
+    return engine, session_maker
+
+
+async def _teardown_db(engine) -> None:
+    database.engines._engines.pop("worker", None)
+    database.engines._session_makers.pop("worker", None)
+    await engine.dispose()
+
+
+async def _duplicates(session_maker):
+    async with session_maker() as session:
+        rows = await session.execute(select(Jobs.id, Jobs.duplicate).order_by(Jobs.id))
+    return {job_id: bool(duplicate) for job_id, duplicate in rows}
+
+
+def test_unchecked_jobs_of_another_worker_are_checked_on_catch_up():
+    async def scenario():
+        engine, session_maker = await _setup_db()
+        try:
+            first, second = DedupIndex(), DedupIndex()
+            original = (await bulk_upsert_jobs([_job(1)])).inserted_ids
+            await mark_duplicates(first, original)
+            # Worker one stores a repost but has not checked it yet when
+            # worker two checks its own, unrelated job
+            repost = (await bulk_upsert_jobs([_job(2)])).inserted_ids
+            other = (await bulk_upsert_jobs([_job(3, "rust embedded firmware " * 20)]))
+            report = await mark_duplicates(second, other.inserted_ids)
+            assert report.caught_up == 2
+            after_catch_up = await _duplicates(session_maker)
+            # Worker one's own check agrees
+            own = await mark_duplicates(first, repost)
+            return after_catch_up, own, await _duplicates(session_maker), repost[0]
+        finally:
+            await _teardown_db(engine)
+
+    after_catch_up, own, final, repost_id = asyncio.run(scenario())
+    assert after_catch_up[repost_id] is True
+    assert own.duplicates == 1
+    assert list(final.values()).count(True) == 1 and final[repost_id]
+
+
+def test_rebuild_leaves_pending_jobs_to_catch_up():
+    async def scenario():
+        engine, session_maker = await _setup_db()
+        try:
+            original = (await bulk_upsert_jobs([_job(1)])).inserted_ids
+            repost = (await bulk_upsert_jobs([_job(2)])).inserted_ids
+            async with session_maker() as session:
+                # The original was scored; the repost is still pending
+                await session.execute(
+                    update(Jobs).where(Jobs.id.in_(original)).values(new=False)
+                )
+                await session.commit()
+            index = await DedupIndex.rebuild()
+            watermark = index.watermark
+            other = (await bulk_upsert_jobs([_job(3, "rust embedded firmware " * 20)]))
+            await mark_duplicates(index, other.inserted_ids)
+            return watermark, original[0], await _duplicates(session_maker), repost[0]
+        finally:
+            await _teardown_db(engine)
+
+    watermark, original_id, final, repost_id = asyncio.run(scenario())
+    assert watermark == repost_id - 1 and original_id < repost_id
+    assert final[repost_id] is True
@@ -0,0 +1,94 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from shared.clients.http_cache import HttpCache
+
+PAGE = b"<html>" + b"job posting " * 200 + b"</html>"
+
+
+class Origin:
+    """Test server answering conditional GETs by ETag."""
+
+    def __init__(self):
+        self.requests = []
+        self.etag = '"v1"'
+        self.body = PAGE
+
+    async def handle(self, request):
+        self.requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag})
+        return web.Response(body=self.body, content_type="text/html", headers={"ETag": self.etag})
+
+
+async def _serve(origin, scenario):
+    app = web.Application()
+    app.router.add_get("/{page}", origin.handle)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await scenario(session, lambda page: str(server.make_url(f"/{page}")))
+    finally:
+        await server.close()
+
+
+def test_fresh_entry_is_served_without_a_request(tmp_path):
+    origin = Origin()
+    cache = HttpCache(str(tmp_path), ttl_seconds=3600)
+
+    async def scenario(session, url):
+        first = await cache.fetch(session, url("a"))
+        second = await cache.fetch(session, url("a"))
+        return first, second
+
+    first, second = asyncio.run(_serve(origin, scenario))
+    assert first == second == PAGE.decode()
+    assert origin.requests == [None]
+    assert cache.stats.misses == 1 and cache.stats.hits == 1
+    cache.close()
+
+
+def test_stale_entry_is_revalidated_by_etag(tmp_path):
+    origin = Origin()
+    cache = HttpCache(str(tmp_path), ttl_seconds=0)
+
+    async def scenario(session, url):
+        await cache.fetch(session, url("a"))
+        unchanged = await cache.fetch(session, url("a"))
+        origin.etag, origin.body = '"v2"', b"<html>reposted</html>"
+        changed = await cache.fetch(session, url("a"))
+        return unchanged, changed, cache.get(url("a")).etag
+
+    unchanged, changed, etag = asyncio.run(_serve(origin, scenario))
+    assert unchanged == PAGE.decode()
+    assert changed == "<html>reposted</html>"
+    assert origin.requests == [None, '"v1"', '"v1"']
+    assert cache.stats.revalidated == 1 and cache.stats.bytes_saved == len(PAGE)
+    assert etag == '"v2"'
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    origin = Origin()
+    cache = HttpCache(str(tmp_path), ttl_seconds=3600)
+
+    async def scenario(session, url):
+        for page in ("a", "b", "c"):
+            await cache.fetch(session, url(page))
+        # a is read again, so b is now the least recently used
+        await cache.fetch(session, url("a"))
+        # Room for three entries once eviction drops to 90% of the budget
+        cache.max_bytes = cache.total_bytes // 3 * 7 // 2
+        await cache.fetch(session, url("d"))
+        return [page for page in "abcd" if cache.get(url(page)) is not None]
+
+    kept = asyncio.run(_serve(origin, scenario))
+    assert kept == ["a", "c", "d"]
+    assert cache.stats.evicted == 1
+    assert cache.total_bytes <= cache.max_bytes
+    cache.close()
+
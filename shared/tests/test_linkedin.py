@@ -0,0 +1,33 @@
+from shared.scrapers import linkedin
+
+DETAIL_PAGE = """
+<html><body>
+<section class="description">
+  <div class="show-more-less-html__markup">
+    <p>We build data pipelines.<br>Python and SQL required.</p>
+    Remote friendly<br><img src="team.png"><hr><wbr>
+    <ul><li>Ingestion</li><li>Reporting</li></ul>
+  </div>
+</section>
+<ul class="description__job-criteria-list">
+  <li><h3>Seniority level</h3><span>Mid-Senior level</span></li>
+</ul>
+<footer>LinkedIn Corporation 2026</footer>
+</body></html>
+"""
+
+
+def test_description_stops_at_the_markup_div_with_void_tags():
+    description = linkedin.parse_job_description(DETAIL_PAGE)
+    assert description == (
+        "We build data pipelines.\n"
+        "Python and SQL required.\n"
+        "Remote friendly\n"
+        "Ingestion\n"
+        "Reporting"
+    )
+
+
+def test_self_closed_br_breaks_lines():
+    html = '<div class="show-more-less-html__markup">one<br/>two</div><p>after</p>'
+    assert linkedin.parse_job_description(html) == "one\ntwo"
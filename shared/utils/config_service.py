@@ -0,0 +1,251 @@
+"""
+In-process search configuration service.
+
+search_config.json is loaded once per process, validated and compiled into
+the structures the pipeline uses (the keyword filter automata and the job
+scorer). Callers ask for the current snapshot; at most every
+`check_interval` seconds that costs a stat() of the file, and when its
+mtime or size changed the file is re-read and only the sections whose
+content changed are recompiled. An invalid edit is logged and the previous
+snapshot stays in use.
+
+Each snapshot carries a `version`: a hash of the sections that decide how
+jobs are evaluated (phrase lists and scoring). The scoring stage stamps it
+on every job it scores, so rows evaluated under an older config can be
+found and rescored; editing only the search queries keeps the version.
+
+    snapshot = current_config()
+    snapshot.scorer.evaluate(frame)
+    snapshot.version
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import orjson
+from pydantic import (BaseModel, ConfigDict, Field, PositiveFloat, PositiveInt,
+                      field_validator)
+
+from shared.utils.keyword_filter import FILTER_CATEGORIES, KeywordFilter, tokenize
+from shared.utils.scoring import FEATURES, JobScorer, ScoringConfig
+from shared.utils.search_config import DEFAULT_SEARCH_CONFIG_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = float(os.getenv("SEARCH_CONFIG_CHECK_INTERVAL", "5"))
+
+
+class SearchQuery(BaseModel):
+    # Scrapers may read further parameters of their own
+    model_config = ConfigDict(extra="allow")
+
+    keywords: str = Field(min_length=1)
+    location: str
+    f_WT: str = ""
+    source: Optional[str] = None
+
+
+class ScoringSection(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    weights: Dict[str, float] = Field(default_factory=dict)
+    promising_threshold: float = 4.0
+    recency_half_life_days: PositiveFloat = 7.0
+    max_hits: PositiveInt = 3
+
+    @field_validator("weights")
+    @classmethod
+    def _known_weights(cls, weights: Dict[str, float]) -> Dict[str, float]:
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features {sorted(unknown)}")
+        return weights
+
+
+class SearchConfigModel(BaseModel):
+    """Schema of search_config.json."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    search_queries: List[SearchQuery] = Field(default_factory=list)
+    title_include: List[str] = Field(default_factory=list)
+    title_exclude: List[str] = Field(default_factory=list)
+    desc_include_words: List[str] = Field(default_factory=list)
+    desc_exclude_words: List[str] = Field(default_factory=list)
+    company_exclude: List[str] = Field(default_factory=list)
+    non_remote_phrases: List[str] = Field(default_factory=list)
+    scoring: ScoringSection = Field(default_factory=ScoringSection)
+    timespan: str = ""
+    pages_to_scrape: PositiveInt = 1
+    rounds: PositiveInt = 1
+
+
+# Top-level keys of each independently compiled section
+SECTIONS = {
+    "filter": tuple(FILTER_CATEGORIES),
+    "scoring": ("scoring", "title_include"),
+    "planner": ("search_queries", "timespan", "pages_to_scrape", "rounds"),
+}
+# Sections whose content decides relevant/promising, hashed into `version`
+EVALUATION_SECTIONS = ("filter", "scoring")
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(orjson.dumps(value, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledConfig:
+    """One validated, compiled version of the search configuration."""
+
+    config: Dict[str, Any]
+    keyword_filter: KeywordFilter
+    scorer: JobScorer
+    version: str
+    section_hashes: Dict[str, str]
+    path: str
+    mtime_ns: int
+    loaded_at: float
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "queries": len(self.config["search_queries"]),
+            "sections": {
+                name: digest[:12] for name, digest in self.section_hashes.items()
+            },
+        }
+
+
+def compile_config(
+    raw: Dict[str, Any],
+    previous: Optional[CompiledConfig] = None,
+    path: str = "",
+    mtime_ns: int = 0,
+) -> CompiledConfig:
+    """
+    Validate a loaded config and compile it, reusing the compiled structures
+    of `previous` for sections that did not change. Raises
+    pydantic.ValidationError for an invalid config.
+    """
+    config = SearchConfigModel.model_validate(raw).model_dump(exclude_none=True)
+    hashes = {
+        name: _digest({key: config[key] for key in keys})
+        for name, keys in SECTIONS.items()
+    }
+    changed = [
+        name
+        for name in SECTIONS
+        if previous is None or previous.section_hashes[name] != hashes[name]
+    ]
+
+    if "filter" in changed:
+        keyword_filter = KeywordFilter.from_config(config)
+    else:
+        keyword_filter = previous.keyword_filter
+    if "filter" in changed or "scoring" in changed:
+        scorer = JobScorer(
+            keyword_filter,
+            ScoringConfig.from_config(config),
+            {phrase: len(tokenize(phrase)) for phrase in config["title_include"]},
+        )
+    else:
+        scorer = previous.scorer
+
+    version = _digest([hashes[name] for name in EVALUATION_SECTIONS])[:16]
+    if previous is not None:
+        logger.info(
+            f"Search config {path} reloaded, changed sections: "
+            f"{', '.join(changed) or 'none'}; version {version}"
+        )
+    return CompiledConfig(
+        config=config,
+        keyword_filter=keyword_filter,
+        scorer=scorer,
+        version=version,
+        section_hashes=hashes,
+        path=path,
+        mtime_ns=mtime_ns,
+        loaded_at=time.time(),
+    )
+
+
+class ConfigService:
+    """Current compiled config of one file, reloaded when the file changes."""
+
+    def __init__(
+        self, path: Optional[str] = None, check_interval: float = DEFAULT_CHECK_INTERVAL
+    ) -> None:
+        self.path = path or DEFAULT_SEARCH_CONFIG_PATH
+        self.check_interval = check_interval
+        self._snapshot: Optional[CompiledConfig] = None
+        self._stat: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> CompiledConfig:
+        """The current snapshot, reloading first if the file changed."""
+        now = time.monotonic()
+        fresh = now - self._checked_at < self.check_interval
+        if self._snapshot is not None and fresh:
+            return self._snapshot
+        with self._lock:
+            self._checked_at = now
+            self._maybe_reload()
+        return self._snapshot
+
+    def reload(self) -> CompiledConfig:
+        """Re-read the file now, even if it looks unchanged."""
+        with self._lock:
+            self._stat = None
+            self._maybe_reload()
+        return self._snapshot
+
+    def _maybe_reload(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            if self._snapshot is None:
+                raise
+            logger.error(f"Cannot stat search config {self.path}, keeping old: {e}")
+            return
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                raw = orjson.loads(f.read())
+            snapshot = compile_config(raw, self._snapshot, self.path, stat.st_mtime_ns)
+        except Exception as e:
+            if self._snapshot is None:
+                raise
+            # Keep serving the last good version; retry once the file changes
+            logger.error(f"Invalid search config {self.path}, keeping old: {e}")
+            self._stat = key
+            return
+        self._snapshot = snapshot
+        self._stat = key
+
+
+_services: Dict[str, ConfigService] = {}
+_services_lock = threading.Lock()
+
+
+def get_config_service(path: Optional[str] = None) -> ConfigService:
+    """The process-wide service of a config file."""
+    path = os.path.abspath(path or DEFAULT_SEARCH_CONFIG_PATH)
+    with _services_lock:
+        if path not in _services:
+            _services[path] = ConfigService(path)
+        return _services[path]
+
+
+def current_config(path: Optional[str] = None) -> CompiledConfig:
+    """Snapshot of the search config at path (the default file if None)."""
+    return get_config_service(path).get()
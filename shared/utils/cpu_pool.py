@@ -0,0 +1,70 @@
+"""
+Off-loop execution of CPU-bound work for async code.
+
+Activities run on the worker's event loop, so parsing a page or scoring a
+batch inline stalls every other activity of the process (and their
+heartbeats). run_cpu hands such work to a process pool when one is
+configured, so it runs on another core, and to a thread otherwise, which
+at least keeps the loop responsive. Functions and arguments go to the pool
+by pickling, so prefer plain functions over large objects.
+
+    configure_cpu_pool(4)
+    jobs = await run_cpu(linkedin.parse_search_results, html)
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", "0"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def available_cpus() -> int:
+    """Cores this process may use, honouring the container's CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def configure_cpu_pool(size: int = DEFAULT_CPU_POOL_SIZE) -> None:
+    """Use a pool of size processes for run_cpu; 0 runs work on threads."""
+    global _pool
+    shutdown_cpu_pool()
+    if size > 0:
+        # Forking a process that runs the Temporal core threads is unsafe
+        _pool = ProcessPoolExecutor(size, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"CPU pool of {size} processes in process {os.getpid()}")
+
+
+def shutdown_cpu_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run func(*args, **kwargs) off the event loop and return its result."""
+    call = functools.partial(func, *args, **kwargs)
+    if _pool is None:
+        return await asyncio.to_thread(call)
+    return await asyncio.get_running_loop().run_in_executor(_pool, call)
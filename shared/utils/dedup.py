@@ -0,0 +1,304 @@
+"""
+Near-duplicate job detection with MinHash signatures and an LSH band index.
+
+Each job is shingled over its title, company and description tokens and
+reduced to a fixed-size MinHash signature. Signatures are split into bands;
+jobs sharing any band bucket become candidate pairs, and candidates are
+verified against the estimated Jaccard similarity before a row is marked
+as a duplicate. Lookups touch one bucket per band, so checking a new job
+costs the same no matter how many jobs are indexed.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shared.utils.keyword_filter import tokenize
+from shared.utils.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.getenv("DEDUP_INDEX_PATH", "data/dedup_index.pkl")
+
+# Universal hashing modulo a Mersenne prime; a * h stays below 2**63 for 32-bit h
+_PRIME = np.uint64((1 << 31) - 1)
+_SEED = 1
+
+
+def _field(job: Any, name: str) -> Optional[str]:
+    if isinstance(job, Mapping):
+        return job.get(name)
+    return getattr(job, name, None)
+
+
+def shingles(job: Any, size: int = 3) -> List[int]:
+    """Hash the word shingles of a job's title, company and description."""
+    tokens = (
+        tokenize(_field(job, "title"))
+        + tokenize(_field(job, "company"))
+        + tokenize(_field(job, "description"))
+    )
+    if not tokens:
+        return []
+    if len(tokens) <= size:
+        return [zlib.crc32(" ".join(tokens).encode())]
+    return list(
+        {
+            zlib.crc32(" ".join(tokens[i : i + size]).encode())
+            for i in range(len(tokens) - size + 1)
+        }
+    )
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) whose LSH S-curve crosses closest to threshold."""
+    best = (num_perm, 1)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+@dataclass
+class DedupStats:
+    """Counters for tuning the similarity threshold."""
+
+    indexed: int = 0
+    queries: int = 0
+    candidate_pairs: int = 0
+    verified_pairs: int = 0
+
+    @property
+    def precision(self) -> float:
+        """Share of LSH candidates that passed verification."""
+        if not self.candidate_pairs:
+            return 0.0
+        return self.verified_pairs / self.candidate_pairs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "precision": round(self.precision, 4)}
+
+
+class DedupIndex:
+    """Persistent MinHash LSH index of job postings."""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+    ) -> None:
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = np.random.RandomState(_SEED)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[int, np.ndarray] = {}
+        self.stats = DedupStats()
+        # Every stored job up to this id has been indexed or checked
+        self.watermark = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, job_id: int) -> bool:
+        return job_id in self._signatures
+
+    def signature(self, job: Any) -> Optional[np.ndarray]:
+        """MinHash signature of a job, or None if it has no text."""
+        hashes = shingles(job, self.shingle_size)
+        if not hashes:
+            return None
+        h = np.asarray(hashes, dtype=np.uint64)
+        # (num_perm, n_shingles) permuted hashes, reduced to the row minimum
+        permuted = (np.outer(self._a, h) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        rows = self.rows
+        return [
+            zlib.crc32(signature[band * rows : (band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _add(self, job_id: int, signature: np.ndarray, keys: Sequence[int]) -> None:
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(job_id)
+        self._signatures[job_id] = signature
+        self.stats.indexed += 1
+
+    def add(self, job_id: int, job: Any) -> None:
+        """Index a job without checking it for duplicates."""
+        if job_id in self._signatures:
+            return
+        signature = self.signature(job)
+        if signature is not None:
+            self._add(job_id, signature, self._band_keys(signature))
+
+    def _query(self, signature: np.ndarray, keys: Sequence[int]) -> Optional[int]:
+        self.stats.queries += 1
+        candidates = set()
+        for bucket, key in zip(self._buckets, keys):
+            candidates.update(bucket.get(key, ()))
+        self.stats.candidate_pairs += len(candidates)
+
+        best_id, best_sim = None, self.threshold
+        for candidate in candidates:
+            sim = float(np.mean(self._signatures[candidate] == signature))
+            if sim >= self.threshold:
+                self.stats.verified_pairs += 1
+                if sim > best_sim or best_id is None or (
+                    sim == best_sim and candidate < best_id
+                ):
+                    best_id, best_sim = candidate, sim
+        return best_id
+
+    def query(self, job: Any) -> Optional[int]:
+        """Return the id of an indexed near-duplicate of job, if any."""
+        signature = self.signature(job)
+        if signature is None:
+            return None
+        return self._query(signature, self._band_keys(signature))
+
+    def check_and_add(self, job_id: int, job: Any) -> Optional[int]:
+        """
+        Return the id of the posting job duplicates, or index it as an
+        original and return None.
+        """
+        if job_id in self._signatures:
+            return None
+        signature = self.signature(job)
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+        original = self._query(signature, keys)
+        if original is None:
+            self._add(job_id, signature, keys)
+        return original
+
+    def apply_batch(self, jobs: Iterable[Any]) -> Dict[int, int]:
+        """
+        Check a batch of persisted jobs in id order and set their duplicate
+        flag in place. Returns a mapping of duplicate id -> original id.
+        """
+        matches: Dict[int, int] = {}
+        jobs = sorted(jobs, key=lambda j: _field(j, "id"))
+        with track_stage("dedup", len(jobs)):
+            for job in jobs:
+                job_id = _field(job, "id")
+                original = self.check_and_add(job_id, job)
+                is_duplicate = original is not None
+                if is_duplicate:
+                    matches[job_id] = original
+                if isinstance(job, dict):
+                    job["duplicate"] = is_duplicate
+                else:
+                    job.duplicate = is_duplicate
+        return matches
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> None:
+        """Atomically write the index to disk."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved dedup index with {len(self)} jobs to {path}")
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "DedupIndex":
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        if not isinstance(index, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        if not hasattr(index, "watermark"):
+            # Snapshot from before watermarks: catch up over every stored job
+            index.watermark = 0
+        logger.info(f"Loaded dedup index with {len(index)} jobs from {path}")
+        return index
+
+    @classmethod
+    async def rebuild(
+        cls,
+        batch_size: int = 1000,
+        archive_dir: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "DedupIndex":
+        """
+        Rebuild the index from every non-duplicate job: the archived
+        partitions of old months first, then the rows of the jobs table.
+        New jobs may not have been through the dedup stage yet, so the
+        index stops below the first of them and shared.db.dedup checks the
+        rest when it catches up.
+        """
+        from sqlalchemy import func, select
+
+        from shared.db.database import get_db
+        from shared.db.models import Jobs
+        from shared.db.partitions import DEFAULT_ARCHIVE_DIR, archived_job_batches
+
+        index = cls(**kwargs)
+        archived = archived_job_batches(
+            ("id", "title", "company", "description", "duplicate"),
+            archive_dir or DEFAULT_ARCHIVE_DIR,
+            batch_size,
+        )
+        async for batch in archived:
+            for row in batch:
+                if not row["duplicate"]:
+                    index.add(row["id"], row)
+        stmt = (
+            select(Jobs.id, Jobs.title, Jobs.company, Jobs.description)
+            .where(Jobs.duplicate.is_not(True))
+            .order_by(Jobs.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async with get_db() as session:
+            first_new = await session.scalar(
+                select(func.min(Jobs.id)).where(Jobs.new.is_(True))
+            )
+            if first_new is not None:
+                stmt = stmt.where(Jobs.id < first_new)
+            result = await session.stream(stmt)
+            async for partition in result.mappings().partitions(batch_size):
+                for row in partition:
+                    index.add(row["id"], row)
+                index.watermark = max(index.watermark, partition[-1]["id"])
+            if first_new is not None:
+                index.watermark = max(index.watermark, first_new - 1)
+        logger.info(f"Rebuilt dedup index with {len(index)} jobs, archives included")
+        return index
+
+    @classmethod
+    async def load_or_rebuild(
+        cls, path: str = DEFAULT_INDEX_PATH, **kwargs: Any
+    ) -> "DedupIndex":
+        """Load the index from disk, rebuilding and saving it if missing."""
+        if os.path.exists(path):
+            try:
+                return cls.load(path)
+            except Exception as e:
+                logger.warning(f"Failed to load dedup index from {path}: {e}")
+        index = await cls.rebuild(**kwargs)
+        index.save(path)
+        return index
@@ -0,0 +1,28 @@
+import hashlib
+import re
+import unicodedata
+from typing import Optional
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t\f\v]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def normalize_description(text: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a description: NFC, Unix newlines, no trailing
+    whitespace on lines, at most one blank line in a row. Returns None for
+    empty text.
+    """
+    if not text:
+        return None
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = _BLANK_LINES_RE.sub("\n\n", _TRAILING_SPACE_RE.sub("", text)).strip()
+    return text or None
+
+
+def description_hash(text: Optional[str]) -> Optional[str]:
+    """SHA-256 hex digest of the normalized description, its storage key."""
+    normalized = normalize_description(text)
+    if normalized is None:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
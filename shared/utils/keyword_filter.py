@@ -0,0 +1,214 @@
+"""
+Compiled keyword filter for the phrase lists in search_config.json.
+
+Every phrase list is compiled once into a token-level Aho-Corasick automaton
+per job field (title, company, description). Each field is tokenized with a
+single regex pass and then walked through its automaton once, so the cost per
+job is linear in the text length no matter how many phrases are configured.
+Matching on whole tokens gives word-boundary semantics for free: "IT", "hr"
+and "qe" only match as words, never inside "with", "three" or "unique".
+"""
+
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# search_config.json key -> job field that category is matched against
+FILTER_CATEGORIES: Dict[str, str] = {
+    "title_include": "title",
+    "title_exclude": "title",
+    "company_exclude": "company",
+    "desc_include_words": "description",
+    "desc_exclude_words": "description",
+    "non_remote_phrases": "description",
+}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase and split text into alphanumeric tokens."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class TokenAutomaton:
+    """Aho-Corasick automaton whose alphabet is tokens instead of characters."""
+
+    def __init__(self, patterns: Iterable[Tuple[Sequence[str], Any]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Any, ...]] = [()]
+
+        for tokens, value in patterns:
+            if not tokens:
+                continue
+            node = 0
+            for token in tokens:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (value,)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                # Merge outputs along the failure chain so scanning never walks it
+                self._out[child] += self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def scan(self, tokens: Sequence[str]) -> Set[Any]:
+        """Return the values of every pattern occurring in tokens."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[Any] = set()
+        node = 0
+        for token in tokens:
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+@dataclass
+class FilterResult:
+    """Per-category phrase hits for one job."""
+
+    hits: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def matched(self, category: str) -> Set[str]:
+        return self.hits.get(category, set())
+
+    @property
+    def excluded(self) -> bool:
+        return bool(
+            self.matched("title_exclude")
+            or self.matched("company_exclude")
+            or self.matched("desc_exclude_words")
+            or self.matched("non_remote_phrases")
+        )
+
+    @property
+    def relevant(self) -> bool:
+        """Title and description both match an include phrase and nothing excludes it."""
+        return (
+            bool(self.matched("title_include"))
+            and bool(self.matched("desc_include_words"))
+            and not self.excluded
+        )
+
+    def flags(self) -> Dict[str, bool]:
+        """Column values for shared.db.models.Jobs derived from this result."""
+        return {"relevant": self.relevant}
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {category: sorted(words) for category, words in self.hits.items()}
+
+
+def _field(job: Any, name: str) -> Optional[str]:
+    if isinstance(job, Mapping):
+        return job.get(name)
+    return getattr(job, name, None)
+
+
+class KeywordFilter:
+    """All phrase lists of a search config compiled into per-field automata."""
+
+    def __init__(self, phrases: Mapping[str, Iterable[str]]) -> None:
+        unknown = set(phrases) - set(FILTER_CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown filter categories: {sorted(unknown)}")
+
+        per_field: Dict[str, List[Tuple[Tuple[str, ...], Tuple[str, str]]]] = {}
+        for category, words in phrases.items():
+            job_field = FILTER_CATEGORIES[category]
+            for word in words:
+                tokens = tuple(tokenize(word))
+                if not tokens:
+                    logger.warning(f"Ignoring empty phrase {word!r} in {category}")
+                    continue
+                per_field.setdefault(job_field, []).append((tokens, (category, word)))
+
+        self._automata: Dict[str, TokenAutomaton] = {
+            job_field: TokenAutomaton(patterns)
+            for job_field, patterns in per_field.items()
+        }
+        logger.info(
+            "Compiled keyword filter: "
+            + ", ".join(
+                f"{job_field}={len(automaton)} states"
+                for job_field, automaton in self._automata.items()
+            )
+        )
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "KeywordFilter":
+        """Build a filter from a loaded search_config.json dictionary."""
+        return cls(
+            {
+                category: config.get(category) or []
+                for category in FILTER_CATEGORIES
+            }
+        )
+
+    def evaluate(
+        self,
+        title: Optional[str],
+        company: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> FilterResult:
+        """Scan each field once and collect the phrase hits per category."""
+        texts = {"title": title, "company": company, "description": description}
+        result = FilterResult()
+        for job_field, automaton in self._automata.items():
+            for category, word in automaton.scan(tokenize(texts[job_field])):
+                result.hits.setdefault(category, set()).add(word)
+        return result
+
+    def evaluate_job(self, job: Any) -> FilterResult:
+        """Evaluate a Jobs row, a schema object or a scraped-job dictionary."""
+        return self.evaluate(
+            _field(job, "title"), _field(job, "company"), _field(job, "description")
+        )
+
+    def evaluate_batch(self, jobs: Iterable[Any]) -> List[FilterResult]:
+        """Evaluate a batch of jobs, returning results in input order."""
+        evaluate = self.evaluate
+        return [
+            evaluate(_field(job, "title"), _field(job, "company"), _field(job, "description"))
+            for job in jobs
+        ]
+
+    def apply_batch(self, jobs: Sequence[Any]) -> List[FilterResult]:
+        """Evaluate a batch of Jobs rows and set their flags in place."""
+        results = self.evaluate_batch(jobs)
+        for job, result in zip(jobs, results):
+            for column, value in result.flags().items():
+                if isinstance(job, dict):
+                    job[column] = value
+                else:
+                    setattr(job, column, value)
+        return results
@@ -0,0 +1,175 @@
+"""
+Prometheus metrics shared by the controller, the Temporal worker and the
+services.
+
+Metrics live in prometheus_client's default registry of each process; the
+controller serves it on /metrics and workers with start_metrics_server.
+Besides the per-stage and per-query series, database engines built with
+InstrumentedAsyncQueuePool report how long checkouts wait and how full
+their pool is.
+"""
+
+import contextlib
+import logging
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import REGISTRY, Counter, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Stage batches take from milliseconds (a handful of jobs) to minutes
+_STAGE_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300
+)
+_POOL_BUCKETS = (
+    0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 10, 30
+)
+
+STAGE_DURATION = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent on one batch of a pipeline stage",
+    ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+STAGE_ITEMS = Counter(
+    "pipeline_stage_items_total", "Jobs processed by a pipeline stage", ["stage"]
+)
+ACTIVITY_DURATION = Histogram(
+    "pipeline_activity_duration_seconds",
+    "Temporal activity execution time in this worker",
+    ["activity", "status"],
+    buckets=_STAGE_BUCKETS,
+)
+
+QUERY_DURATION = Histogram(
+    "scrape_query_duration_seconds",
+    "Wall time of scraping one search query",
+    ["query"],
+    buckets=_STAGE_BUCKETS,
+)
+QUERY_REQUESTS = Counter(
+    "scrape_query_requests_total", "Search result pages requested", ["query"]
+)
+QUERY_JOBS_FOUND = Counter(
+    "scrape_query_jobs_found_total", "Postings found by a search query", ["query"]
+)
+QUERY_JOBS_INSERTED = Counter(
+    "scrape_query_jobs_inserted_total",
+    "New postings stored from a search query",
+    ["query"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_fetch_duration_seconds",
+    "Time until response headers for scraper requests",
+    ["host", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to get a connection from the pool, waiting and connecting included",
+    ["engine"],
+    buckets=_POOL_BUCKETS,
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a connection",
+    ["engine"],
+)
+
+
+@contextlib.contextmanager
+def track_stage(stage: str, items: int = 0) -> Iterator[None]:
+    """Observe the duration of the block for a stage and count its jobs."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.labels(stage).observe(time.perf_counter() - started)
+        if items:
+            STAGE_ITEMS.labels(stage).inc(items)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """The asyncio queue pool, timing every checkout under metrics_name."""
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT.labels(self.metrics_name).observe(
+                time.perf_counter() - started
+            )
+
+
+class PoolCollector:
+    """Size, checked-out and overflow gauges of registered pools, read on scrape."""
+
+    def __init__(self) -> None:
+        self._pools: Dict[str, AsyncAdaptedQueuePool] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, pool: AsyncAdaptedQueuePool) -> None:
+        with self._lock:
+            self._pools[name] = pool
+
+    def collect(self):
+        gauges = {
+            "size": GaugeMetricFamily(
+                "db_pool_size", "Configured pool size", labels=["engine"]
+            ),
+            "checked_out": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections in use", labels=["engine"]
+            ),
+            "checked_in": GaugeMetricFamily(
+                "db_pool_checked_in", "Idle pooled connections", labels=["engine"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow",
+                "Connections above pool_size (negative: not yet opened)",
+                labels=["engine"],
+            ),
+        }
+        with self._lock:
+            pools = list(self._pools.items())
+        for name, pool in pools:
+            gauges["size"].add_metric([name], pool.size())
+            gauges["checked_out"].add_metric([name], pool.checkedout())
+            gauges["checked_in"].add_metric([name], pool.checkedin())
+            gauges["overflow"].add_metric([name], pool.overflow())
+        return list(gauges.values())
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+def instrument_engine(engine, name: str = "default") -> None:
+    """Report an engine's pool gauges (and checkout timing if instrumented) as name."""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        pool.metrics_name = name
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        pool_collector.register(name, pool)
+    else:
+        logger.debug(f"Engine {name} uses {type(pool).__name__}, no pool metrics")
+
+
+def start_metrics_server(port: int, addr: str = "0.0.0.0") -> Optional[int]:
+    """Serve the default registry on /metrics (any path) from a background thread."""
+    if not port:
+        return None
+    start_http_server(port, addr=addr)
+    logger.info(f"Serving Prometheus metrics on {addr}:{port}")
+    return port
@@ -0,0 +1,292 @@
+"""
+Search query planner.
+
+Collapses the search_config.json queries into the fewest requests that
+still cover them, orders the result by historical yield (new jobs per
+request, from search_runs) and skips queries that have produced nothing
+new for several runs.
+
+    python -m shared.utils.query_planner [--config PATH] [--skip-after K]
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from shared.utils.search_config import load_search_config, query_key, query_source
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKIP_AFTER = 3
+DEFAULT_HISTORY_WINDOW = 10
+DEFAULT_REPROBE_AFTER = timedelta(days=1)
+
+
+@dataclass
+class QueryHistory:
+    """Recent runs of one planned query."""
+
+    runs: int = 0
+    requests: int = 0
+    inserted: int = 0
+    zero_streak: int = 0  # consecutive latest runs without a new job
+    last_run_at: Optional[datetime] = None
+
+    @property
+    def yield_per_request(self) -> float:
+        return self.inserted / self.requests if self.requests else 0.0
+
+
+@dataclass
+class PlannedQuery:
+    """One request stream in the plan, covering one or more config queries."""
+
+    query: Dict[str, Any]
+    merged_from: List[str]
+    history: Optional[QueryHistory] = None
+    skip_reason: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return query_key(self.query)
+
+
+@dataclass
+class QueryPlan:
+    queries: List[PlannedQuery]
+    skipped: List[PlannedQuery] = field(default_factory=list)
+    original_queries: int = 0
+    pages_to_scrape: int = 1
+    rounds: int = 1
+
+    @property
+    def original_requests(self) -> int:
+        return self.original_queries * self.pages_to_scrape * self.rounds
+
+    @property
+    def planned_requests(self) -> int:
+        return len(self.queries) * self.pages_to_scrape * self.rounds
+
+    @property
+    def saved_requests(self) -> int:
+        return self.original_requests - self.planned_requests
+
+    def format(self) -> str:
+        lines = []
+        for i, planned in enumerate(self.queries, 1):
+            history = planned.history
+            stats = (
+                f"yield={history.yield_per_request:.2f}/req runs={history.runs}"
+                if history and history.runs
+                else "no history"
+            )
+            lines.append(
+                f"{i:3d}. {planned.key}  [{stats}]  covers {len(planned.merged_from)}"
+            )
+        for planned in self.skipped:
+            lines.append(f"  -  {planned.key}  skipped: {planned.skip_reason}")
+        lines.append(
+            f"{len(self.queries)} planned queries ({len(self.skipped)} skipped) "
+            f"from {self.original_queries} configured: "
+            f"{self.planned_requests} requests instead of {self.original_requests}, "
+            f"{self.saved_requests} saved"
+        )
+        return "\n".join(lines)
+
+
+def _merge_work_types(values: Iterable[str]) -> str:
+    """Combine f_WT filters; an empty filter already means every work type."""
+    types = set()
+    for value in values:
+        if not value:
+            return ""
+        types.update(v.strip() for v in value.split(",") if v.strip())
+    return ",".join(sorted(types))
+
+
+def merge_queries(
+    queries: List[Dict[str, Any]], merge_keywords: bool = False
+) -> List[PlannedQuery]:
+    """
+    Collapse queries that one broader request can serve.
+
+    Queries for the same source, keywords and location are merged into a
+    single request over the union of their f_WT work types. With
+    merge_keywords, queries for the same location and work types are then
+    combined into one OR keyword search; the title filter does the rest.
+    """
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for query in queries:
+        group_key = (query_source(query), query["keywords"], query["location"])
+        groups.setdefault(group_key, []).append(query)
+
+    planned = []
+    for (source, keywords, location), members in groups.items():
+        merged = {
+            "keywords": keywords,
+            "location": location,
+            "f_WT": _merge_work_types(q.get("f_WT", "") for q in members),
+        }
+        if source != "linkedin":
+            merged["source"] = source
+        planned.append(PlannedQuery(merged, [query_key(q) for q in members]))
+
+    if not merge_keywords:
+        return planned
+
+    by_location: Dict[Tuple[str, str, str], List[PlannedQuery]] = {}
+    for item in planned:
+        group_key = (
+            query_source(item.query), item.query["location"], item.query["f_WT"]
+        )
+        by_location.setdefault(group_key, []).append(item)
+
+    combined = []
+    for members in by_location.values():
+        if len(members) == 1:
+            combined.append(members[0])
+            continue
+        query = dict(members[0].query)
+        query["keywords"] = " OR ".join(
+            f'"{keywords}"' for keywords in sorted({m.query["keywords"] for m in members})
+        )
+        combined.append(
+            PlannedQuery(query, [key for m in members for key in m.merged_from])
+        )
+    return combined
+
+
+def build_plan(
+    config: Dict[str, Any],
+    history: Optional[Dict[str, QueryHistory]] = None,
+    skip_after: int = DEFAULT_SKIP_AFTER,
+    reprobe_after: timedelta = DEFAULT_REPROBE_AFTER,
+    merge_keywords: bool = False,
+    now: Optional[datetime] = None,
+) -> QueryPlan:
+    """
+    Plan the requests for a scrape round.
+
+    Queries without history come first so they get measured, then the rest
+    by new jobs per request. A query with no new jobs in its last
+    skip_after runs is skipped until reprobe_after has passed since its
+    last run.
+    """
+    history = history or {}
+    now = now or datetime.now()
+    queries = config["search_queries"]
+
+    active, skipped = [], []
+    for planned in merge_queries(queries, merge_keywords=merge_keywords):
+        planned.history = history.get(planned.key)
+        h = planned.history
+        if (
+            skip_after
+            and h is not None
+            and h.zero_streak >= skip_after
+            and h.last_run_at is not None
+            and now - h.last_run_at < reprobe_after
+        ):
+            planned.skip_reason = f"no new jobs in last {h.zero_streak} runs"
+            skipped.append(planned)
+        else:
+            active.append(planned)
+
+    active.sort(
+        key=lambda p: (
+            p.history is not None and p.history.runs > 0,
+            -(p.history.yield_per_request if p.history else 0.0),
+        )
+    )
+    return QueryPlan(
+        queries=active,
+        skipped=skipped,
+        original_queries=len(queries),
+        pages_to_scrape=int(config.get("pages_to_scrape", 1)),
+        rounds=int(config.get("rounds", 1)),
+    )
+
+
+async def load_query_history(
+    window: int = DEFAULT_HISTORY_WINDOW,
+) -> Dict[str, QueryHistory]:
+    """Summarize the last `window` runs of every query from search_runs."""
+    from sqlalchemy import func, select
+
+    from shared.db.database import get_db
+    from shared.db.models import SearchRuns
+
+    ranked = select(
+        SearchRuns.query_key,
+        SearchRuns.started_at,
+        SearchRuns.requests,
+        SearchRuns.inserted,
+        func.row_number()
+        .over(partition_by=SearchRuns.query_key, order_by=SearchRuns.started_at.desc())
+        .label("rank"),
+    ).subquery()
+    stmt = (
+        select(ranked)
+        .where(ranked.c.rank <= window)
+        .order_by(ranked.c.query_key, ranked.c.rank)
+    )
+
+    history: Dict[str, QueryHistory] = {}
+    async with get_db() as session:
+        for row in (await session.execute(stmt)).mappings():
+            h = history.setdefault(row["query_key"], QueryHistory())
+            if h.runs == 0:
+                h.last_run_at = row["started_at"]
+            if row["inserted"] == 0 and h.zero_streak == h.runs:
+                h.zero_streak += 1
+            h.runs += 1
+            h.requests += row["requests"]
+            h.inserted += row["inserted"]
+    return history
+
+
+async def plan_from_db(
+    config: Optional[Dict[str, Any]] = None, **kwargs: Any
+) -> QueryPlan:
+    """Build a plan using yield history from the database when reachable."""
+    if config is None:
+        from shared.utils.config_service import current_config
+
+        config = current_config().config
+    try:
+        history = await load_query_history()
+    except Exception as e:
+        logger.warning(f"Planning without query history: {e}")
+        history = {}
+    return build_plan(config, history, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--config", help="path to search_config.json")
+    parser.add_argument("--skip-after", type=int, default=DEFAULT_SKIP_AFTER)
+    parser.add_argument("--merge-keywords", action="store_true")
+    parser.add_argument(
+        "--no-history", action="store_true", help="do not read yield history"
+    )
+    args = parser.parse_args()
+
+    from shared.db.database import configure
+
+    configure(profile="batch")
+
+    logging.basicConfig(level=logging.WARNING)
+    config = load_search_config(args.config)
+    options = {"skip_after": args.skip_after, "merge_keywords": args.merge_keywords}
+    if args.no_history:
+        plan = build_plan(config, **options)
+    else:
+        plan = asyncio.run(plan_from_db(config, **options))
+    print(plan.format())
+
+
+if __name__ == "__main__":
+    main()
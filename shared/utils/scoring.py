@@ -0,0 +1,196 @@
+"""
+Vectorized relevance scoring for batches of jobs.
+
+A batch is handled as columns. The keyword filter's automata reduce each
+job's text fields to per-category hit counts in one pass; everything after
+that (hit caps, title match strength, recency decay, the weighted sum and
+the relevant/promising decision) is numpy arithmetic over whole columns.
+Weights and thresholds come from the optional "scoring" section of
+search_config.json:
+
+    "scoring": {
+        "weights": {"title_include": 2.0, "non_remote": -3.0, ...},
+        "promising_threshold": 4.0,
+        "recency_half_life_days": 7,
+        "max_hits": 3
+    }
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from shared.utils.keyword_filter import KeywordFilter, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Score features in weight-vector order
+FEATURES = (
+    "title_include",
+    "desc_include",
+    "title_strength",
+    "title_exclude",
+    "company_exclude",
+    "desc_exclude",
+    "non_remote",
+    "recency",
+)
+
+# Hit-count feature -> keyword filter category it counts
+HIT_FEATURES: Dict[str, str] = {
+    "title_include": "title_include",
+    "desc_include": "desc_include_words",
+    "title_exclude": "title_exclude",
+    "company_exclude": "company_exclude",
+    "desc_exclude": "desc_exclude_words",
+    "non_remote": "non_remote_phrases",
+}
+
+_EXCLUDE_FEATURES = ("title_exclude", "company_exclude", "desc_exclude", "non_remote")
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "title_include": 2.0,
+    "desc_include": 1.0,
+    "title_strength": 2.0,
+    "title_exclude": -4.0,
+    "company_exclude": -10.0,
+    "desc_exclude": -2.0,
+    "non_remote": -3.0,
+    "recency": 1.5,
+}
+
+
+def _text_column(values: pd.Series) -> List[Optional[str]]:
+    """Column values as str or None (pandas represents missing text as NaN)."""
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+@dataclass
+class ScoringConfig:
+    """Weights and thresholds of the score, see the module docstring."""
+
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    promising_threshold: float = 4.0
+    recency_half_life_days: float = 7.0
+    max_hits: int = 3
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "ScoringConfig":
+        """Read the "scoring" section of a search config; missing keys keep defaults."""
+        section = dict(config.get("scoring") or {})
+        weights = section.pop("weights", None) or {}
+        settings = {"promising_threshold", "recency_half_life_days", "max_hits"}
+        unknown = (set(section) - settings) | (set(weights) - set(FEATURES))
+        if unknown:
+            raise ValueError(f"Unknown scoring settings: {sorted(unknown)}")
+        scoring = cls(**section)
+        scoring.weights.update({name: float(value) for name, value in weights.items()})
+        if scoring.recency_half_life_days <= 0 or scoring.max_hits < 1:
+            raise ValueError("recency_half_life_days and max_hits must be positive")
+        return scoring
+
+
+class JobScorer:
+    """Scores batches of jobs given as columns (a DataFrame or a mapping of arrays)."""
+
+    def __init__(
+        self,
+        keyword_filter: KeywordFilter,
+        scoring: Optional[ScoringConfig] = None,
+        title_phrases: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.keyword_filter = keyword_filter
+        self.scoring = scoring or ScoringConfig()
+        # title_include phrase -> token count, for title match strength
+        self._title_phrase_tokens = dict(title_phrases or {})
+        self._weights = np.array([self.scoring.weights[name] for name in FEATURES])
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "JobScorer":
+        """Build a scorer from a loaded search_config.json dictionary."""
+        return cls(
+            KeywordFilter.from_config(config),
+            ScoringConfig.from_config(config),
+            {
+                phrase: len(tokenize(phrase))
+                for phrase in config.get("title_include") or []
+            },
+        )
+
+    def features(
+        self,
+        jobs: Union[pd.DataFrame, Mapping[str, Any]],
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """
+        Feature columns for jobs with title, company, description and date
+        columns: capped hit counts per category, the share of the title
+        covered by its longest include phrase and a recency decay in [0, 1].
+        """
+        jobs = jobs if isinstance(jobs, pd.DataFrame) else pd.DataFrame(jobs)
+        size = len(jobs)
+        counts = {name: np.zeros(size, dtype=np.int64) for name in HIT_FEATURES}
+        covered = np.zeros(size, dtype=np.int64)
+        title_tokens = np.zeros(size, dtype=np.int64)
+        category_feature = {category: name for name, category in HIT_FEATURES.items()}
+        phrase_tokens = self._title_phrase_tokens
+        evaluate = self.keyword_filter.evaluate
+
+        # The only per-job step: one automaton walk per text field
+        for i, (title, company, description) in enumerate(
+            zip(*(_text_column(jobs[name]) for name in ("title", "company", "description")))
+        ):
+            for category, words in evaluate(title, company, description).hits.items():
+                counts[category_feature[category]][i] = len(words)
+                if category == "title_include":
+                    covered[i] = max(phrase_tokens.get(word, 1) for word in words)
+            title_tokens[i] = len(tokenize(title))
+
+        frame = pd.DataFrame(
+            {
+                name: np.minimum(values, self.scoring.max_hits)
+                for name, values in counts.items()
+            },
+            index=jobs.index,
+        )
+        frame["title_strength"] = np.divide(
+            covered, title_tokens, out=np.zeros(size), where=title_tokens > 0
+        ).clip(0.0, 1.0)
+
+        dates = pd.to_datetime(jobs["date"])
+        now = pd.Timestamp(now or datetime.now())
+        age_days = ((now - dates) / pd.Timedelta(days=1)).to_numpy(
+            dtype=float, na_value=np.nan
+        )
+        half_life = self.scoring.recency_half_life_days
+        recency = np.exp2(-np.clip(age_days, 0.0, None) / half_life)
+        frame["recency"] = np.nan_to_num(recency, nan=0.0)  # undated jobs get none
+        return frame[list(FEATURES)]
+
+    def score(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Weighted score and the relevant/promising flags for feature rows."""
+        values = features[list(FEATURES)].to_numpy(dtype=float)
+        score = values @ self._weights
+        # Same rule as FilterResult.relevant, so both paths agree
+        relevant = (
+            (features["title_include"].to_numpy() > 0)
+            & (features["desc_include"].to_numpy() > 0)
+            & ~(features[list(_EXCLUDE_FEATURES)].to_numpy() > 0).any(axis=1)
+        )
+        promising = relevant & (score >= self.scoring.promising_threshold)
+        return pd.DataFrame(
+            {"score": score, "relevant": relevant, "promising": promising},
+            index=features.index,
+        )
+
+    def evaluate(
+        self,
+        jobs: Union[pd.DataFrame, Mapping[str, Any]],
+        now: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Features and score of a batch in one call."""
+        return self.score(self.features(jobs, now))
@@ -0,0 +1,35 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# config/search_config.json at the repository root, overridable per deployment
+DEFAULT_SEARCH_CONFIG_PATH = os.getenv(
+    "SEARCH_CONFIG_PATH",
+    os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "../../config/search_config.json")
+    ),
+)
+
+
+def load_search_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the search configuration JSON file."""
+    path = path or DEFAULT_SEARCH_CONFIG_PATH
+    logger.info(f"Loading search config from {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def query_source(query: Dict[str, Any]) -> str:
+    """Job source a search query runs against (JobSource value)."""
+    return (query.get("source") or "linkedin").lower()
+
+
+def query_key(query: Dict[str, Any]) -> str:
+    """Stable identifier of a search query, used in logs and results."""
+    return (
+        f"{query_source(query)}:{query['keywords']}"
+        f"|{query['location']}|{query.get('f_WT', '')}"
+    )
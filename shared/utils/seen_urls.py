@@ -0,0 +1,245 @@
+"""
+Compact seen-set of job URLs for incremental scraping.
+
+A Bloom filter over job_url_hash values answers "have we stored this
+posting?" without a database round trip. At the default sizing (5M URLs,
+0.1% false positives) it takes about 9 MB. It never gives false negatives,
+so an unseen answer is always correct; a positive may need confirming
+against the job_urls table when the cost of a wrong skip matters.
+maybe_save() writes snapshots on a worker thread, so a scrape never waits
+for the disk.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import struct
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from shared.utils.urls import job_url_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEEN_URLS_PATH = os.getenv("SEEN_URLS_PATH", "data/seen_urls.bloom")
+DEFAULT_CAPACITY = 5_000_000
+DEFAULT_ERROR_RATE = 0.001
+
+_MAGIC = b"JSBLOOM1"
+_HEADER = struct.Struct("<8sQdQII")  # magic, capacity, error_rate, count, bits, hashes
+
+
+class BloomFilter:
+    """Bloom filter over hex SHA-256 digests, using double hashing."""
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, digest: str) -> Iterable[int]:
+        # The digest is already uniformly distributed, so two 64-bit slices
+        # of it give independent base hashes for h1 + i * h2
+        h1 = int(digest[:16], 16)
+        h2 = int(digest[16:32], 16) | 1
+        m = self.num_bits
+        return ((h1 + i * h2) % m for i in range(self.num_hashes))
+
+    def add(self, digest: str) -> bool:
+        """Add a digest; returns True if it was (probably) already present."""
+        present = True
+        bits = self._bits
+        for pos in self._positions(digest):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, digest: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+    def compatible(self, other: "BloomFilter") -> bool:
+        return (self.num_bits, self.num_hashes) == (other.num_bits, other.num_hashes)
+
+    def merge(self, other: "BloomFilter") -> None:
+        """Union another filter with the same parameters into this one."""
+        if not self.compatible(other):
+            raise ValueError("Cannot merge Bloom filters with different parameters")
+        # In place, a few milliseconds for the default 9 MB filter
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        np.bitwise_or(bits, np.frombuffer(other._bits, dtype=np.uint8), out=bits)
+        self.count = max(self.count, other.count)
+
+    def to_bytes(self) -> bytes:
+        header = _HEADER.pack(
+            _MAGIC, self.capacity, self.error_rate, self.count,
+            self.num_bits, self.num_hashes,
+        )
+        return header + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        magic, capacity, error_rate, count, num_bits, num_hashes = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a Bloom filter snapshot")
+        bloom = cls(capacity, error_rate)
+        if (bloom.num_bits, bloom.num_hashes) != (num_bits, num_hashes):
+            raise ValueError("Bloom filter snapshot has inconsistent parameters")
+        bloom.count = count
+        bloom._bits = bytearray(data[_HEADER.size:])
+        return bloom
+
+
+class SeenUrls:
+    """Seen-set of normalized job URLs, snapshotted to disk."""
+
+    def __init__(
+        self,
+        bloom: Optional[BloomFilter] = None,
+        path: str = DEFAULT_SEEN_URLS_PATH,
+        snapshot_interval: float = 60.0,
+    ) -> None:
+        self.bloom = bloom or BloomFilter()
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._dirty = False
+        self._saving = False
+        self._saved_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return self.bloom.count
+
+    def seen_hash(self, digest: Optional[str]) -> bool:
+        return bool(digest) and digest in self.bloom
+
+    def seen(self, url: str) -> bool:
+        return self.seen_hash(job_url_hash(url))
+
+    def add_hash(self, digest: Optional[str]) -> None:
+        if digest and not self.bloom.add(digest):
+            self._dirty = True
+
+    def add(self, url: str) -> None:
+        self.add_hash(job_url_hash(url))
+
+    def _write_snapshot(self) -> Optional[BloomFilter]:
+        """
+        Atomically write this filter unioned with the current snapshot, so
+        worker processes sharing the file do not drop each other's URLs.
+        Only reads self.bloom, so it can run on a thread while URLs are
+        added; returns the snapshot that was on disk, if compatible.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        on_disk = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    on_disk = BloomFilter.from_bytes(f.read())
+                if not on_disk.compatible(self.bloom):
+                    on_disk = None
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Ignoring unreadable seen-URL snapshot {self.path}: {e}")
+                on_disk = None
+        merged = BloomFilter.from_bytes(self.bloom.to_bytes())
+        if on_disk is not None:
+            merged.merge(on_disk)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(merged.to_bytes())
+        os.replace(tmp_path, self.path)
+        return on_disk
+
+    def _saved(self, on_disk: Optional[BloomFilter]) -> None:
+        # Merged on the caller's thread so no concurrent add is overwritten
+        if on_disk is not None:
+            self.bloom.merge(on_disk)
+        self._saved_at = time.monotonic()
+        logger.info(f"Saved seen-URL snapshot with ~{len(self)} URLs to {self.path}")
+
+    def save(self) -> None:
+        """Snapshot to disk, unioned with the snapshot already there."""
+        self._dirty = False
+        self._saved(self._write_snapshot())
+
+    async def maybe_save(self) -> None:
+        """Snapshot on a thread if there are new URLs and the interval has passed."""
+        if (
+            not self._dirty
+            or self._saving
+            or time.monotonic() - self._saved_at < self.snapshot_interval
+        ):
+            return
+        # URLs added while the snapshot is written mark it dirty again
+        self._dirty = False
+        self._saving = True
+        try:
+            on_disk = await asyncio.to_thread(self._write_snapshot)
+        except Exception:
+            self._dirty = True
+            raise
+        finally:
+            self._saving = False
+        self._saved(on_disk)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SEEN_URLS_PATH, **kwargs) -> "SeenUrls":
+        with open(path, "rb") as f:
+            bloom = BloomFilter.from_bytes(f.read())
+        logger.info(f"Loaded seen-URL snapshot with ~{bloom.count} URLs from {path}")
+        return cls(bloom, path=path, **kwargs)
+
+    @classmethod
+    async def rebuild(
+        cls,
+        path: str = DEFAULT_SEEN_URLS_PATH,
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        batch_size: int = 10000,
+    ) -> "SeenUrls":
+        """
+        Rebuild the seen-set from every stored job URL, including those of
+        archived partitions.
+        """
+        from sqlalchemy import select
+
+        from shared.db.database import get_db
+        from shared.db.models import JobUrls
+
+        seen = cls(BloomFilter(capacity, error_rate), path=path)
+        stmt = select(JobUrls.job_url_hash).execution_options(yield_per=batch_size)
+        async with get_db() as session:
+            result = await session.stream(stmt)
+            async for partition in result.scalars().partitions(batch_size):
+                for digest in partition:
+                    seen.add_hash(digest)
+        logger.info(f"Rebuilt seen-URL set with ~{len(seen)} URLs from database")
+        return seen
+
+    @classmethod
+    async def load_or_rebuild(
+        cls, path: str = DEFAULT_SEEN_URLS_PATH, **kwargs
+    ) -> "SeenUrls":
+        """Load the snapshot, rebuilding and saving it if missing or corrupt."""
+        if os.path.exists(path):
+            try:
+                return await asyncio.to_thread(cls.load, path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.warning(f"Failed to load seen-URL snapshot {path}: {e}")
+        seen = await cls.rebuild(path, **kwargs)
+        # Not shared with any other task yet, so it can be saved on a thread
+        await asyncio.to_thread(seen.save)
+        return seen
@@ -0,0 +1,74 @@
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track how a posting was reached
+TRACKING_PARAMS = {
+    "currentjobid",
+    "eborigin",
+    "from",
+    "geoid",
+    "originalsubdomain",
+    "pagenum",
+    "position",
+    "refid",
+    "trackingid",
+    "trk",
+    "tk",
+    "vjs",
+}
+
+_LINKEDIN_JOB_ID_RE = re.compile(r"/jobs/view/(?:[^/]*?-)?(\d+)/?$")
+
+
+def normalize_job_url(url: str) -> str:
+    """
+    Canonical form of a job posting URL.
+
+    Lowercases scheme and host, drops fragments, tracking parameters and
+    trailing slashes, sorts the remaining query parameters and reduces
+    LinkedIn job URLs to /jobs/view/<id> so slug variations collapse.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = parts.netloc.lower()
+    if host.endswith("linkedin.com"):
+        host = "www.linkedin.com"
+    path = parts.path.rstrip("/") or "/"
+
+    match = _LINKEDIN_JOB_ID_RE.search(path) if "linkedin.com" in host else None
+    if match:
+        return f"{scheme}://{host}/jobs/view/{match.group(1)}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def job_url_hash(url: Optional[str]) -> Optional[str]:
+    """SHA-256 hex digest of the normalized job URL."""
+    if not url:
+        return None
+    return hashlib.sha256(normalize_job_url(url).encode("utf-8")).hexdigest()
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of any URL for cache keys: lowercase scheme and host,
+    no fragment, query parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    return urlunsplit(
+        (
+            (parts.scheme or "https").lower(),
+            parts.netloc.lower(),
+            parts.path or "/",
+            urlencode(query),
+            "",
+        )
+    )